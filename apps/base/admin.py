@@ -1,7 +1,89 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections as db_connections
+from django.utils.functional import cached_property
 
+from apps.base import constants as base_constants
 from apps.base import models as base_models
+from apps.base import sharding as base_sharding
 
-admin.site.register(base_models.Language)
-admin.site.register(base_models.Genre)
-admin.site.register(base_models.City)
+
+def get_estimated_count(queryset):
+    """
+    Returns the number of rows of the table of ``queryset`` estimated by the
+    PostgreSQL planner statistics, summed over its partitions, or None when
+    the queryset is filtered or the database cannot estimate it.
+    """
+    if queryset.query.where or queryset.query.distinct:
+        return None
+    connection = db_connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0)::bigint FROM pg_class "
+            "WHERE oid = %s::regclass "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+            [queryset.model._meta.db_table] * 2,
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count of an unfiltered list of a large table is the
+    planner's estimate, so that opening a changelist does not scan millions
+    of rows. Filtered lists, and small tables, are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = get_estimated_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate > base_constants.AdminConstants.ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for tables of millions of rows, such as slots, seats and
+    bookings.
+
+    Changelists show an estimated count and skip counting the whole table
+    next to filtered results. Relations named in ``list_select_related`` are
+    joined on a single database; with city shards, where the shared catalog
+    tables and users are empty, they are prefetched from the default
+    database instead.
+
+    Sharded rows are listed from the default database, like other sharded
+    querysets without a city, cinema or slot hint.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_list_select_related(self, request):
+        if base_sharding.is_enabled():
+            return ()
+        return super().get_list_select_related(request)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if base_sharding.is_enabled() and self.list_select_related:
+            queryset = queryset.prefetch_related(*self.list_select_related)
+        return queryset
+
+
+@admin.register(base_models.Language, base_models.Genre, base_models.City)
+class NamedModelAdmin(admin.ModelAdmin):
+    """
+    Admin of the small named catalog tables, searchable by name for the
+    autocomplete widgets of other admins.
+    """
+
+    search_fields = ["name"]
+    ordering = ("name",)
@@ -0,0 +1,179 @@
+import asyncio
+import functools
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.db import close_old_connections
+from django.db import connections as db_connections
+from django.db.models import prefetch_related_objects
+from rest_framework import generics as rest_generics
+from rest_framework import response as rest_response
+
+from apps.base import statement_timeouts as base_statement_timeouts
+
+
+def _run_with_own_connection(func):
+    """
+    Runs ``func`` in a worker thread, with that thread's own database
+    connections, which get the query budget of the request and are released
+    afterwards like at the end of a request.
+    """
+    timeout = base_statement_timeouts.current_timeout()
+    for connection in db_connections.all(initialized_only=True):
+        base_statement_timeouts.apply(connection, timeout)
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run_concurrently(*calls):
+    """
+    Runs blocking callables, such as independent queries, at the same time
+    in worker threads and returns their results in order.
+
+    Django's async ORM runs every query of a request on one thread and one
+    connection, one after another. Each call here runs on its own thread and
+    connection instead, so a request uses up to ``len(calls)`` connections.
+    A single call keeps to the request's own thread and connection.
+    """
+    if len(calls) == 1:
+        return [await sync_to_async(calls[0])()]
+    return await asyncio.gather(
+        *(sync_to_async(_run_with_own_connection, thread_sensitive=False)(call) for call in calls)
+    )
+
+
+async def iterate_in_thread(iterator):
+    """
+    Yields the items of a blocking ``iterator``, such as the content of a
+    streaming response read from the database, one at a time.
+
+    On the ASGI stack, Django reads a synchronous streaming response into a
+    list before sending it. Each item is read here on the request's thread,
+    which holds its database connection, so the response is sent as it is
+    read instead.
+    """
+    iterator = iter(iterator)
+    done = object()
+    next_item = sync_to_async(next)
+    while (item := await next_item(iterator, done)) is not done:
+        yield item
+
+
+def split_prefetches(queryset):
+    """
+    Returns ``queryset`` without its prefetch lookups, and the lookups.
+    """
+    return queryset.prefetch_related(None), queryset._prefetch_related_lookups
+
+
+async def prefetch_concurrently(instances, lookups, *calls):
+    """
+    Runs each prefetch lookup for ``instances``, and any other ``calls``,
+    concurrently.
+    """
+    if not instances:
+        return
+    # Created up front, so that concurrent lookups add to the same cache.
+    for instance in instances:
+        if not hasattr(instance, "_prefetched_objects_cache"):
+            instance._prefetched_objects_cache = {}
+
+    await run_concurrently(
+        *(functools.partial(prefetch_related_objects, instances, lookup) for lookup in lookups),
+        *calls,
+    )
+
+
+class AsyncReadOnlyViewMixin:
+    """
+    Serves a DRF list or read-only generic view or viewset with an async
+    handler, for the ASGI stack.
+
+    The base query runs through Django's async ORM support; prefetch
+    lookups, and the calls returned by ``get_related_loaders``, then run
+    concurrently. Serializers must only use prefetched data.
+
+    Meant for public read endpoints: authentication is deferred, so
+    permissions that need ``request.user`` must not be used.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # Viewsets build their own view function, which Django would call
+        # synchronously unless it is marked.
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def perform_authentication(self, request):
+        pass
+
+    def get_related_loaders(self, instance):
+        """
+        Returns blocking callables loading more related data of a retrieved
+        instance, run concurrently with its prefetch lookups.
+        """
+        return []
+
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+    def get_filtered_queryset(self):
+        # Building the queryset may already query the database, e.g. to
+        # resolve filters across shards.
+        return self.filter_queryset(self.get_queryset())
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.get_filtered_queryset)()
+        queryset, lookups = split_prefetches(queryset)
+
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        instances = page if page is not None else [instance async for instance in queryset]
+        await prefetch_concurrently(instances, lookups)
+
+        data = self.get_serializer(instances, many=True).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return rest_response.Response(data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return rest_response.Response(self.get_serializer(instance).data)
+
+    async def aget_object(self):
+        """
+        Async counterpart of ``get_object`` that loads the prefetch lookups
+        and related loaders of the instance concurrently.
+        """
+        queryset = await sync_to_async(self.get_filtered_queryset)()
+        queryset, lookups = split_prefetches(queryset)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = await sync_to_async(rest_generics.get_object_or_404)(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, instance)
+
+        await prefetch_concurrently([instance], lookups, *self.get_related_loaders(instance))
+        return instance
@@ -0,0 +1,169 @@
+import http.client
+import itertools
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class LoadResult:
+    """
+    Outcome of a load run against a single URL.
+
+    Attributes:
+        latencies (list): Latency of every successful request, in seconds.
+        errors (int): Requests that failed or returned a non-2xx status.
+        duration (float): Wall-clock duration of the run, in seconds.
+    """
+
+    def __init__(self, latencies, errors, duration):
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.duration = duration
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / self.duration if self.duration else 0
+
+    def percentile(self, percent):
+        """
+        Returns the latency percentile in milliseconds.
+        """
+        if not self.latencies:
+            return 0
+        index = min(len(self.latencies) - 1, int(len(self.latencies) * percent / 100))
+        return self.latencies[index] * 1000
+
+    def as_row(self, label):
+        return {
+            "label": label,
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "rps": round(self.requests_per_second, 1),
+            "mean_ms": round(statistics.fmean(self.latencies) * 1000, 2) if self.latencies else 0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+        }
+
+
+def run_load(url, total_requests, concurrency, headers=None, timeout=30):
+    """
+    Sends ``total_requests`` GET requests to ``url`` from ``concurrency``
+    threads, each holding its own keep-alive HTTP connection.
+    """
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    ticket = itertools.count()
+    latencies = []
+    errors = []
+
+    def worker():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+        local_latencies = []
+        local_errors = 0
+
+        while next(ticket) < total_requests:
+            start = time.perf_counter()
+            try:
+                connection.request("GET", target, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                continue
+
+            if 200 <= response.status < 300:
+                local_latencies.append(time.perf_counter() - start)
+            else:
+                local_errors += 1
+
+        connection.close()
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return LoadResult(latencies, sum(errors), time.perf_counter() - start)
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout):
+    """
+    Blocks until a server accepts connections on ``port``.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server did not start on port {port} within {timeout} seconds.")
+
+
+class ServerProcess:
+    """
+    Runs an application server in a subprocess with extra environment
+    variables, for comparing configurations that are read at startup.
+
+    Attributes:
+        command (str): Command line with a ``{port}`` placeholder.
+        environment (dict): Variables added to the current environment.
+    """
+
+    def __init__(self, command, environment, startup_timeout=30):
+        self.port = get_free_port()
+        self.command = command.format(port=self.port)
+        self.environment = {**os.environ, **environment}
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command,
+            shell=True,
+            env=self.environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        wait_for_port(self.port, self.startup_timeout)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        os.killpg(self.process.pid, signal.SIGTERM)
+        self.process.wait()
+        return False
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.port}{path}"
+
+
+def format_table(rows):
+    """
+    Formats benchmark result rows as an aligned plain-text table.
+    """
+    columns = list(rows[0].keys())
+    widths = {
+        column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns
+    }
+    lines = ["  ".join(column.ljust(widths[column]) for column in columns)]
+    for row in rows:
+        lines.append("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+    return "\n".join(lines)
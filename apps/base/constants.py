@@ -6,6 +6,7 @@ class BaseConstants:
     CITY_NAME_MAX_LENGTH = 50
     GENRE_NAME_MAX_LENGTH = 50
     LANGUAGE_NAME_MAX_LENGTH = 50
+    SHARD_ALIAS_MAX_LENGTH = 32
 
 
 class ErrorMessages:
@@ -14,3 +15,150 @@ class ErrorMessages:
     """
 
     NOT_FOUND = "The requested resource was not found"
+    DATABASE_BUSY = "The service is temporarily overloaded. Please retry shortly."
+    UNKNOWN_SHARD = "'{alias}' is not a configured shard database."
+
+
+class SlowQueryConstants:
+    """
+    Constants used by the slow-query log.
+    """
+
+    LOGGER_NAME = "bookmyshow.slow_queries"
+    # Upper bound on remembered query fingerprints before the sampler resets.
+    MAX_TRACKED_FINGERPRINTS = 10000
+    # EXPLAIN is only captured for statements that are safe to re-run.
+    EXPLAINABLE_PREFIXES = ("SELECT",)
+
+
+class ProfilerConstants:
+    """
+    Constants used by the on-demand request profiler.
+    """
+
+    QUERY_PARAM = "_profile"
+    TOP_FUNCTIONS = 30
+    TOP_ALLOCATIONS = 20
+    # Stack depth recorded per allocation; one frame is enough for line-level stats.
+    TRACEMALLOC_FRAMES = 1
+
+
+class TracingConstants:
+    """
+    Constants used by request tracing.
+    """
+
+    LOGGER_NAME = "bookmyshow.tracing"
+    SERVICE_NAME = "bookmyshow"
+    # Span slots preallocated per trace; spans beyond this are counted as dropped.
+    MAX_SPANS_PER_TRACE = 256
+    # Number of trace buffers kept for reuse between requests.
+    POOL_SIZE = 64
+    MAX_STATEMENT_LENGTH = 2000
+
+    # OpenTelemetry span kinds
+    SPAN_KIND_INTERNAL = 1
+    SPAN_KIND_SERVER = 2
+    SPAN_KIND_CLIENT = 3
+
+
+class DatabaseConstants:
+    """
+    Constants used when the database cannot serve a request in time.
+    """
+
+    # Seconds clients are asked to wait before retrying a 503 response.
+    RETRY_AFTER_SECONDS = 2
+
+
+class MetricNames:
+    """
+    Names of the process-local counters exposed by the metrics endpoint.
+    """
+
+    DB_POOL_EXHAUSTED = "db.pool.exhausted"
+    DB_STATEMENT_TIMEOUT = "db.statement_timeout"
+    PASSWORD_HASHING_REJECTED = "auth.password_hashing.rejected"
+    REVOCATION_FILTER_FALSE_POSITIVE = "auth.revocation.false_positive"
+
+
+class RoutingConstants:
+    """
+    Constants used for routing queries between the primary and replicas.
+    """
+
+    PRIMARY_ALIAS = "default"
+    PIN_CACHE_PREFIX = "db-pin:"
+    # Lag reported for a replica that has replayed everything it received.
+    REPLICA_LAG_SQL = (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+
+class ShardingConstants:
+    """
+    Constants used for placing city data on shard databases.
+    """
+
+    ALIAS_PREFIX = "shard_"
+    # Models whose rows live on the shard of their cinema's city.
+    SHARDED_MODELS = frozenset(
+        {"cinema.seat", "slot.slot", "booking.booking", "booking.booking_seats"}
+    )
+    # Every database hands out primary keys from its own block, so rows keep
+    # their IDs when a city is moved and IDs stay unique across shards.
+    ID_BLOCK_SIZE = 10**12
+    CITY_SHARDS_CACHE_KEY = "sharding:cities"
+    CINEMA_CITY_CACHE_PREFIX = "sharding:cinema:"
+    SLOT_SHARD_CACHE_PREFIX = "sharding:slot:"
+    MOVE_BATCH_SIZE = 2000
+
+
+class ImageConstants:
+    """
+    Constants used for making resized variants of uploaded images and
+    resizing them on demand.
+    """
+
+    FORMATS = ("webp", "jpeg")
+    EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+    ENCODER_OPTIONS = {
+        "webp": {"format": "WEBP", "quality": 80, "method": 4},
+        "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    }
+    # Hex digits of the content hash in variant file names.
+    HASH_LENGTH = 16
+    # Widths the media endpoint resizes to, and the directories under
+    # MEDIA_ROOT it serves.
+    RESIZE_WIDTHS = (160, 320, 480, 640, 960, 1280)
+    RESIZE_DIRECTORIES = ("movies/", "cinemas/")
+    RESIZE_MAX_AGE = 60 * 60 * 24  # seconds
+    # Share of the byte budget the resized image cache is evicted down to.
+    RESIZE_CACHE_LOW_WATERMARK = 0.9
+    # Directory of the lock files in the cache; images whose keys start with
+    # the same two hex digits share a lock.
+    RESIZE_CACHE_LOCK_DIR = "locks"
+
+
+class MediaConstants:
+    """
+    Constants used for serving files of MEDIA_ROOT.
+    """
+
+    # Image variants are named after a hash of their content.
+    CONTENT_HASHED_NAME = rf"(^|/)variants/[0-9a-f]{{{ImageConstants.HASH_LENGTH}}}\.\w+$"
+    IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365  # seconds
+    # Response header handing the file to the front server, by MEDIA_SENDFILE.
+    SENDFILE_HEADERS = {"x-accel-redirect": "X-Accel-Redirect", "x-sendfile": "X-Sendfile"}
+
+
+class AdminConstants:
+    """
+    Constants used by the admin of large tables.
+    """
+
+    # Unfiltered changelists of tables the planner estimates at more rows
+    # than this show the estimate instead of counting every row.
+    ESTIMATED_COUNT_THRESHOLD = 100_000
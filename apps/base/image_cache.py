@@ -0,0 +1,221 @@
+import contextlib
+import fcntl
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent import futures
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from apps.base import constants as base_constants
+from apps.base import images as base_images
+
+logger = logging.getLogger(__name__)
+
+
+class ResizedImageCache:
+    """
+    Resized images on local disk, kept within a byte budget by evicting the
+    least recently used files.
+
+    Files are written under a temporary name and renamed into place, so that
+    readers in any process see either no file or a complete one. A hit
+    refreshes the modification time of the file, which eviction orders by.
+
+    A missing image is made once however many requests ask for it at the
+    same time: threads of a process wait for the one making it, and
+    processes sharing the directory take turns on a lock file, the later
+    ones finding the file made by the first.
+
+    Attributes:
+        directory (Path): Root directory of the cache.
+        max_bytes (int): Size the cache is evicted down from.
+        size (int): Bytes this process believes the cache holds. Files other
+            processes write are only counted when it is recounted, on first
+            use and after each eviction.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.size = None
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def get_path(self, key, extension):
+        return self.directory / key[:2] / f"{key}.{extension}"
+
+    def open(self, path):
+        """
+        Returns the cached file at ``path`` opened for reading, or None.
+        """
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(file.fileno())
+        return file
+
+    def get_or_create(self, key, extension, create):
+        """
+        Returns the cached file of ``key`` opened for reading, storing the
+        bytes returned by ``create()`` first when it is not cached.
+        """
+        path = self.get_path(key, extension)
+        while True:
+            file = self.open(path)
+            if file is not None:
+                return file
+
+            with self.lock:
+                future = self.pending.get(key)
+                if future is None:
+                    future = self.pending[key] = futures.Future()
+                    break
+            # Raises the error of the thread making it; retries if the file
+            # was evicted in the meantime.
+            future.result()
+
+        try:
+            with self.lock_file(key[:2]):
+                file = self.open(path)
+                if file is None:
+                    content = create()
+                    self.write(path, content)
+                    file = self.open(path) or io.BytesIO(content)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(None)
+        finally:
+            with self.lock:
+                del self.pending[key]
+        return file
+
+    @contextlib.contextmanager
+    def lock_file(self, name, blocking=True):
+        """
+        Holds an exclusive lock on the lock file ``name`` shared by all
+        processes, yielding False when ``blocking`` is False and the lock is
+        taken.
+        """
+        lock_dir = self.directory / base_constants.ImageConstants.RESIZE_CACHE_LOCK_DIR
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        with open(lock_dir / f"{name}.lock", "a") as lock_file:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                yield False
+                return
+            # Closing the file releases the lock.
+            yield True
+
+    def write(self, path, content):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as file:
+            try:
+                file.write(content)
+            except BaseException:
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, path)
+
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self.scan())
+            else:
+                self.size += len(content)
+            over_budget = self.size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def scan(self):
+        """
+        Returns the modification time, size and path of every cached file.
+        """
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or len(entry.name) != 2:
+                continue
+            for file in os.scandir(entry.path):
+                if file.name.endswith(".tmp"):
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    stat = file.stat()
+                    files.append((stat.st_mtime, stat.st_size, file.path))
+        return files
+
+    def evict(self):
+        """
+        Deletes the least recently used files until the cache is below its
+        low watermark. Skipped while another process is evicting.
+        """
+        with self.lock_file("evict", blocking=False) as locked:
+            if not locked:
+                return
+            files = self.scan()
+            size = sum(file_size for _, file_size, _ in files)
+            target = self.max_bytes * base_constants.ImageConstants.RESIZE_CACHE_LOW_WATERMARK
+            evicted = 0
+            for _, file_size, path in sorted(files):
+                if size <= target:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                    evicted += 1
+                size -= file_size
+            with self.lock:
+                self.size = size
+        logger.info("Evicted %s resized images, %s bytes cached", evicted, size)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResizedImageCache(
+                    settings.RESIZED_IMAGE_CACHE_DIR, settings.RESIZED_IMAGE_CACHE_MAX_BYTES
+                )
+    return _cache
+
+
+def get_key(name, modified_time, width, image_format):
+    """
+    Returns the cache key of a resized image. It includes the modification
+    time of the source, so that replacing a file does not serve stale sizes.
+    """
+    source = f"{name}\0{modified_time.timestamp()}\0{width}\0{image_format}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def get_resized(name, key, width, image_format):
+    """
+    Returns the image ``name`` from the media storage resized to ``width``
+    and encoded as ``image_format``, as a file opened for reading. The resize
+    runs in the image variant pool when there is one.
+    """
+
+    def create():
+        with default_storage.open(name, "rb") as file:
+            source = file.read()
+        pool = base_images.get_pool()
+        if pool is None:
+            return base_images.resize(source, width, image_format)
+        return pool.result(pool.submit(base_images.resize, source, width, image_format))
+
+    extension = base_constants.ImageConstants.EXTENSIONS[image_format]
+    return get_cache().get_or_create(key, extension, create)
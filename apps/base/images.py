@@ -0,0 +1,271 @@
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import posixpath
+import threading
+from concurrent import futures
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections as db_connections
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+
+from apps.base import constants as base_constants
+from apps.base import utils as base_utils
+
+logger = logging.getLogger(__name__)
+
+# Pillow is only needed when an image is resized.
+Image = base_utils.LazyModule("PIL.Image")
+ImageOps = base_utils.LazyModule("PIL.ImageOps")
+
+# Sent with the model class as sender and ``pk`` after the variants of an
+# instance were stored, which bypasses ``save()`` and its signals.
+variants_saved = Signal()
+
+
+def render(source, width, height, image_format):
+    """
+    Returns ``source`` image bytes scaled and center-cropped to exactly
+    ``width`` x ``height``, encoded as ``image_format`` ("webp" or "jpeg").
+
+    Pure Pillow work without Django, so that it can run in a worker process.
+    """
+    with Image.open(io.BytesIO(source)) as image:
+        # Lets JPEGs decode at a fraction of their size; the larger side
+        # keeps both dimensions big enough whichever way EXIF rotates them.
+        image.draft("RGB", (max(width, height),) * 2)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, **base_constants.ImageConstants.ENCODER_OPTIONS[image_format])
+    return output.getvalue()
+
+
+def resize(source, width, image_format):
+    """
+    Returns ``source`` image bytes scaled down to ``width`` with its aspect
+    ratio kept, encoded as ``image_format``. Narrower images keep their size.
+    """
+    with Image.open(io.BytesIO(source)) as image:
+        image.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, **base_constants.ImageConstants.ENCODER_OPTIONS[image_format])
+    return output.getvalue()
+
+
+def render_all(source, specs):
+    """
+    Renders every variant in ``specs``, a mapping of variant name to
+    (width, height), in every output format.
+
+    Returns a mapping of variant name to a mapping of format to bytes.
+    """
+    return {
+        name: {
+            image_format: render(source, width, height, image_format)
+            for image_format in base_constants.ImageConstants.FORMATS
+        }
+        for name, (width, height) in specs.items()
+    }
+
+
+def get_variant_name(source_name, content, image_format):
+    """
+    Returns the storage name of a variant: a hash of its content in a
+    ``variants`` directory next to the source, so that names change whenever
+    the content does and the files can be cached forever.
+    """
+    digest = hashlib.sha256(content).hexdigest()[: base_constants.ImageConstants.HASH_LENGTH]
+    extension = base_constants.ImageConstants.EXTENSIONS[image_format]
+    return posixpath.join(posixpath.dirname(source_name), "variants", f"{digest}.{extension}")
+
+
+def store(source_name, rendered):
+    """
+    Saves rendered variants and returns the variants mapping kept on the
+    model: the source they were made from and the storage name of each
+    variant per format.
+    """
+    variants = {"source": source_name}
+    for name, encoded in rendered.items():
+        variants[name] = {}
+        for image_format, content in encoded.items():
+            file_name = get_variant_name(source_name, content, image_format)
+            if not default_storage.exists(file_name):
+                file_name = default_storage.save(file_name, ContentFile(content))
+            variants[name][image_format] = file_name
+    return variants
+
+
+def get_variant_urls(variants, request=None):
+    """
+    Returns the absolute URL of every stored variant, by variant name and
+    format, or an empty mapping while the variants are still being made.
+    """
+    urls = {}
+    for name, files in variants.items():
+        if name == "source":
+            continue
+        urls[name] = {}
+        for image_format, file_name in files.items():
+            url = default_storage.url(file_name)
+            urls[name][image_format] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+class VariantPool:
+    """
+    Worker processes that render images, so that decoding and
+    resizing large uploads takes neither the request thread nor the GIL
+    of the web worker.
+
+    Workers are started with ``spawn`` as the web worker may be running
+    threads when the pool is created. A pool whose worker died is replaced
+    on next use.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        broken (bool): A worker died and the pool can no longer be used.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.broken = False
+        self.executor = futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def submit(self, func, *args):
+        try:
+            return self.executor.submit(func, *args)
+        except futures.BrokenExecutor:
+            self.broken = True
+            raise
+
+    def result(self, future):
+        try:
+            return future.result()
+        except futures.BrokenExecutor:
+            self.broken = True
+            raise
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the variant pool of this process, or None when variants are
+    rendered on the calling thread (IMAGE_VARIANT_WORKERS = 0).
+    """
+    global _pool, _pool_pid
+
+    if not settings.IMAGE_VARIANT_WORKERS:
+        return None
+
+    pid = os.getpid()
+    if _pool_pid != pid or _pool.broken:
+        with _pool_lock:
+            if _pool_pid != pid or _pool.broken:
+                _pool = VariantPool(settings.IMAGE_VARIANT_WORKERS)
+                _pool_pid = pid
+    return _pool
+
+
+def needs_variants(instance, field_name, variants_field_name):
+    image = getattr(instance, field_name)
+    variants = getattr(instance, variants_field_name) or {}
+    return (image.name or None) != variants.get("source")
+
+
+def generate(instance, field_name, variants_field_name, specs, wait=False):
+    """
+    Renders the variants of an image field of ``instance`` in the variant
+    pool and stores them in ``variants_field_name`` once done.
+
+    The row is only updated if the image is still the one the variants were
+    made from, so a slow render cannot overwrite the variants of a newer
+    upload. With ``wait`` the call returns when the variants are stored.
+
+    Returns False when the variants could not be made, which is logged, and
+    None when they are still being made.
+    """
+    model = type(instance)
+    image = getattr(instance, field_name)
+    source_name = image.name or None
+    database = instance._state.db
+
+    def save(variants):
+        if source_name is None:
+            unchanged = Q(**{field_name: ""}) | Q(**{f"{field_name}__isnull": True})
+        else:
+            unchanged = Q(**{field_name: source_name})
+        updated = (
+            model.objects.using(database)
+            .filter(unchanged, pk=instance.pk)
+            .update(**{variants_field_name: variants})
+        )
+        if updated:
+            variants_saved.send(sender=model, pk=instance.pk)
+
+    if source_name is None:
+        save({})
+        return True
+
+    def finish(future, pool):
+        try:
+            save(store(source_name, pool.result(future)))
+        except Exception:
+            logger.exception("Could not make the variants of %s", source_name)
+        finally:
+            # Runs on a thread of the pool, whose connections no request closes.
+            db_connections.close_all()
+
+    try:
+        with image.open("rb") as file:
+            source = file.read()
+
+        pool = get_pool()
+        if pool is None or wait:
+            rendered = (
+                render_all(source, specs)
+                if pool is None
+                else pool.result(pool.submit(render_all, source, specs))
+            )
+            save(store(source_name, rendered))
+            return True
+
+        pool.submit(render_all, source, specs).add_done_callback(
+            lambda future: finish(future, pool)
+        )
+    except Exception:
+        logger.exception("Could not make the variants of %s", source_name)
+        return False
+    return None
+
+
+def generate_on_commit(instance, field_name, variants_field_name, specs):
+    """
+    Schedules the variants of an image field of a saved instance to be made
+    after the transaction commits, when its image has changed since the
+    variants were last made.
+    """
+    if needs_variants(instance, field_name, variants_field_name):
+        transaction.on_commit(
+            lambda: generate(instance, field_name, variants_field_name, specs),
+            using=instance._state.db,
+        )
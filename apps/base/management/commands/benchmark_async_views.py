@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+
+from apps.base import benchmarks as base_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Compares requests per second and latency of the read endpoints served
+    by the sync views under WSGI and ASGI, and by the async views under
+    ASGI (ASYNC_READ_VIEWS).
+
+    Each configuration is served by a fresh server subprocess because the
+    views are chosen when the URL conf is loaded. The default server
+    commands need gunicorn and uvicorn; both should get the same number of
+    worker processes for a fair comparison.
+
+    Usage:
+        python manage.py benchmark_async_views --concurrency 64
+        python manage.py benchmark_async_views --path /api/movies/1/ --path /api/cinemas/1/ \\
+            --asgi-server "uvicorn bookmyshow.asgi:application --port {port} --workers 4"
+    """
+
+    help = "Benchmarks the read endpoints with sync views and with async views under ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Endpoint to load; may be repeated. Defaults to /api/movies/ and /api/genres/.",
+        )
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--warmup", type=int, default=200)
+        parser.add_argument(
+            "--wsgi-server",
+            default="gunicorn bookmyshow.wsgi -b 127.0.0.1:{port} -w 4 --threads 16",
+            help="WSGI server command line; {port} is replaced with a free port.",
+        )
+        parser.add_argument(
+            "--asgi-server",
+            default="uvicorn bookmyshow.asgi:application --port {port} --workers 4",
+            help="ASGI server command line; {port} is replaced with a free port.",
+        )
+
+    def handle(self, *args, **options):
+        configurations = [
+            ("sync views, WSGI", options["wsgi_server"], {"ASYNC_READ_VIEWS": "False"}),
+            ("sync views, ASGI", options["asgi_server"], {"ASYNC_READ_VIEWS": "False"}),
+            ("async views, ASGI", options["asgi_server"], {"ASYNC_READ_VIEWS": "True"}),
+        ]
+        paths = options["paths"] or ["/api/movies/", "/api/genres/"]
+
+        rows = []
+        for label, command, environment in configurations:
+            self.stdout.write(f"Running: {label}")
+            with base_benchmarks.ServerProcess(command, environment) as server:
+                for path in paths:
+                    url = server.url(path)
+                    base_benchmarks.run_load(url, options["warmup"], options["concurrency"])
+                    result = base_benchmarks.run_load(
+                        url, options["requests"], options["concurrency"]
+                    )
+                    rows.append(result.as_row(f"{label}: {path}"))
+
+        self.stdout.write(base_benchmarks.format_table(rows))
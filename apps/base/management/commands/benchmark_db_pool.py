@@ -0,0 +1,56 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.base import benchmarks as base_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Compares requests per second and latency of an endpoint with database
+    connection pooling off and on.
+
+    Each configuration is served by a fresh server subprocess because the
+    pool settings are read at startup.
+
+    Usage:
+        python manage.py benchmark_db_pool --path /api/genres/ --requests 5000
+        python manage.py benchmark_db_pool \\
+            --server "gunicorn bookmyshow.wsgi -b 127.0.0.1:{port} -w 4 --threads 8"
+    """
+
+    help = "Benchmarks an endpoint with database connection pooling off and on."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/genres/")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument(
+            "--server",
+            default=f"{sys.executable} {settings.BASE_DIR / 'manage.py'} runserver "
+            "127.0.0.1:{port} --noreload",
+            help="Server command line; {port} is replaced with a free port.",
+        )
+
+    def handle(self, *args, **options):
+        configurations = [
+            (
+                "no pooling, new connection per request",
+                {"DB_POOL_ENABLED": "False", "CONN_MAX_AGE": "0"},
+            ),
+            ("persistent connections", {"DB_POOL_ENABLED": "False"}),
+            ("connection pool", {"DB_POOL_ENABLED": "True"}),
+        ]
+
+        rows = []
+        for label, environment in configurations:
+            self.stdout.write(f"Running: {label}")
+            with base_benchmarks.ServerProcess(options["server"], environment) as server:
+                url = server.url(options["path"])
+                base_benchmarks.run_load(url, options["warmup"], options["concurrency"])
+                result = base_benchmarks.run_load(url, options["requests"], options["concurrency"])
+            rows.append(result.as_row(label))
+
+        self.stdout.write(base_benchmarks.format_table(rows))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+
+from apps.base import images as base_images
+from apps.cinema import constants as cinema_constants
+from apps.cinema import models as cinema_models
+from apps.movie import constants as movie_constants
+from apps.movie import models as movie_models
+from apps.user import constants as user_constants
+from apps.user import models as user_models
+
+# Model, image field, variants field and variant sizes of every image kept
+# with resized variants.
+IMAGE_FIELDS = {
+    "posters": (
+        movie_models.Movie,
+        "poster",
+        "poster_variants",
+        movie_constants.MovieConstants.POSTER_VARIANTS,
+    ),
+    "cinemas": (
+        cinema_models.Cinema,
+        "image",
+        "image_variants",
+        cinema_constants.CinemaConstants.IMAGE_VARIANTS,
+    ),
+    "avatars": (
+        user_models.User,
+        "profile_picture",
+        "profile_picture_variants",
+        user_constants.UserConstants.PROFILE_PICTURE_VARIANTS,
+    ),
+}
+
+
+class Command(BaseCommand):
+    """
+    Makes the resized variants of images uploaded before variants existed,
+    or whose variants are missing or outdated, e.g. after the variant sizes
+    changed (use ``--all``).
+
+    Usage:
+        python manage.py generate_image_variants
+        python manage.py generate_image_variants --only posters --all
+    """
+
+    help = "Makes missing resized variants of posters, cinema images and profile pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=IMAGE_FIELDS, action="append")
+        parser.add_argument("--all", action="store_true", help="Remake existing variants too.")
+
+    def handle(self, *args, **options):
+        for kind in options["only"] or IMAGE_FIELDS:
+            model, field_name, variants_field_name, specs = IMAGE_FIELDS[kind]
+            queryset = model.objects.exclude(**{field_name: ""}).exclude(
+                **{f"{field_name}__isnull": True}
+            )
+
+            generated = failed = 0
+            for instance in queryset.iterator():
+                if not options["all"] and not base_images.needs_variants(
+                    instance, field_name, variants_field_name
+                ):
+                    continue
+                if base_images.generate(
+                    instance, field_name, variants_field_name, specs, wait=True
+                ):
+                    generated += 1
+                else:
+                    failed += 1
+            self.stdout.write(f"{kind}: made variants of {generated} images, {failed} failed.")
@@ -0,0 +1,131 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from apps.base import constants as base_constants
+from apps.base import models as base_models
+from apps.base import sharding as base_sharding
+from apps.booking import models as booking_models
+from apps.cinema import models as cinema_models
+from apps.slot import models as slot_models
+
+
+class Command(BaseCommand):
+    """
+    Moves the seats, slots and bookings of a city to another database and
+    points the city at it.
+
+    Rows are copied in primary-key batches inside a single transaction on
+    the target, counted, and only then deleted from the source in batches.
+    Rows keep their IDs, which are unique across databases. Booking for the
+    city must be paused while it is moved, as writes that reach the source
+    after the copy would be lost.
+
+    Usage:
+        python manage.py move_city_shard mumbai shard_1
+        python manage.py move_city_shard 3 default --batch-size 5000
+    """
+
+    help = "Moves a city's seats, slots and bookings to another database shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument("city", help="City ID or name.")
+        parser.add_argument("database", help="Target database alias, e.g. shard_1 or default.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=base_constants.ShardingConstants.MOVE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        city = self.get_city(options["city"])
+        target = options["database"]
+        batch_size = options["batch_size"]
+
+        if target not in base_sharding.get_databases():
+            raise CommandError(base_constants.ErrorMessages.UNKNOWN_SHARD.format(alias=target))
+
+        source = city.shard or base_sharding.PRIMARY_ALIAS
+        if source == target:
+            self.stdout.write(f"{city} is already on {target}.")
+            return
+
+        cinema_ids = list(
+            cinema_models.Cinema.objects.using(base_sharding.PRIMARY_ALIAS)
+            .filter(city=city)
+            .values_list("id", flat=True)
+        )
+        through = booking_models.Booking.seats.through
+        tables = [
+            (cinema_models.Seat, {"cinema_id__in": cinema_ids}),
+            (slot_models.Slot, {"cinema_id__in": cinema_ids}),
+            (booking_models.Booking, {"slot__cinema_id__in": cinema_ids}),
+            (through, {"booking__slot__cinema_id__in": cinema_ids}),
+        ]
+
+        self.stdout.write(f"Copying {city} from {source} to {target}")
+        with db_transaction.atomic(using=target):
+            for model, filters in tables:
+                queryset = model.objects.using(source).filter(**filters)
+                copied = self.copy(queryset, target, batch_size)
+                expected = queryset.count()
+                if copied != expected:
+                    raise CommandError(
+                        f"Copied {copied} of {expected} {model._meta.label} rows; "
+                        "the city was left on its current database."
+                    )
+                self.stdout.write(f"  {model._meta.label}: {copied}")
+
+        slot_ids = list(
+            slot_models.Slot.objects.using(target)
+            .filter(cinema_id__in=cinema_ids)
+            .values_list("id", flat=True)
+        )
+        base_models.City.objects.using(base_sharding.PRIMARY_ALIAS).filter(pk=city.pk).update(
+            shard="" if target == base_sharding.PRIMARY_ALIAS else target
+        )
+        base_sharding.invalidate_city_shards()
+        base_sharding.invalidate_slots(slot_ids)
+
+        self.stdout.write(f"Deleting {city} from {source}")
+        for model, filters in reversed(tables):
+            self.delete(model.objects.using(source).filter(**filters), batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f"{city} is now on {target}."))
+
+    def get_city(self, value):
+        queryset = base_models.City.objects.using(base_sharding.PRIMARY_ALIAS)
+        lookup = {"pk": int(value)} if value.isdigit() else {"name": value.lower().strip()}
+        try:
+            return queryset.get(**lookup)
+        except base_models.City.DoesNotExist:
+            raise CommandError(f"City '{value}' does not exist.")
+
+    def copy(self, queryset, target, batch_size):
+        """
+        Inserts every row of ``queryset`` into ``target`` in batches and
+        returns the number of rows copied.
+        """
+        manager = queryset.model.objects.using(target)
+        copied = 0
+        batch = []
+        for row in queryset.order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                copied += len(manager.bulk_create(batch))
+                batch = []
+        if batch:
+            copied += len(manager.bulk_create(batch))
+        return copied
+
+    def delete(self, queryset, batch_size):
+        """
+        Deletes the rows of ``queryset`` in short transactions of at most
+        ``batch_size`` rows.
+        """
+        model = queryset.model
+        while True:
+            pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return
+            with db_transaction.atomic(using=queryset.db):
+                model.objects.using(queryset.db).filter(pk__in=pks).delete()
@@ -0,0 +1,174 @@
+import collections
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.base import benchmarks as base_benchmarks
+
+# Run in a fresh interpreter: loads the WSGI application like a server worker
+# does, then serves one request, and prints wall-clock timestamps as JSON.
+BOOT_SCRIPT = """
+import io, json, sys, time
+started = time.time()
+from bookmyshow.wsgi import application
+ready = time.time()
+from wsgiref.util import setup_testing_defaults
+path, _, query = sys.argv[1].partition("?")
+environ = {"PATH_INFO": path, "QUERY_STRING": query, "wsgi.input": io.BytesIO()}
+setup_testing_defaults(environ)
+statuses = []
+b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+print(json.dumps({
+    "started": started, "ready": ready, "responded": time.time(), "status": statuses[0],
+}))
+"""
+
+
+def parse_import_times(output):
+    """
+    Returns the self and cumulative import time in milliseconds of every
+    module in ``python -X importtime`` output.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return modules
+
+
+class Command(BaseCommand):
+    """
+    Measures how fast a new server worker becomes ready: interpreter start,
+    loading the WSGI application and serving a first request, plus the
+    import time of every module on the way.
+
+    Each run starts a fresh interpreter; medians of ``--runs`` runs are
+    reported after one discarded run that compiles bytecode. ``--preload``
+    adds runs with STARTUP_PRELOAD enabled for comparison.
+
+    Usage:
+        python manage.py profile_startup
+        python manage.py profile_startup --path /api/movies/ --runs 10 --preload
+    """
+
+    help = "Reports worker startup time, time to first request and import time per module."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/genres/", help="Path of the first request.")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=20, help="Modules listed.")
+        parser.add_argument("--preload", action="store_true", help="Also run with preloading.")
+
+    def handle(self, *args, **options):
+        configurations = [("default", {"STARTUP_PRELOAD": "False"})]
+        if options["preload"]:
+            configurations.append(("preload", {"STARTUP_PRELOAD": "True"}))
+
+        rows = []
+        import_times = None
+        for label, environment in configurations:
+            self.boot(options["path"], environment)
+            runs = [self.boot(options["path"], environment) for _ in range(options["runs"])]
+            rows.append(
+                {
+                    "configuration": label,
+                    "status": runs[-1]["status"],
+                    "interpreter_ms": self.median(runs, "interpreter_ms"),
+                    "application_ms": self.median(runs, "application_ms"),
+                    "first_request_ms": self.median(runs, "first_request_ms"),
+                    "total_ms": self.median(runs, "total_ms"),
+                }
+            )
+            if import_times is None:
+                import_times = [run["imports"] for run in runs]
+
+        self.stdout.write(base_benchmarks.format_table(rows))
+        self.stdout.write("")
+        self.stdout.write(
+            base_benchmarks.format_table(self.summarize_packages(import_times, options["top"]))
+        )
+        self.stdout.write("")
+        self.stdout.write(
+            base_benchmarks.format_table(self.summarize_modules(import_times, options["top"]))
+        )
+
+    def boot(self, path, environment):
+        """
+        Starts a fresh interpreter that loads the application and serves
+        one request, and returns its phase timings and import times.
+        """
+        spawned = time.time()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT, path],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **environment},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"The application failed to start:\n{process.stderr[-2000:]}")
+
+        timings = json.loads(process.stdout.strip().splitlines()[-1])
+        return {
+            "status": timings["status"],
+            "interpreter_ms": (timings["started"] - spawned) * 1000,
+            "application_ms": (timings["ready"] - timings["started"]) * 1000,
+            "first_request_ms": (timings["responded"] - timings["ready"]) * 1000,
+            "total_ms": (timings["responded"] - spawned) * 1000,
+            "imports": parse_import_times(process.stderr),
+        }
+
+    def median(self, runs, key):
+        return round(statistics.median(run[key] for run in runs), 1)
+
+    def summarize_packages(self, import_times, top):
+        """
+        Returns the ``top`` top-level packages with the highest median
+        import time, the sum of their modules' own times.
+        """
+        per_run = []
+        for modules in import_times:
+            totals = collections.Counter()
+            for name, (own, _) in modules.items():
+                totals[name.partition(".")[0]] += own
+            per_run.append(totals)
+
+        packages = set().union(*per_run)
+        rows = [
+            {
+                "package": package,
+                "import_ms": round(statistics.median(totals[package] for totals in per_run), 1),
+            }
+            for package in packages
+        ]
+        rows.sort(key=lambda row: row["import_ms"], reverse=True)
+        return rows[:top]
+
+    def summarize_modules(self, import_times, top):
+        """
+        Returns the ``top`` modules with the highest median cumulative
+        import time, which includes the modules they import.
+        """
+        names = set().union(*import_times)
+        rows = [
+            {
+                "module": name,
+                "self_ms": round(
+                    statistics.median(modules.get(name, (0, 0))[0] for modules in import_times), 1
+                ),
+                "cumulative_ms": round(
+                    statistics.median(modules.get(name, (0, 0))[1] for modules in import_times), 1
+                ),
+            }
+            for name in names
+        ]
+        rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+        return rows[:top]
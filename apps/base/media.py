@@ -0,0 +1,182 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import cache as cache_utils
+from django.utils import http as http_utils
+
+from apps.base import constants as base_constants
+
+
+class FileRange:
+    """
+    File-like view of ``length`` bytes of an open file from ``start``.
+
+    The underlying file is positioned at ``start`` and ``fileno()`` is
+    exposed, so that a WSGI server whose ``wsgi.file_wrapper`` uses
+    ``os.sendfile`` (gunicorn) hands the range to the kernel, sending
+    Content-Length bytes from the current offset. Other servers read it.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+        file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Returns the (start, end) byte offsets, end inclusive, requested by a
+    Range header for a file of ``size`` bytes.
+
+    Returns None when the whole file should be sent: no header, a header
+    that is not a single byte range, or several ranges, which are allowed
+    to be answered with the full file. Raises ValueError when the range
+    cannot be satisfied.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last ``last`` bytes.
+        length = int(last)
+        if not length or not size:
+            raise ValueError
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError
+    return start, end
+
+
+def is_content_hashed(name):
+    return re.search(base_constants.MediaConstants.CONTENT_HASHED_NAME, name) is not None
+
+
+def get_etag(name, stat):
+    if is_content_hashed(name):
+        digest = os.path.splitext(os.path.basename(name))[0]
+        return f'"{digest}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def if_range_matches(request, etag, last_modified):
+    """
+    Returns whether a Range should be honoured under the request's If-Range
+    header, which names the representation the client holds a part of.
+    """
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return http_utils.parse_http_date_safe(if_range) == last_modified
+
+
+def serve(request, name):
+    """
+    Returns the response for the file ``name`` of MEDIA_ROOT.
+
+    Conditional requests are answered from ``stat()`` alone. The body is
+    never read by Python: it is handed to the front server with
+    X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd) when
+    MEDIA_SENDFILE is set, and otherwise to the WSGI server's
+    ``wsgi.file_wrapper``, which sends it with ``os.sendfile`` where
+    available. Single byte ranges are served as 206 responses.
+
+    Content-hashed files, whose names change with their content, are cached
+    for a year; other files for MEDIA_MAX_AGE seconds.
+
+    Raises:
+        Http404: The file does not exist or is outside MEDIA_ROOT.
+    """
+    try:
+        path = default_storage.path(name)
+        stat = os.stat(path)
+    except (OSError, SuspiciousFileOperation, NotImplementedError):
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    etag = get_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    response = cache_utils.get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_file_response(request, name, path, stat.st_size, etag, last_modified)
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_utils.http_date(last_modified)
+    if is_content_hashed(name):
+        cache_utils.patch_cache_control(
+            response,
+            public=True,
+            max_age=base_constants.MediaConstants.IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    else:
+        cache_utils.patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+    return response
+
+
+def get_file_response(request, name, path, size, etag, last_modified):
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    if settings.MEDIA_SENDFILE:
+        try:
+            header = base_constants.MediaConstants.SENDFILE_HEADERS[settings.MEDIA_SENDFILE]
+        except KeyError:
+            raise ImproperlyConfigured(f"Unknown MEDIA_SENDFILE: {settings.MEDIA_SENDFILE}")
+        # The front server answers Range requests itself.
+        response = HttpResponse(content_type=content_type)
+        if header == "X-Accel-Redirect":
+            response.headers[header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        else:
+            response.headers[header] = path
+        return response
+
+    try:
+        byte_range = (
+            parse_range(request.headers.get("Range"), size)
+            if if_range_matches(request, etag, last_modified)
+            else None
+        )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1), status=206, content_type=content_type
+        )
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.headers["Content-Length"] = end - start + 1
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
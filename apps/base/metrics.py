@@ -0,0 +1,61 @@
+import collections
+import threading
+
+from django.db import connections as db_connections
+
+_counters = collections.Counter()
+_counters_lock = threading.Lock()
+
+
+def increment(name, amount=1):
+    """
+    Increments a process-local counter.
+    """
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def get_counters():
+    """
+    Returns a copy of every process-local counter.
+    """
+    with _counters_lock:
+        return dict(_counters)
+
+
+def get_pool_stats():
+    """
+    Returns utilization and wait-time statistics for every database alias
+    served through a connection pool in this process.
+    """
+    pool_stats = {}
+
+    for connection in db_connections.all():
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+
+        stats = pool.get_stats()
+        in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        queued = stats.get("requests_queued", 0)
+
+        pool_stats[connection.alias] = {
+            "size": stats.get("pool_size", 0),
+            "max_size": stats.get("pool_max", 0),
+            "in_use": in_use,
+            "available": stats.get("pool_available", 0),
+            "utilization": round(in_use / stats["pool_max"], 3) if stats.get("pool_max") else 0,
+            "requests": stats.get("requests_num", 0),
+            "requests_waiting": stats.get("requests_waiting", 0),
+            "requests_queued": queued,
+            "requests_errors": stats.get("requests_errors", 0),
+            "total_wait_ms": stats.get("requests_wait_ms", 0),
+            "average_wait_ms": (
+                round(stats.get("requests_wait_ms", 0) / queued, 3) if queued else 0
+            ),
+            "connections_opened": stats.get("connections_num", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+            "returns_bad": stats.get("returns_bad", 0),
+        }
+
+    return pool_stats
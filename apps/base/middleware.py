@@ -0,0 +1,341 @@
+import contextlib
+import logging
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import OperationalError
+from django.db import connections as db_connections
+from django.http import JsonResponse
+from psycopg import errors as psycopg_errors
+from psycopg_pool import PoolTimeout, TooManyRequests
+from rest_framework import permissions as rest_permissions
+
+from apps.base import constants as base_constants
+from apps.base import metrics as base_metrics
+from apps.base import profiler as base_profiler
+from apps.base import routers as base_routers
+from apps.base import slow_queries as base_slow_queries
+from apps.base import statement_timeouts as base_statement_timeouts
+from apps.base import tracing as base_tracing
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively on both the WSGI and the ASGI
+    stack, so that async views are not pushed back onto a thread.
+
+    Subclasses implement ``__call__`` for the sync stack and ``__acall__``
+    for the async one, and start ``__call__`` with
+    ``if self.is_async: return self.__acall__(request)``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class SlowQueryLogMiddleware(AsyncCapableMiddleware):
+    """
+    Installs a SlowQueryLogger on every database connection for the
+    duration of each request.
+
+    The middleware removes itself from the stack when
+    SLOW_QUERY_LOG_ENABLED is off.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        with self.install_loggers(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Sync code and the async ORM calls of the request run on its worker
+        # thread, which has connection objects of its own.
+        loggers = await sync_to_async(self.install_loggers)(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(loggers.close)()
+
+    def install_loggers(self, request):
+        stack = contextlib.ExitStack()
+        for connection in db_connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(base_slow_queries.SlowQueryLogger(connection, request))
+            )
+        return stack
+
+
+class ProfilerMiddleware(AsyncCapableMiddleware):
+    """
+    Lets staff users profile any request by adding the ``_profile`` query
+    parameter. The response is replaced by a CPU, memory and SQL report.
+
+    Requests without the flag only pay for a substring check on the raw
+    query string; authentication is only attempted when the flag is present.
+    On the async stack a profiled request runs synchronously on a thread.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if not base_profiler.is_profiling_requested(request):
+            return self.get_response(request)
+
+        if not base_profiler.is_staff_request(request):
+            return self.get_response(request)
+
+        return base_profiler.RequestProfiler(request).run(self.get_response)
+
+    async def __acall__(self, request):
+        if not base_profiler.is_profiling_requested(request):
+            return await self.get_response(request)
+
+        if not await sync_to_async(base_profiler.is_staff_request)(request):
+            return await self.get_response(request)
+
+        profiler = base_profiler.RequestProfiler(request)
+        return await sync_to_async(profiler.run)(async_to_sync(self.get_response))
+
+
+class TracingMiddleware(AsyncCapableMiddleware):
+    """
+    Records a trace for a sampled fraction of requests and exports it in
+    OpenTelemetry JSON format to the tracing log.
+
+    The root span covers the whole request; database statements, view
+    phases, serialization and rendering are recorded as nested spans.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TRACING_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if not base_tracing.should_sample():
+            return self.get_response(request)
+
+        trace, token = base_tracing.start_trace()
+        try:
+            with self.install_query_spans(), self.start_request_span(request) as root:
+                response = self.get_response(request)
+            self.finish_request_span(trace, root, request, response)
+        finally:
+            base_tracing.finish_trace(trace, token)
+        return response
+
+    async def __acall__(self, request):
+        if not base_tracing.should_sample():
+            return await self.get_response(request)
+
+        trace, token = base_tracing.start_trace()
+        try:
+            # Installed on the request's worker thread, which has connection
+            # objects of its own, like SlowQueryLogMiddleware does.
+            query_spans = await sync_to_async(self.install_query_spans)()
+            try:
+                with self.start_request_span(request) as root:
+                    response = await self.get_response(request)
+            finally:
+                await sync_to_async(query_spans.close)()
+            self.finish_request_span(trace, root, request, response)
+        finally:
+            base_tracing.finish_trace(trace, token)
+        return response
+
+    def install_query_spans(self):
+        """
+        Records a span for each database statement, nested under the span
+        active when it runs.
+        """
+        stack = contextlib.ExitStack()
+        for connection in db_connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(base_tracing.QuerySpanWrapper(connection))
+            )
+        return stack
+
+    def start_request_span(self, request):
+        return base_tracing.span(
+            request.method,
+            kind=base_constants.TracingConstants.SPAN_KIND_SERVER,
+            **{"http.method": request.method, "http.target": request.path},
+        )
+
+    def finish_request_span(self, trace, root, request, response):
+        resolver_match = getattr(request, "resolver_match", None)
+        route = resolver_match.route if resolver_match else request.path
+        trace.update_span(
+            root.index,
+            f"{request.method} {route}",
+            **{"http.route": route, "http.status_code": response.status_code},
+        )
+
+
+class DatabaseOverloadMiddleware(AsyncCapableMiddleware):
+    """
+    Turns database capacity errors raised by a view into a 503 response
+    with a Retry-After header instead of a server error, and counts them.
+
+    Handled errors:
+        - No pooled connection became free within DB_POOL_TIMEOUT, or the
+          pool wait queue was full (DB_POOL_MAX_WAITING).
+        - A statement ran past the query time budget of the request (see
+          StatementTimeoutMiddleware) and was cancelled by PostgreSQL.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, OperationalError):
+            return None
+
+        if isinstance(exception.__cause__, (PoolTimeout, TooManyRequests)):
+            metric = base_constants.MetricNames.DB_POOL_EXHAUSTED
+        elif isinstance(exception.__cause__, psycopg_errors.QueryCanceled):
+            metric = base_constants.MetricNames.DB_STATEMENT_TIMEOUT
+            logger.warning(
+                "Statement cancelled after %s ms on %s %s",
+                base_statement_timeouts.current_timeout(),
+                request.method,
+                request.path,
+            )
+        else:
+            return None
+
+        base_metrics.increment(metric)
+        return JsonResponse(
+            {"message": base_constants.ErrorMessages.DATABASE_BUSY},
+            status=503,
+            headers={"Retry-After": str(base_constants.DatabaseConstants.RETRY_AFTER_SECONDS)},
+        )
+
+
+class ReadReplicaMiddleware(AsyncCapableMiddleware):
+    """
+    Decides per request whether ReadReplicaRouter may serve reads from a
+    replica.
+
+    Reads go to a replica only for safe methods on views that declare
+    ``read_replica = True``, and only when the client has not written
+    within the last REPLICA_PIN_SECONDS. Any request that writes pins its
+    client to the primary for that window.
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        state = base_routers.RoutingState()
+        token = base_routers.activate(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            base_routers.deactivate(token)
+
+        if state.wrote or request.method not in rest_permissions.SAFE_METHODS:
+            base_routers.pin_to_primary(request)
+
+        return response
+
+    async def __acall__(self, request):
+        state = base_routers.RoutingState()
+        token = base_routers.activate(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            base_routers.deactivate(token)
+
+        if state.wrote or request.method not in rest_permissions.SAFE_METHODS:
+            await sync_to_async(base_routers.pin_to_primary)(request)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        if (
+            request.method in rest_permissions.SAFE_METHODS
+            and getattr(view_class, "read_replica", False)
+            and not base_routers.is_pinned_to_primary(request)
+        ):
+            base_routers.current_state().use_replica = True
+        return None
+
+
+class StatementTimeoutMiddleware(AsyncCapableMiddleware):
+    """
+    Gives every API request a query time budget, applied as the PostgreSQL
+    statement_timeout of each connection it uses, so that one pathological
+    query cannot hold a connection for long.
+
+    The budget is set on connections already open when the view is
+    resolved, and on connections opened or checked out of the pool later
+    in the request. A cancelled statement ends the request with a 503 (see
+    DatabaseOverloadMiddleware).
+    """
+
+    def __init__(self, get_response):
+        if not (settings.DB_STATEMENT_TIMEOUT_READ_MS or settings.DB_STATEMENT_TIMEOUT_BOOKING_MS):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        token = base_statement_timeouts.activate(None)
+        try:
+            return self.get_response(request)
+        finally:
+            base_statement_timeouts.deactivate(token)
+
+    async def __acall__(self, request):
+        token = base_statement_timeouts.activate(None)
+        try:
+            return await self.get_response(request)
+        finally:
+            base_statement_timeouts.deactivate(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        timeout = base_statement_timeouts.get_view_timeout(view_class, request.method)
+        base_statement_timeouts.activate(timeout)
+        for connection in db_connections.all(initialized_only=True):
+            base_statement_timeouts.apply(connection, timeout)
+        return None
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_alter_city_options_alter_genre_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='shard',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from django.apps import apps
 from django.db import models as db_models
+from django.db.backends import signals as db_signals
+from django.dispatch import receiver
 
 from apps.base import constants as base_constants
+from apps.base import sharding as base_sharding
+from apps.base import statement_timeouts as base_statement_timeouts
 from apps.base import utils as base_utils
 
 
@@ -34,11 +39,20 @@ class City(base_utils.NormalizedNameMixin, TimeStampedModel):
 
     Attributes:
         name (str): Unique name of the city.
+        shard (str): Database alias holding the city's seats, slots and
+            bookings. Empty for the default database. Changed only by the
+            move_city_shard command, which also moves the rows.
     """
 
     name = db_models.CharField(
         max_length=base_constants.BaseConstants.CITY_NAME_MAX_LENGTH, unique=True
     )
+    shard = db_models.CharField(
+        max_length=base_constants.BaseConstants.SHARD_ALIAS_MAX_LENGTH,
+        blank=True,
+        default="",
+        editable=False,
+    )
 
     class Meta:
         verbose_name_plural = "Cities"
@@ -84,3 +98,44 @@ class Language(base_utils.NormalizedNameMixin, TimeStampedModel):
 
     def __str__(self):
         return self.name
+
+
+@receiver(db_models.signals.post_save, sender=City)
+def invalidate_city_shards(sender, instance, **kwargs):
+    """
+    Drops the cached city to shard mapping whenever a city changes.
+    """
+    base_sharding.invalidate_city_shards()
+
+
+@receiver(db_models.signals.post_migrate)
+def reserve_shard_id_blocks(sender, app_config, using, **kwargs):
+    """
+    Moves the primary-key sequences of sharded tables on a shard into the
+    shard's ID block after its tables are migrated.
+
+    Args:
+        sender (AppConfig): The migrated app.
+        app_config (AppConfig): The migrated app.
+        using (str): Alias of the migrated database.
+    """
+    models = [
+        model
+        for model in apps.get_app_config(app_config.label).get_models(include_auto_created=True)
+        if base_sharding.is_sharded(model)
+    ]
+    if models:
+        base_sharding.reserve_id_block(using, models)
+
+
+@receiver(db_signals.connection_created)
+def apply_statement_timeout(sender, connection, **kwargs):
+    """
+    Applies the query time budget of the current request to connections
+    opened, or checked out of the pool, while it runs.
+
+    Args:
+        sender (type): The database wrapper class.
+        connection (BaseDatabaseWrapper): The connection that was opened.
+    """
+    base_statement_timeouts.configure_connection(connection)
@@ -0,0 +1,217 @@
+import contextlib
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections as db_connections
+from django.http import JsonResponse
+from django.urls import reverse
+from rest_framework import exceptions as rest_exceptions
+from rest_framework_simplejwt import authentication as jwt_authentication
+
+from apps.base import constants as base_constants
+from apps.base import utils as base_utils
+
+# Only needed by profiled requests.
+cProfile = base_utils.LazyModule("cProfile")
+pstats = base_utils.LazyModule("pstats")
+tracemalloc = base_utils.LazyModule("tracemalloc")
+
+# tracemalloc is process-wide, so profiled requests are run one at a time.
+_profiling_lock = threading.Lock()
+
+
+def is_profiling_requested(request):
+    """
+    Cheap check for the profiling flag that avoids parsing the query string.
+    """
+    query_string = request.META.get("QUERY_STRING", "")
+    return base_constants.ProfilerConstants.QUERY_PARAM in query_string and (
+        base_constants.ProfilerConstants.QUERY_PARAM in request.GET
+    )
+
+
+def is_staff_request(request):
+    """
+    Returns True when the request is made by a staff user, authenticated
+    either by session or by a JWT access token.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+
+    try:
+        result = jwt_authentication.JWTAuthentication().authenticate(request)
+    except rest_exceptions.AuthenticationFailed:
+        return False
+
+    return result is not None and result[0].is_staff
+
+
+def get_artifact_path(profile_id):
+    """
+    Location of the stored cProfile dump for a profiled request.
+    """
+    return Path(settings.PROFILER_ARTIFACT_DIR) / f"{profile_id}.prof"
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording each statement of a profiled request
+    with its time. Unlike CaptureQueriesContext, installing it does not
+    connect to the database, so only databases the request uses are
+    touched.
+
+    Attributes:
+        connection (DatabaseWrapper): Connection the wrapper is installed on.
+        queries (list): Recorded statements as (SQL, seconds).
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if not many:
+                sql = self.connection.ops.last_executed_query(context["cursor"], sql, params)
+            self.queries.append((sql, duration))
+
+
+class RequestProfiler:
+    """
+    Runs a single request under cProfile, tracemalloc and query capture,
+    and replaces its response with a JSON report.
+
+    The raw cProfile dump is stored under PROFILER_ARTIFACT_DIR so it can be
+    downloaded through the profile artifact endpoint and opened locally.
+
+    Attributes:
+        request (HttpRequest): The request being profiled.
+        profile_id (UUID): Identifier of the stored artifact.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.profile_id = uuid.uuid4()
+
+    def run(self, get_response):
+        """
+        Serves the request with profiling enabled and returns the report.
+        """
+        with _profiling_lock, contextlib.ExitStack() as stack:
+            recorders = []
+            for connection in db_connections.all():
+                recorder = QueryRecorder(connection)
+                stack.enter_context(connection.execute_wrapper(recorder))
+                recorders.append(recorder)
+            profile = cProfile.Profile()
+            tracemalloc.start(base_constants.ProfilerConstants.TRACEMALLOC_FRAMES)
+
+            start = time.perf_counter()
+            try:
+                profile.enable()
+                response = get_response(self.request)
+                profile.disable()
+                wall_time_ms = (time.perf_counter() - start) * 1000
+
+                snapshot = tracemalloc.take_snapshot()
+                _, peak_bytes = tracemalloc.get_traced_memory()
+            finally:
+                profile.disable()
+                tracemalloc.stop()
+
+        self.store(profile)
+
+        report = {
+            "profile_id": str(self.profile_id),
+            "method": self.request.method,
+            "path": self.request.get_full_path(),
+            "status_code": response.status_code,
+            "wall_time_ms": round(wall_time_ms, 2),
+            "cpu": self.summarize_cpu(profile),
+            "memory": self.summarize_memory(snapshot, peak_bytes),
+            "queries": self.summarize_queries(recorders),
+            "artifact": self.request.build_absolute_uri(
+                reverse("profile-artifact", args=[self.profile_id])
+            ),
+        }
+        return JsonResponse(report, headers={"X-Profile-Id": str(self.profile_id)})
+
+    def store(self, profile):
+        """
+        Dumps the raw cProfile stats to the artifact directory.
+        """
+        artifact_path = get_artifact_path(self.profile_id)
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(artifact_path)
+
+    def summarize_cpu(self, profile):
+        """
+        Returns the functions with the highest cumulative time.
+        """
+        stats = pstats.Stats(profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": total_calls,
+                "own_time_ms": round(own_time * 1000, 3),
+                "cumulative_time_ms": round(cumulative_time * 1000, 3),
+            }
+            for (filename, line, name), (_, total_calls, own_time, cumulative_time, _) in rows[
+                : base_constants.ProfilerConstants.TOP_FUNCTIONS
+            ]
+        ]
+
+    def summarize_memory(self, snapshot, peak_bytes):
+        """
+        Returns the peak traced memory and the source lines that allocated
+        the most memory still alive at the end of the request.
+        """
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
+        statistics = snapshot.statistics("lineno")
+
+        return {
+            "peak_bytes": peak_bytes,
+            "top_allocations": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in statistics[: base_constants.ProfilerConstants.TOP_ALLOCATIONS]
+            ],
+        }
+
+    def summarize_queries(self, recorders):
+        """
+        Returns every SQL statement executed with its timing, per database.
+        """
+        queries = [
+            {
+                "database": recorder.connection.alias,
+                "sql": sql,
+                "time_ms": round(duration * 1000, 3),
+            }
+            for recorder in recorders
+            for sql, duration in recorder.queries
+        ]
+
+        return {
+            "count": len(queries),
+            "total_time_ms": round(sum(query["time_ms"] for query in queries), 3),
+            "statements": queries,
+        }
@@ -0,0 +1,222 @@
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db import connections as db_connections
+
+from apps.base import constants as base_constants
+from apps.base import sharding as base_sharding
+
+logger = logging.getLogger(__name__)
+
+_routing_state = contextvars.ContextVar("routing_state", default=None)
+
+
+class RoutingState:
+    """
+    Per-request routing decisions shared between the middleware and the
+    router.
+
+    Attributes:
+        use_replica (bool): Reads may be served by a replica.
+        wrote (bool): The request has written to the primary.
+    """
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+def activate(state):
+    return _routing_state.set(state)
+
+
+def deactivate(token):
+    _routing_state.reset(token)
+
+
+def current_state():
+    return _routing_state.get()
+
+
+def get_client_key(request):
+    """
+    Identifies the client across requests by its credentials, so that a
+    client which has just written keeps reading from the primary.
+    """
+    credentials = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credentials:
+        return None
+    digest = hashlib.blake2b(credentials.encode(), digest_size=16).hexdigest()
+    return f"{base_constants.RoutingConstants.PIN_CACHE_PREFIX}{digest}"
+
+
+def pin_to_primary(request):
+    """
+    Sends the client's reads to the primary for REPLICA_PIN_SECONDS.
+    """
+    client_key = get_client_key(request)
+    if client_key:
+        cache.set(client_key, True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(request):
+    client_key = get_client_key(request)
+    return bool(client_key and cache.get(client_key))
+
+
+class ReplicaHealth:
+    """
+    Tracks replication lag of every replica alias and keeps replicas that
+    are lagging more than REPLICA_MAX_LAG_SECONDS, or unreachable, out of
+    rotation until a later check finds them healthy again.
+
+    Lag is re-checked at most every REPLICA_LAG_CHECK_INTERVAL seconds, by
+    whichever request first notices that the last check is stale.
+    """
+
+    def __init__(self):
+        self._healthy = []
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def healthy_replicas(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= (
+            settings.REPLICA_LAG_CHECK_INTERVAL
+        ):
+            # Only one thread refreshes; the others keep using the last result
+            if self._lock.acquire(blocking=self._checked_at is None):
+                try:
+                    self._healthy = [
+                        alias for alias in settings.READ_REPLICAS if self.is_healthy(alias)
+                    ]
+                    self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._healthy
+
+    def is_healthy(self, alias):
+        try:
+            lag = self.get_lag(alias)
+        except DatabaseError:
+            logger.warning("Replica %s is unreachable and was removed from rotation.", alias)
+            return False
+
+        if lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning(
+                "Replica %s is %.1f seconds behind and was removed from rotation.", alias, lag
+            )
+            return False
+        return True
+
+    def get_lag(self, alias):
+        """
+        Returns the replication lag of a replica in seconds. Non-PostgreSQL
+        stand-ins only have their connectivity checked.
+        """
+        connection = db_connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(base_constants.RoutingConstants.REPLICA_LAG_SQL)
+                return float(cursor.fetchone()[0] or 0)
+
+            cursor.execute("SELECT 1")
+            return 0.0
+
+
+replica_health = ReplicaHealth()
+
+
+class ReadReplicaRouter:
+    """
+    Routes reads of requests served by read-only views to a healthy
+    replica, and everything else to the primary.
+
+    Read-your-writes is preserved by routing a request to the primary once
+    it has written, and by pinning the client to the primary for a short
+    window afterwards (see ReadReplicaMiddleware).
+
+    Replicas mirror the default database, so rows that live on city shards
+    are left to ShardRouter.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+
+        if base_sharding.is_sharded(model):
+            return None
+
+        replicas = replica_health.healthy_replicas()
+        if not replicas:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {base_constants.RoutingConstants.PRIMARY_ALIAS, *settings.READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication
+        if db in settings.READ_REPLICAS:
+            return False
+        return None
+
+
+class ShardRouter:
+    """
+    Routes seats, slots and bookings to the shard of their cinema's city and
+    everything else, the shared catalog and users, to the default database.
+
+    The shard is resolved from the ``city_id``, ``cinema_id`` or ``slot_id``
+    hint of a queryset, or from the instance a related manager or save
+    belongs to. Sharded querysets without any of these read the default
+    database; use ``base_sharding.scatter`` to query every shard.
+
+    Every database has the full schema, and foreign keys from sharded rows
+    to shared tables are not enforced by the database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self.get_database(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.get_database(model, hints)
+
+    def get_database(self, model, hints):
+        if not base_sharding.is_enabled():
+            return None
+
+        if not base_sharding.is_sharded(model):
+            return base_constants.RoutingConstants.PRIMARY_ALIAS
+        return base_sharding.shard_for_hints(hints) or base_constants.RoutingConstants.PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not base_sharding.is_enabled():
+            return None
+
+        # Sharded rows reference shared rows across databases
+        if not (base_sharding.is_sharded(type(obj1)) and base_sharding.is_sharded(type(obj2))):
+            return True
+        if obj1._state.adding or obj2._state.adding:
+            return True
+        return obj1._state.db == obj2._state.db
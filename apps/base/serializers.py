@@ -1,5 +1,6 @@
 from rest_framework import serializers as rest_serializers
 
+from apps.base import images as base_images
 from apps.base import models as base_models
 
 
@@ -52,3 +53,19 @@ class GenreSerializer(rest_serializers.ModelSerializer):
     class Meta:
         model = base_models.Genre
         fields = ["id", "name"]
+
+
+class ImageVariantsField(rest_serializers.Field):
+    """
+    Read-only field with the absolute URLs of the resized variants of an
+    image, by variant name and format, e.g.
+    ``{"thumbnail": {"webp": "...", "jpeg": "..."}}``. Empty until the
+    variants of a new image are made.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return base_images.get_variant_urls(value, self.context.get("request"))
@@ -0,0 +1,389 @@
+import heapq
+import itertools
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections as db_connections
+from django.db import models as db_models
+from django.db import router as db_router
+
+from apps.base import constants as base_constants
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_ALIAS = base_constants.RoutingConstants.PRIMARY_ALIAS
+
+
+def is_enabled():
+    return bool(settings.DATABASE_SHARDS)
+
+
+def is_sharded(model):
+    """
+    Returns whether rows of ``model`` live on the shard of their city.
+    """
+    return (
+        is_enabled() and model._meta.label_lower in base_constants.ShardingConstants.SHARDED_MODELS
+    )
+
+
+def get_databases():
+    """
+    Returns every database that can hold sharded rows, the default database
+    first.
+    """
+    return [PRIMARY_ALIAS, *settings.DATABASE_SHARDS]
+
+
+def get_home_database(pk):
+    """
+    Returns the database whose primary-key block contains ``pk``, which is
+    where the row was created.
+    """
+    databases = get_databases()
+    index = pk // base_constants.ShardingConstants.ID_BLOCK_SIZE
+    return databases[index] if 0 <= index < len(databases) else PRIMARY_ALIAS
+
+
+def get_city_shards():
+    """
+    Returns a mapping of city ID to shard alias for every city that is not
+    on the default database.
+    """
+    city_shards = cache.get(base_constants.ShardingConstants.CITY_SHARDS_CACHE_KEY)
+    if city_shards is None:
+        City = apps.get_model("base", "City")
+        city_shards = dict(
+            City.objects.using(PRIMARY_ALIAS).exclude(shard="").values_list("id", "shard")
+        )
+        cache.set(
+            base_constants.ShardingConstants.CITY_SHARDS_CACHE_KEY,
+            city_shards,
+            timeout=settings.SHARD_DIRECTORY_TIMEOUT,
+        )
+    return city_shards
+
+
+def shard_for_city(city_id):
+    if city_id is None:
+        return None
+    return get_city_shards().get(int(city_id), PRIMARY_ALIAS)
+
+
+def get_cinema_city(cinema_id):
+    key = f"{base_constants.ShardingConstants.CINEMA_CITY_CACHE_PREFIX}{cinema_id}"
+    city_id = cache.get(key)
+    if city_id is None:
+        Cinema = apps.get_model("cinema", "Cinema")
+        city_id = (
+            Cinema.objects.using(PRIMARY_ALIAS)
+            .filter(pk=cinema_id)
+            .values_list("city_id", flat=True)
+            .first()
+        )
+        if city_id is not None:
+            cache.set(key, city_id, timeout=settings.SHARD_DIRECTORY_TIMEOUT)
+    return city_id
+
+
+def shard_for_cinema(cinema_id):
+    if cinema_id is None:
+        return None
+    return shard_for_city(get_cinema_city(cinema_id))
+
+
+def shard_for_slot(slot_id):
+    """
+    Returns the database holding a slot.
+
+    Slot IDs do not carry their city, so the shards are probed, starting with
+    the one whose ID block contains the slot, and the answer is cached.
+    """
+    if slot_id is None:
+        return None
+
+    slot_id = int(slot_id)
+    key = f"{base_constants.ShardingConstants.SLOT_SHARD_CACHE_PREFIX}{slot_id}"
+    alias = cache.get(key)
+    if alias is not None:
+        return alias
+
+    Slot = apps.get_model("slot", "Slot")
+    home = get_home_database(slot_id)
+    for alias in [home, *(alias for alias in get_databases() if alias != home)]:
+        if Slot.objects.using(alias).filter(pk=slot_id).exists():
+            cache.set(key, alias, timeout=settings.SHARD_DIRECTORY_TIMEOUT)
+            return alias
+    return None
+
+
+def shard_for_instance(instance):
+    """
+    Returns the shard for rows related to ``instance``. Sharded rows that
+    are being created are placed by their cinema or slot.
+    """
+    label = instance._meta.label_lower
+    if label == "base.city":
+        return shard_for_city(instance.pk)
+    if label == "cinema.cinema":
+        return shard_for_city(instance.city_id)
+    if not is_sharded(type(instance)):
+        return None
+
+    if instance._state.db and not instance._state.adding:
+        return instance._state.db
+    if label == "booking.booking":
+        return shard_for_slot(instance.slot_id)
+    if hasattr(instance, "cinema_id"):
+        return shard_for_cinema(instance.cinema_id)
+    return instance._state.db
+
+
+def shard_for_hints(hints):
+    """
+    Resolves the shard from router hints. Besides Django's ``instance`` hint,
+    querysets can be pointed at a shard with
+    ``Model.objects.db_manager(hints={"city_id": ...})``, or with the
+    ``cinema_id`` or ``slot_id`` hint.
+    """
+    if hints.get("city_id") is not None:
+        return shard_for_city(hints["city_id"])
+    if hints.get("cinema_id") is not None:
+        return shard_for_cinema(hints["cinema_id"])
+    if hints.get("slot_id") is not None:
+        return shard_for_slot(hints["slot_id"])
+    if hints.get("instance") is not None:
+        return shard_for_instance(hints["instance"])
+    return None
+
+
+def get_city_databases(city_id=None):
+    """
+    Returns the databases holding the slots of a city, or of every city when
+    ``city_id`` is None. Without shards it returns None, leaving the choice
+    to the routers.
+    """
+    if not is_enabled():
+        return None
+    if city_id is None:
+        return get_databases()
+    return [shard_for_city(city_id)]
+
+
+def get_cinema_databases(cinema_ids):
+    """
+    Returns the databases holding the slots of the given cinemas, or None
+    without shards.
+    """
+    if not is_enabled():
+        return None
+
+    Cinema = apps.get_model("cinema", "Cinema")
+    city_ids = (
+        Cinema.objects.using(PRIMARY_ALIAS)
+        .filter(pk__in=cinema_ids)
+        .values_list("city_id", flat=True)
+        .distinct()
+    )
+    return sorted({shard_for_city(city_id) for city_id in city_ids})
+
+
+def invalidate_city_shards():
+    cache.delete(base_constants.ShardingConstants.CITY_SHARDS_CACHE_KEY)
+
+
+def invalidate_cinema(cinema_id):
+    cache.delete(f"{base_constants.ShardingConstants.CINEMA_CITY_CACHE_PREFIX}{cinema_id}")
+
+
+def invalidate_slots(slot_ids):
+    cache.delete_many(
+        [
+            f"{base_constants.ShardingConstants.SLOT_SHARD_CACHE_PREFIX}{slot_id}"
+            for slot_id in slot_ids
+        ]
+    )
+
+
+def select_catalog(queryset, *fields):
+    """
+    Loads shared catalog relations of sharded rows: joined in the same query
+    on a single database, or fetched from the default database when the rows
+    live on a shard where the catalog tables are empty.
+    """
+    if is_enabled():
+        return queryset.prefetch_related(*fields)
+    return queryset.select_related(*fields)
+
+
+def subquery_values(queryset, databases=None):
+    """
+    Returns a flat ``values_list`` queryset for use in an ``__in`` filter.
+
+    On a single database it stays a subquery; with shards, the values are
+    collected from ``databases`` (the queryset's own database by default),
+    because a subquery cannot cross databases.
+    """
+    if not is_enabled():
+        return queryset
+    return set(itertools.chain.from_iterable(scatter(queryset, databases)))
+
+
+def scatter(queryset, databases=None, key=None):
+    """
+    Evaluates ``queryset`` on each of ``databases`` and returns one list of
+    results per database, or a single list merged by ``key`` when given.
+    Each database's results must already be ordered by ``key``.
+    """
+    results = [list(queryset.using(alias)) for alias in databases or [queryset.db]]
+    if key is None:
+        return results
+    return list(heapq.merge(*results, key=key))
+
+
+def prefetch_across_shards(instances, related_name, queryset, databases=None, key=None):
+    """
+    Fills the prefetch cache of a reverse foreign key, such as the slots of
+    a movie, whose rows may be spread over several databases.
+
+    Args:
+        instances (list): Saved instances of the model owning the relation.
+        related_name (str): Name of the reverse accessor, e.g. "slots".
+        queryset (QuerySet): Rows to load, with any filters and ordering.
+        databases (list): Databases to query, the queryset's own by default.
+        key (callable): Ordering key used to merge the per-database rows.
+    """
+    if not instances:
+        return
+
+    field = getattr(type(instances[0]), related_name).field
+    rows_by_instance = {instance.pk: [] for instance in instances}
+    instances_by_pk = {instance.pk: instance for instance in instances}
+    queryset = queryset.filter(**{f"{field.attname}__in": list(rows_by_instance)})
+
+    rows = scatter(queryset, databases, key=key)
+    if key is None:
+        rows = itertools.chain.from_iterable(rows)
+
+    for row in rows:
+        owner_pk = getattr(row, field.attname)
+        field.set_cached_value(row, instances_by_pk[owner_pk])
+        rows_by_instance[owner_pk].append(row)
+
+    for instance in instances:
+        related_queryset = getattr(instance, related_name).all()
+        related_queryset._result_cache = rows_by_instance[instance.pk]
+        related_queryset._prefetch_done = True
+        if not hasattr(instance, "_prefetched_objects_cache"):
+            instance._prefetched_objects_cache = {}
+        instance._prefetched_objects_cache[field.remote_field.cache_name] = related_queryset
+
+
+class ShardedQuerySet(db_models.QuerySet):
+    """
+    QuerySet for sharded models whose create() and bulk_create() place new
+    rows on the shard of the rows themselves. Django only passes an instance
+    to the routers when saving one directly, so without this, rows created
+    through a plain manager would land on the default database.
+    """
+
+    def create(self, **kwargs):
+        if self._db is not None or self._hints:
+            return super().create(**kwargs)
+
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True, using=db_router.db_for_write(self.model, instance=obj))
+        return obj
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if self._db is not None or self._hints or not objs:
+            return super().bulk_create(objs, *args, **kwargs)
+
+        database = db_router.db_for_write(self.model, instance=objs[0])
+        return self.using(database).bulk_create(objs, *args, **kwargs)
+
+
+def reserve_id_block(alias, models):
+    """
+    Moves the primary-key sequences of ``models`` on a shard into the shard's
+    ID block, unless they are already past its start.
+    """
+    databases = get_databases()
+    if alias not in databases:
+        return
+
+    start = databases.index(alias) * base_constants.ShardingConstants.ID_BLOCK_SIZE
+    if start == 0:
+        return
+
+    connection = db_connections[alias]
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT setval(seq, %s, false) "
+                    "FROM pg_get_serial_sequence(%s, %s) AS seq "
+                    "WHERE (SELECT COALESCE(MAX({pk}), 0) FROM {table}) < %s".format(
+                        pk=connection.ops.quote_name(model._meta.pk.column),
+                        table=connection.ops.quote_name(table),
+                    ),
+                    [start, table, model._meta.pk.column, start],
+                )
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                        [table, start - 1],
+                    )
+                elif row[0] < start:
+                    cursor.execute(
+                        "UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [start - 1, table]
+                    )
+            else:
+                logger.warning(
+                    "Cannot reserve an ID block for %s on %s (%s).",
+                    table,
+                    alias,
+                    connection.vendor,
+                )
+
+
+def holds_shared_tables(connection):
+    """
+    Returns whether ``connection`` is the PostgreSQL database holding the
+    shared tables, where the foreign keys of sharded rows to them can be
+    enforced. Shards hold sharded rows without the rows they reference.
+    """
+    return connection.alias == PRIMARY_ALIAS and connection.vendor == "postgresql"
+
+
+def add_foreign_keys(schema_editor, model, field_names):
+    """
+    Creates the constraints of foreign keys of a sharded model that are
+    declared with ``db_constraint=False``, on the default database only.
+    """
+    if not holds_shared_tables(schema_editor.connection):
+        return
+    for name in field_names:
+        field = model._meta.get_field(name)
+        schema_editor.execute(
+            schema_editor._create_fk_sql(model, field, "_fk_%(to_table)s_%(to_column)s")
+        )
+
+
+def remove_foreign_keys(schema_editor, model, field_names):
+    """
+    Drops the constraints created by ``add_foreign_keys``.
+    """
+    if not holds_shared_tables(schema_editor.connection):
+        return
+    for name in field_names:
+        field = model._meta.get_field(name)
+        for constraint in schema_editor._constraint_names(model, [field.column], foreign_key=True):
+            schema_editor.execute(schema_editor._delete_fk_sql(model, constraint))
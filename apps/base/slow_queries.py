@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from apps.base import constants as base_constants
+
+logger = logging.getLogger(base_constants.SlowQueryConstants.LOGGER_NAME)
+
+
+class QueryFingerprint:
+    """
+    Reduces an SQL statement to its shape so that the same query issued
+    with different literals or IN-list lengths maps to one fingerprint.
+    """
+
+    LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+    IN_LIST_PATTERN = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+    WHITESPACE_PATTERN = re.compile(r"\s+")
+
+    @classmethod
+    def of(cls, sql):
+        """
+        Returns a short hex digest identifying the shape of the statement.
+        """
+        shape = cls.LITERAL_PATTERN.sub("?", sql)
+        shape = cls.IN_LIST_PATTERN.sub("(...)", shape)
+        shape = cls.WHITESPACE_PATTERN.sub(" ", shape).strip()
+        return hashlib.blake2b(shape.encode(), digest_size=8).hexdigest()
+
+
+class FingerprintSampler:
+    """
+    Allows each query fingerprint to be recorded at most once per interval.
+
+    Attributes:
+        interval (int): Minimum number of seconds between two records
+            of the same fingerprint.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last_recorded = {}
+        self._lock = threading.Lock()
+
+    def should_record(self, fingerprint, now):
+        """
+        Returns True and marks the fingerprint as recorded when its
+        interval has elapsed.
+        """
+        with self._lock:
+            last_recorded = self._last_recorded.get(fingerprint)
+            if last_recorded is not None and now - last_recorded < self.interval:
+                return False
+
+            # Bound memory for workloads producing many distinct query shapes
+            if len(self._last_recorded) >= (
+                base_constants.SlowQueryConstants.MAX_TRACKED_FINGERPRINTS
+            ):
+                self._last_recorded.clear()
+
+            self._last_recorded[fingerprint] = now
+            return True
+
+
+sampler = FingerprintSampler(settings.SLOW_QUERY_SAMPLE_INTERVAL)
+
+
+class SlowQueryLogger:
+    """
+    Database execute wrapper that records statements slower than
+    SLOW_QUERY_THRESHOLD_MS together with the view that issued them,
+    their parameters and an EXPLAIN plan.
+
+    Installed per request and per connection by SlowQueryLogMiddleware.
+
+    Attributes:
+        connection (DatabaseWrapper): Connection the wrapper is installed on.
+        request (HttpRequest): Request currently being served.
+    """
+
+    def __init__(self, connection, request):
+        self.connection = connection
+        self.request = request
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # Statements issued while capturing a plan must not be re-recorded
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except DatabaseError as exc:
+            self.record(sql, params, many, start, error=exc)
+            raise
+
+        self.record(sql, params, many, start)
+        return result
+
+    def record(self, sql, params, many, start, error=None):
+        """
+        Writes a log entry when the statement crossed the threshold and its
+        fingerprint has not been recorded within the sampling interval.
+        """
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        fingerprint = QueryFingerprint.of(sql)
+        if not sampler.should_record(fingerprint, time.monotonic()):
+            return
+
+        entry = {
+            "timestamp": timezone.now().isoformat(),
+            "fingerprint": fingerprint,
+            "duration_ms": round(duration_ms, 2),
+            "database": self.connection.alias,
+            "view": self.view_name,
+            "method": self.request.method,
+            "path": self.request.path,
+            "sql": sql,
+            "params": f"<{len(params)} parameter sets>" if many else params,
+            "error": str(error) if error else None,
+            "plan": None if (error or many) else self.explain(sql, params),
+        }
+        logger.warning(json.dumps(entry, default=str))
+
+    @property
+    def view_name(self):
+        """
+        Resolved view name of the request, if URL resolution has happened.
+        """
+        resolver_match = getattr(self.request, "resolver_match", None)
+        return resolver_match.view_name if resolver_match else None
+
+    def explain(self, sql, params):
+        """
+        Captures the execution plan of a read statement.
+
+        EXPLAIN ANALYZE runs the statement a second time, so it is only
+        used when SLOW_QUERY_EXPLAIN_ANALYZE is enabled.
+        """
+        statement = sql.lstrip().upper()
+        if not statement.startswith(base_constants.SlowQueryConstants.EXPLAINABLE_PREFIXES):
+            return None
+
+        options = {}
+        if self.connection.vendor == "postgresql":
+            options = {"format": "JSON", "analyze": settings.SLOW_QUERY_EXPLAIN_ANALYZE}
+
+        self._explaining = True
+        try:
+            prefix = self.connection.ops.explain_query_prefix(**options)
+            # Savepoint keeps a failed EXPLAIN from breaking the caller's transaction
+            with db_transaction.atomic(using=self.connection.alias):
+                with self.connection.cursor() as cursor:
+                    cursor.execute(f"{prefix} {sql}", params)
+                    rows = cursor.fetchall()
+        except (DatabaseError, ValueError) as exc:
+            return {"error": str(exc)}
+        finally:
+            self._explaining = False
+
+        if self.connection.vendor == "postgresql":
+            return rows[0][0]
+        return [list(row) for row in rows]
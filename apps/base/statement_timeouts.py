@@ -0,0 +1,84 @@
+import contextvars
+import logging
+
+from django.conf import settings
+from rest_framework import permissions as rest_permissions
+
+logger = logging.getLogger(__name__)
+
+# Query time budget of the current request in milliseconds, or None when the
+# request has none and connections use the server's statement_timeout.
+_current_timeout = contextvars.ContextVar("statement_timeout", default=None)
+
+# Marks a pooled connection just checked out, whose statement_timeout was
+# left by whichever request used it last.
+UNKNOWN = object()
+
+
+def get_view_timeout(view_class, method):
+    """
+    Returns the query time budget in milliseconds of a request to
+    ``view_class``, or None when it has none.
+
+    Views may declare ``statement_timeout`` (0 or None for no budget);
+    otherwise safe methods get DB_STATEMENT_TIMEOUT_READ_MS and writes, such
+    as booking, DB_STATEMENT_TIMEOUT_BOOKING_MS. Views without a class, like
+    the admin, have no budget.
+    """
+    if view_class is None:
+        return None
+
+    timeout = getattr(view_class, "statement_timeout", None)
+    if timeout is None:
+        timeout = (
+            settings.DB_STATEMENT_TIMEOUT_READ_MS
+            if method in rest_permissions.SAFE_METHODS
+            else settings.DB_STATEMENT_TIMEOUT_BOOKING_MS
+        )
+    return timeout or None
+
+
+def activate(timeout):
+    return _current_timeout.set(timeout)
+
+
+def deactivate(token):
+    _current_timeout.reset(token)
+
+
+def current_timeout():
+    return _current_timeout.get()
+
+
+def apply(connection, timeout):
+    """
+    Sets the session statement_timeout of an open PostgreSQL connection,
+    skipping the round trip when it already has that value.
+    """
+    if connection.vendor != "postgresql" or connection.connection is None:
+        return
+
+    applied = getattr(connection, "statement_timeout_ms", None)
+    if applied == timeout:
+        return
+
+    with connection.cursor() as cursor:
+        if timeout is None:
+            cursor.execute("RESET statement_timeout")
+        else:
+            cursor.execute("SELECT set_config('statement_timeout', %s, false)", [f"{timeout}ms"])
+    connection.statement_timeout_ms = timeout
+
+
+def configure_connection(connection):
+    """
+    Applies the budget of the current request to a connection that was just
+    opened or checked out of the pool.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    # A new connection starts with the server default, a pooled one with
+    # whatever the previous request set.
+    connection.statement_timeout_ms = UNKNOWN if connection.pool is not None else None
+    apply(connection, current_timeout())
@@ -1,3 +1,479 @@
-from django.test import TestCase
+import contextlib
+import datetime
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.base import constants as base_constants
+from apps.base import middleware as base_middleware
+from apps.base import models as base_models
+from apps.base import profiler as base_profiler
+from apps.base import routers as base_routers
+from apps.base import sharding as base_sharding
+from apps.base import slow_queries as base_slow_queries
+from apps.base import views as base_views
+from apps.booking import models as booking_models
+from apps.cinema import models as cinema_models
+from apps.movie import models as movie_models
+from apps.slot import models as slot_models
+from apps.user import models as user_models
+
+REPLICA_ALIAS = "replica_1"
+SHARD_ALIAS = "shard_1"
+
+
+def get_test_databases(*aliases):
+    """
+    Returns the default database and those of ``aliases`` that are
+    configured, as the ``databases`` of a TestCase that is skipped without
+    them.
+    """
+    return {"default", *(alias for alias in aliases if alias in settings.DATABASES)}
+
+
+@override_settings(
+    READ_REPLICAS=[REPLICA_ALIAS],
+    DATABASE_SHARDS=[],
+    REPLICA_MAX_LAG_SECONDS=5,
+    REPLICA_LAG_CHECK_INTERVAL=60,
+)
+class ReadReplicaRouterTests(TestCase):
+    """
+    Routing decisions of ReadReplicaRouter. The replica's lag is stubbed, so
+    no replica database is needed.
+    """
+
+    def setUp(self):
+        base_routers.replica_health._checked_at = None
+        patcher = mock.patch.object(base_routers.replica_health, "get_lag", return_value=0.0)
+        self.get_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.state = base_routers.RoutingState()
+        self.addCleanup(base_routers.deactivate, base_routers.activate(self.state))
+
+    def test_reads_go_to_replica_when_allowed(self):
+        self.state.use_replica = True
+        self.assertEqual(base_models.Language.objects.all().db, REPLICA_ALIAS)
+
+    def test_reads_stay_on_primary_by_default(self):
+        self.assertEqual(base_models.Language.objects.all().db, "default")
+
+    def test_writes_go_to_primary(self):
+        self.state.use_replica = True
+        language = base_models.Language.objects.create(name="english")
+
+        self.assertEqual(language._state.db, "default")
+
+    def test_reads_after_a_write_go_to_primary(self):
+        self.state.use_replica = True
+        base_models.Language.objects.create(name="english")
+
+        self.assertTrue(self.state.wrote)
+        self.assertEqual(base_models.Language.objects.all().db, "default")
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        self.state.use_replica = True
+        self.get_lag.side_effect = DatabaseError
+
+        self.assertEqual(base_models.Language.objects.all().db, "default")
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.state.use_replica = True
+        self.get_lag.return_value = 60.0
+
+        self.assertEqual(base_models.Language.objects.all().db, "default")
+
+    def test_replica_returns_to_rotation_once_healthy(self):
+        self.state.use_replica = True
+        self.get_lag.return_value = 60.0
+        self.assertEqual(base_models.Language.objects.all().db, "default")
+
+        self.get_lag.return_value = 1.0
+        base_routers.replica_health._checked_at = None
+        self.assertEqual(base_models.Language.objects.all().db, REPLICA_ALIAS)
+
+    def test_lag_is_rechecked_after_interval(self):
+        self.state.use_replica = True
+        base_models.Language.objects.all().db
+        base_models.Language.objects.all().db
+
+        self.assertEqual(self.get_lag.call_count, 1)
+
+
+@unittest.skipUnless(
+    REPLICA_ALIAS in settings.DATABASES,
+    "Set DB_REPLICA_URLS, e.g. to sqlite:///replica.sqlite3, to test replica routing.",
+)
+@override_settings(READ_REPLICAS=[REPLICA_ALIAS], DATABASE_SHARDS=[], REPLICA_PIN_SECONDS=5)
+class ReadReplicaMiddlewareTests(TestCase):
+    """
+    Requests through ReadReplicaMiddleware to a view marked
+    ``read_replica``. The replica mirrors the default test database, and
+    the tests check which connection runs the queries; they only read, as
+    SQLite stand-ins share one in-memory database.
+    """
+
+    databases = get_test_databases(REPLICA_ALIAS)
+
+    def setUp(self):
+        cache.clear()
+        base_routers.replica_health._checked_at = None
+        self.factory = self.get_client_factory("client-session")
+        self.view = base_views.LanguageListView.as_view()
+        self.middleware = base_middleware.ReadReplicaMiddleware(self.get_response)
+
+    def get_client_factory(self, session_key):
+        factory = RequestFactory()
+        factory.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        return factory
+
+    def get_response(self, request):
+        self.middleware.process_view(request, self.view, (), {})
+        return self.view(request)
+
+    def get_queries(self, request):
+        with (
+            CaptureQueriesContext(connections["default"]) as primary,
+            CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica,
+        ):
+            response = self.middleware(request)
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_safe_method_reads_from_replica(self):
+        primary, replica = self.get_queries(self.factory.get("/api/languages/"))
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_client_is_pinned_to_primary_after_writing(self):
+        base_routers.pin_to_primary(self.factory.post("/api/languages/"))
+
+        primary, replica = self.get_queries(self.factory.get("/api/languages/"))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        other_client = self.get_client_factory("other-session")
+        primary, replica = self.get_queries(other_client.get("/api/languages/"))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        with mock.patch.object(base_routers.replica_health, "get_lag", side_effect=DatabaseError):
+            primary, replica = self.get_queries(self.factory.get("/api/languages/"))
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+
+@unittest.skipUnless(
+    SHARD_ALIAS in settings.DATABASES,
+    "Set DB_SHARD_URLS, e.g. to sqlite:///shard.sqlite3, to test sharding.",
+)
+@override_settings(DATABASE_SHARDS=[SHARD_ALIAS], READ_REPLICAS=[])
+class ShardingTests(TestCase):
+    """
+    Placement and reads of seats, slots and bookings with a city on a shard
+    and another on the default database.
+    """
+
+    databases = get_test_databases(SHARD_ALIAS)
+
+    def setUp(self):
+        cache.clear()
+        self.mumbai = base_models.City.objects.create(name="mumbai")
+        self.pune = base_models.City.objects.create(name="pune")
+        call_command("move_city_shard", "pune", SHARD_ALIAS, stdout=io.StringIO())
+
+        self.language = base_models.Language.objects.create(name="english")
+        self.movie = movie_models.Movie.objects.create(
+            name="movie",
+            description="description",
+            duration=datetime.timedelta(hours=2),
+            release_date=datetime.date(2020, 1, 1),
+            poster="poster.jpg",
+        )
+        self.mumbai_cinema = self.create_cinema(self.mumbai)
+        self.pune_cinema = self.create_cinema(self.pune)
+        self.start = timezone.now() + datetime.timedelta(days=1)
+
+    def create_cinema(self, city):
+        return cinema_models.Cinema.objects.create(
+            name="cinema", city=city, address="address", rows=2, seats_per_row=3, image="c.jpg"
+        )
+
+    def create_slot(self, cinema, hours=0):
+        start = self.start + datetime.timedelta(hours=hours)
+        return slot_models.Slot.objects.create(
+            price=100,
+            start_time=start,
+            end_time=start + datetime.timedelta(hours=2),
+            movie=self.movie,
+            cinema=cinema,
+            language=self.language,
+        )
+
+    def create_booking(self, slot, seats=2):
+        user = user_models.User.objects.create_user(email=f"{slot.pk}@example.com", password="x")
+        booking = booking_models.Booking.objects.create(user=user, slot=slot)
+        booking.seats.add(*slot.cinema.seats.all()[:seats])
+        return booking
+
+    def count(self, model, alias, **filters):
+        return model.objects.using(alias).filter(**filters).count()
+
+    def test_seats_are_created_on_the_city_database(self):
+        self.assertEqual(self.count(cinema_models.Seat, "default"), 6)
+        self.assertEqual(self.count(cinema_models.Seat, SHARD_ALIAS), 6)
+        self.assertEqual(self.count(cinema_models.Seat, SHARD_ALIAS, cinema=self.pune_cinema), 6)
+
+    def test_create_places_rows_on_the_city_shard(self):
+        mumbai_slot = self.create_slot(self.mumbai_cinema)
+        pune_slot = self.create_slot(self.pune_cinema)
+        booking = self.create_booking(pune_slot)
+
+        self.assertEqual(mumbai_slot._state.db, "default")
+        self.assertEqual(pune_slot._state.db, SHARD_ALIAS)
+        self.assertEqual(booking._state.db, SHARD_ALIAS)
+        self.assertEqual(self.count(slot_models.Slot, "default", pk=pune_slot.pk), 0)
+        self.assertEqual(booking.seats.count(), 2)
+
+    def test_bulk_create_places_rows_on_the_city_shard(self):
+        slots = slot_models.Slot.objects.bulk_create(
+            [
+                slot_models.Slot(
+                    price=100,
+                    start_time=self.start + datetime.timedelta(hours=hours),
+                    end_time=self.start + datetime.timedelta(hours=hours + 2),
+                    movie=self.movie,
+                    cinema=self.pune_cinema,
+                    language=self.language,
+                )
+                for hours in (0, 3)
+            ]
+        )
+
+        self.assertEqual(self.count(slot_models.Slot, SHARD_ALIAS), 2)
+        self.assertEqual(self.count(slot_models.Slot, "default"), 0)
+        self.assertTrue(all(slot._state.db == SHARD_ALIAS for slot in slots))
+
+    def test_shards_hand_out_ids_from_their_own_block(self):
+        block_size = base_constants.ShardingConstants.ID_BLOCK_SIZE
+        mumbai_slot = self.create_slot(self.mumbai_cinema)
+        pune_slot = self.create_slot(self.pune_cinema)
+
+        self.assertLess(mumbai_slot.pk, block_size)
+        self.assertGreaterEqual(pune_slot.pk, block_size)
+        self.assertEqual(base_sharding.get_home_database(mumbai_slot.pk), "default")
+        self.assertEqual(base_sharding.get_home_database(pune_slot.pk), SHARD_ALIAS)
+
+    def test_shard_for_slot_probes_and_caches(self):
+        pune_slot = self.create_slot(self.pune_cinema)
+        cache.clear()
+
+        self.assertEqual(base_sharding.shard_for_slot(pune_slot.pk), SHARD_ALIAS)
+        with self.assertNumQueries(0, using=SHARD_ALIAS), self.assertNumQueries(0):
+            self.assertEqual(base_sharding.shard_for_slot(pune_slot.pk), SHARD_ALIAS)
+        self.assertIsNone(base_sharding.shard_for_slot(pune_slot.pk + 1))
+
+    def test_shard_for_slot_finds_slots_outside_their_home_block(self):
+        pune_slot = self.create_slot(self.pune_cinema)
+        call_command("move_city_shard", "pune", "default", stdout=io.StringIO())
+
+        self.assertEqual(base_sharding.get_home_database(pune_slot.pk), SHARD_ALIAS)
+        self.assertEqual(base_sharding.shard_for_slot(pune_slot.pk), "default")
+
+    def test_hints_route_queries_to_the_city_shard(self):
+        pune_slot = self.create_slot(self.pune_cinema)
+        booking = self.create_booking(pune_slot)
+
+        slots = slot_models.Slot.objects.db_manager(hints={"city_id": self.pune.pk})
+        bookings = booking_models.Booking.objects.db_manager(hints={"slot_id": pune_slot.pk})
+        self.assertEqual(list(slots.all()), [pune_slot])
+        self.assertEqual(list(bookings.all()), [booking])
+        self.assertEqual(list(self.pune_cinema.slots.all()), [pune_slot])
+
+    def test_scatter_reads_every_database(self):
+        mumbai_slot = self.create_slot(self.mumbai_cinema, hours=3)
+        pune_slot = self.create_slot(self.pune_cinema)
+
+        slots = base_sharding.scatter(
+            slot_models.Slot.objects.order_by("start_time"),
+            base_sharding.get_databases(),
+            key=lambda slot: slot.start_time,
+        )
+        self.assertEqual(slots, [pune_slot, mumbai_slot])
+
+    def test_prefetch_across_shards(self):
+        mumbai_slot = self.create_slot(self.mumbai_cinema, hours=3)
+        pune_slot = self.create_slot(self.pune_cinema)
+        movie = movie_models.Movie.objects.get(pk=self.movie.pk)
+
+        base_sharding.prefetch_across_shards(
+            [movie],
+            "slots",
+            slot_models.Slot.objects.order_by("start_time"),
+            base_sharding.get_databases(),
+            key=lambda slot: slot.start_time,
+        )
+
+        with self.assertNumQueries(0, using=SHARD_ALIAS), self.assertNumQueries(0):
+            slots = list(movie.slots.all())
+            self.assertEqual(slots, [pune_slot, mumbai_slot])
+            self.assertIs(slots[0].movie, movie)
+
+    def test_deleting_a_cinema_deletes_its_rows_on_the_shard(self):
+        self.create_booking(self.create_slot(self.pune_cinema))
+
+        self.pune_cinema.delete()
+
+        self.assertEqual(self.count(cinema_models.Seat, SHARD_ALIAS), 0)
+        self.assertEqual(self.count(slot_models.Slot, SHARD_ALIAS), 0)
+        self.assertEqual(self.count(booking_models.Booking, SHARD_ALIAS), 0)
+
+    def test_move_city_shard_moves_rows(self):
+        pune_slot = self.create_slot(self.pune_cinema)
+        booking = self.create_booking(pune_slot)
+        self.create_booking(self.create_slot(self.mumbai_cinema))
+
+        call_command("move_city_shard", str(self.pune.pk), "default", stdout=io.StringIO())
+
+        self.pune.refresh_from_db()
+        self.assertEqual(self.pune.shard, "")
+        for model in (cinema_models.Seat, slot_models.Slot, booking_models.Booking):
+            self.assertEqual(self.count(model, SHARD_ALIAS), 0)
+        self.assertEqual(self.count(cinema_models.Seat, "default"), 12)
+        self.assertEqual(self.count(slot_models.Slot, "default"), 2)
+
+        moved = booking_models.Booking.objects.db_manager(hints={"slot_id": pune_slot.pk}).get(
+            pk=booking.pk
+        )
+        self.assertEqual(moved._state.db, "default")
+        self.assertEqual(moved.seats.count(), 2)
+
+    def test_move_city_shard_rejects_unknown_databases(self):
+        with self.assertRaises(CommandError):
+            call_command("move_city_shard", "pune", "shard_9", stdout=io.StringIO())
+
+
+@unittest.skipUnless(
+    connections["default"].vendor == "postgresql",
+    "Foreign keys of sharded tables are enforced on PostgreSQL.",
+)
+class SharedForeignKeyTests(TestCase):
+    """
+    The foreign keys of sharded tables to shared tables, enforced on the
+    default database.
+    """
+
+    def get_references(self, model):
+        connection = connections["default"]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return {
+            (constraint["columns"][0], constraint["foreign_key"][0])
+            for constraint in constraints.values()
+            if constraint["foreign_key"]
+        }
+
+    def test_shared_references_are_enforced(self):
+        self.assertLessEqual(
+            {("cinema_id", "cinema_cinema")}, self.get_references(cinema_models.Seat)
+        )
+        self.assertLessEqual(
+            {("user_id", "user_user")}, self.get_references(booking_models.Booking)
+        )
+        self.assertLessEqual(
+            {
+                ("movie_id", "movie_movie"),
+                ("cinema_id", "cinema_cinema"),
+                ("language_id", "base_language"),
+            },
+            self.get_references(slot_models.Slot),
+        )
+
+
+@override_settings(
+    SLOW_QUERY_LOG_ENABLED=True,
+    SLOW_QUERY_THRESHOLD_MS=0,
+    TRACING_ENABLED=True,
+    TRACING_SAMPLE_RATE=1.0,
+)
+class AsyncRequestMiddlewareTests(TestCase):
+    """
+    Slow query logging and tracing of requests served on the ASGI stack.
+    """
+
+    async def get_response(self, request):
+        await sync_to_async(list)(base_models.Language.objects.all())
+        return HttpResponse()
+
+    async def test_slow_queries_of_async_requests_are_logged(self):
+        middleware = base_middleware.SlowQueryLogMiddleware(self.get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        with (
+            mock.patch.object(base_slow_queries.sampler, "should_record", return_value=True),
+            self.assertLogs(base_constants.SlowQueryConstants.LOGGER_NAME, "WARNING") as logs,
+        ):
+            await middleware(RequestFactory().get("/"))
+
+        self.assertIn("base_language", logs.output[0])
+
+    async def test_async_requests_are_traced(self):
+        middleware = base_middleware.TracingMiddleware(self.get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        with self.assertLogs(base_constants.TracingConstants.LOGGER_NAME, "INFO") as logs:
+            await middleware(RequestFactory().get("/"))
+
+        self.assertIn('"GET /"', logs.output[0])
+        self.assertIn("db.query", logs.output[0])
+
+
+class RequestProfilerTests(TestCase):
+    """
+    Profiling of a request by RequestProfiler.
+    """
+
+    def setUp(self):
+        artifact_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(artifact_dir.cleanup)
+        override = override_settings(PROFILER_ARTIFACT_DIR=artifact_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get_response(self, request):
+        list(base_models.Language.objects.all())
+        return HttpResponse()
+
+    def test_only_databases_used_by_the_request_are_connected(self):
+        request = RequestFactory().get("/", {"_profile": ""})
+        with contextlib.ExitStack() as stack:
+            # Every other alias, such as a replica or a shard, is unreachable.
+            for connection in connections.all():
+                if connection.alias != "default":
+                    stack.enter_context(
+                        mock.patch.object(
+                            connection, "ensure_connection", side_effect=DatabaseError
+                        )
+                    )
+            response = base_profiler.RequestProfiler(request).run(self.get_response)
+
+        report = json.loads(response.content)
+        self.assertEqual(report["status_code"], 200)
+        self.assertEqual(report["queries"]["count"], 1)
+        self.assertEqual(report["queries"]["statements"][0]["database"], "default")
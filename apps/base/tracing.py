@@ -0,0 +1,334 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import time
+from array import array
+
+from django.conf import settings
+from rest_framework import renderers as rest_renderers
+
+from apps.base import constants as base_constants
+
+logger = logging.getLogger(base_constants.TracingConstants.LOGGER_NAME)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=-1)
+
+
+class Trace:
+    """
+    Span storage for a single request, laid out as preallocated parallel
+    arrays so that recording a span only writes into existing slots.
+
+    Attributes:
+        trace_id (str): 32 hex character OpenTelemetry trace identifier.
+        size (int): Number of slots used by the current request.
+        dropped (int): Spans discarded because every slot was in use.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.names = [None] * capacity
+        self.kinds = array("b", [0]) * capacity
+        self.parents = array("i", [-1]) * capacity
+        self.starts = array("q", [0]) * capacity
+        self.ends = array("q", [0]) * capacity
+        self.attributes = [None] * capacity
+        self.reset()
+
+    def reset(self):
+        """
+        Prepares the buffer for a new request without reallocating slots.
+        """
+        self.trace_id = os.urandom(16).hex()
+        self.size = 0
+        self.dropped = 0
+
+    def start_span(self, name, kind, attributes):
+        """
+        Claims the next free slot and returns its index, or -1 when full.
+        """
+        index = self.size
+        if index >= self.capacity:
+            self.dropped += 1
+            return -1
+
+        self.size = index + 1
+        self.names[index] = name
+        self.kinds[index] = kind
+        self.parents[index] = _current_span.get()
+        self.attributes[index] = attributes
+        self.starts[index] = time.time_ns()
+        self.ends[index] = 0
+        return index
+
+    def end_span(self, index):
+        if index >= 0:
+            self.ends[index] = time.time_ns()
+
+    def update_span(self, index, name, **attributes):
+        """
+        Renames a recorded span and merges extra attributes into it.
+        """
+        if index >= 0:
+            self.names[index] = name
+            self.attributes[index] = {**(self.attributes[index] or {}), **attributes}
+
+    def to_otlp(self):
+        """
+        Serializes the trace as an OTLP/JSON ExportTraceServiceRequest.
+        """
+        span_ids = os.urandom(8 * self.size).hex()
+        spans = []
+
+        for index in range(self.size):
+            parent = self.parents[index]
+            span = {
+                "traceId": self.trace_id,
+                "spanId": span_ids[index * 16 : (index + 1) * 16],
+                "name": self.names[index],
+                "kind": self.kinds[index],
+                "startTimeUnixNano": str(self.starts[index]),
+                "endTimeUnixNano": str(self.ends[index] or self.starts[index]),
+                "attributes": _otlp_attributes(self.attributes[index]),
+            }
+            if parent >= 0:
+                span["parentSpanId"] = span_ids[parent * 16 : (parent + 1) * 16]
+            spans.append(span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {
+                                "service.name": base_constants.TracingConstants.SERVICE_NAME,
+                                "process.pid": os.getpid(),
+                            }
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": base_constants.TracingConstants.LOGGER_NAME},
+                            "spans": spans,
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_attributes(attributes):
+    """
+    Converts a flat dictionary into OTLP key/value attribute objects.
+    """
+    if not attributes:
+        return []
+
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            converted.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            converted.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            converted.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            converted.append({"key": key, "value": {"stringValue": str(value)}})
+    return converted
+
+
+class TracePool:
+    """
+    Free list of Trace buffers reused across requests.
+    """
+
+    def __init__(self, size, capacity):
+        self.size = size
+        self.capacity = capacity
+        self._free = queue.SimpleQueue()
+        for _ in range(size):
+            self._free.put(Trace(capacity))
+
+    def acquire(self):
+        try:
+            trace = self._free.get_nowait()
+        except queue.Empty:
+            return Trace(self.capacity)
+        trace.reset()
+        return trace
+
+    def release(self, trace):
+        if self._free.qsize() < self.size:
+            self._free.put(trace)
+
+
+pool = TracePool(
+    base_constants.TracingConstants.POOL_SIZE,
+    base_constants.TracingConstants.MAX_SPANS_PER_TRACE,
+)
+
+
+class Span:
+    """
+    Context manager recording one span on the current trace.
+    """
+
+    __slots__ = ("trace", "name", "kind", "attributes", "index", "token")
+
+    def __init__(self, trace, name, kind, attributes):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.index = self.trace.start_span(self.name, self.kind, self.attributes)
+        self.token = _current_span.set(self.index) if self.index >= 0 else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.end_span(self.index)
+        if self.token is not None:
+            _current_span.reset(self.token)
+        return False
+
+
+class _NoopSpan:
+    """
+    Shared span returned when the current request is not sampled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, kind=base_constants.TracingConstants.SPAN_KIND_INTERNAL, **attributes):
+    """
+    Returns a context manager recording a span named ``name`` nested under
+    the active span. It is a shared no-op when the request is not sampled.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return Span(trace, name, kind, attributes or None)
+
+
+def traced(name):
+    """
+    Decorator recording a span around every call of the wrapped function.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def should_sample():
+    return random.random() < settings.TRACING_SAMPLE_RATE
+
+
+def start_trace():
+    """
+    Activates a pooled trace for the current context and returns it
+    together with the token needed to deactivate it.
+    """
+    trace = pool.acquire()
+    return trace, _current_trace.set(trace)
+
+
+def finish_trace(trace, token):
+    """
+    Deactivates the trace, exports it and returns its buffer to the pool.
+    """
+    _current_trace.reset(token)
+    try:
+        if trace.dropped:
+            trace.update_span(0, trace.names[0], **{"spans.dropped": trace.dropped})
+        logger.info(json.dumps(trace.to_otlp()))
+    finally:
+        pool.release(trace)
+
+
+class QuerySpanWrapper:
+    """
+    Database execute wrapper recording a client span for each statement.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        with span(
+            "db.query",
+            kind=base_constants.TracingConstants.SPAN_KIND_CLIENT,
+            **{
+                "db.system": self.connection.vendor,
+                "db.name": self.connection.alias,
+                "db.statement": sql[: base_constants.TracingConstants.MAX_STATEMENT_LENGTH],
+            },
+        ):
+            return execute(sql, params, many, context)
+
+
+class TracedViewMixin:
+    """
+    Records spans for the phases of DRF generic views: building and
+    filtering the queryset, fetching the object or page (including its
+    prefetch queries) and serialization.
+
+    Only the hooks DRF's list and retrieve call are wrapped, so the actions
+    themselves stay DRF's. Views with a custom get_queryset can decorate it
+    with ``traced``.
+    """
+
+    def get_queryset(self):
+        with span("view.get_queryset"):
+            return super().get_queryset()
+
+    def filter_queryset(self, queryset):
+        with span("view.filter_queryset"):
+            return super().filter_queryset(queryset)
+
+    def get_object(self):
+        with span("view.get_object"):
+            return super().get_object()
+
+    def paginate_queryset(self, queryset):
+        with span("view.paginate_queryset"):
+            return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # ``serializer.data`` renders through to_representation, which also
+        # evaluates an unpaginated queryset.
+        serializer.to_representation = traced("serializer.data")(serializer.to_representation)
+        return serializer
+
+
+class TracedJSONRenderer(rest_renderers.JSONRenderer):
+    """
+    JSONRenderer recording a span for response rendering.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span("response.render"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -1,9 +1,30 @@
+from django.conf import settings
 from django.urls import path
 
 from apps.base import views as base_views
 
+if settings.ASYNC_READ_VIEWS:
+    language_list_view = base_views.AsyncLanguageListView
+    genre_list_view = base_views.AsyncGenreListView
+    city_list_view = base_views.AsyncCityListView
+else:
+    language_list_view = base_views.LanguageListView
+    genre_list_view = base_views.GenreListView
+    city_list_view = base_views.CityListView
+
 urlpatterns = [
-    path("languages/", base_views.LanguageListView.as_view(), name="language-list"),
-    path("genres/", base_views.GenreListView.as_view(), name="genre-list"),
-    path("cities/", base_views.CityListView.as_view(), name="city-list"),
+    path("languages/", language_list_view.as_view(), name="language-list"),
+    path("genres/", genre_list_view.as_view(), name="genre-list"),
+    path("cities/", city_list_view.as_view(), name="city-list"),
+    path("metrics/", base_views.MetricsView.as_view(), name="metrics"),
+    path(
+        "profiles/<uuid:profile_id>/",
+        base_views.ProfileArtifactView.as_view(),
+        name="profile-artifact",
+    ),
+    path(
+        "media/<int:width>/<path:name>",
+        base_views.ResizedImageView.as_view(),
+        name="resized-image",
+    ),
 ]
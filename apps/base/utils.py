@@ -1,4 +1,8 @@
+import importlib
+from datetime import datetime, time, timedelta
+
 from django.http import JsonResponse
+from django.utils import timezone
 
 from apps.base import constants as base_constants
 
@@ -29,3 +33,50 @@ class NormalizedNameMixin:
         if hasattr(self, "name") and self.name:
             self.name = self.name.lower().strip()
         return super().save(*args, **kwargs)
+
+
+def get_day_bounds(day):
+    """
+    Returns the start of ``day`` and of the following day in the current
+    time zone.
+
+    Filtering with ``start_time__gte`` and ``start_time__lt`` on these bounds,
+    rather than ``start_time__date``, lets PostgreSQL use indexes and prune
+    the slot partitions.
+    """
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Used for heavy modules only some requests need, so that workers start
+    without them. ``load_all`` imports every lazy module up front, which the
+    startup preload does before a worker accepts traffic.
+
+    Attributes:
+        name (str): Dotted path of the module.
+    """
+
+    instances = []
+
+    def __init__(self, name):
+        self.name = name
+        self._module = None
+        LazyModule.instances.append(self)
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.name)
+        return self._module
+
+    @classmethod
+    def load_all(cls):
+        for instance in cls.instances:
+            instance.load()
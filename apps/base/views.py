@@ -1,11 +1,27 @@
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils import cache as cache_utils
+from django.utils import http as http_utils
+from django.views import View
 from rest_framework import filters as rest_filters
 from rest_framework import generics as rest_generics
+from rest_framework import permissions as rest_permissions
+from rest_framework import response as rest_response
+from rest_framework import views as rest_views
 
+from apps.base import async_views as base_async_views
+from apps.base import constants as base_constants
+from apps.base import image_cache as base_image_cache
+from apps.base import media as base_media
+from apps.base import metrics as base_metrics
 from apps.base import models as base_models
+from apps.base import profiler as base_profiler
 from apps.base import serializers as base_serializers
+from apps.base import tracing as base_tracing
 
 
-class LanguageListView(rest_generics.ListAPIView):
+class LanguageListView(base_tracing.TracedViewMixin, rest_generics.ListAPIView):
     """
     API view to retrieve a list of all languages.
 
@@ -24,11 +40,12 @@ class LanguageListView(rest_generics.ListAPIView):
                 ]
     """
 
+    read_replica = True
     queryset = base_models.Language.objects.all()
     serializer_class = base_serializers.LanguageSerializer
 
 
-class GenreListView(rest_generics.ListAPIView):
+class GenreListView(base_tracing.TracedViewMixin, rest_generics.ListAPIView):
     """
     API view to retrieve a list of all genres.
 
@@ -47,11 +64,12 @@ class GenreListView(rest_generics.ListAPIView):
                 ]
     """
 
+    read_replica = True
     queryset = base_models.Genre.objects.all()
     serializer_class = base_serializers.GenreSerializer
 
 
-class CityListView(rest_generics.ListAPIView):
+class CityListView(base_tracing.TracedViewMixin, rest_generics.ListAPIView):
     """
     API view to retrieve a list of all cities.
 
@@ -76,7 +94,190 @@ class CityListView(rest_generics.ListAPIView):
                 ]
     """
 
+    read_replica = True
     queryset = base_models.City.objects.all()
     serializer_class = base_serializers.CitySerializer
     filter_backends = [rest_filters.SearchFilter]
     search_fields = ["name"]
+
+
+class AsyncLanguageListView(base_async_views.AsyncReadOnlyViewMixin, LanguageListView):
+    """
+    Async version of LanguageListView for the ASGI stack.
+    """
+
+
+class AsyncGenreListView(base_async_views.AsyncReadOnlyViewMixin, GenreListView):
+    """
+    Async version of GenreListView for the ASGI stack.
+    """
+
+
+class AsyncCityListView(base_async_views.AsyncReadOnlyViewMixin, CityListView):
+    """
+    Async version of CityListView for the ASGI stack.
+    """
+
+
+class ProfileArtifactView(rest_views.APIView):
+    """
+    API view to download the raw cProfile dump of a profiled request.
+
+    Permissions: IsAdminUser:
+        Only staff users can download profile artifacts.
+
+    Method: GET
+        Parameters:
+            profile_id (uuid, path parameter):
+                Identifier returned in the profile report.
+        Response:
+            200 OK:
+                The ``.prof`` file, readable with pstats or snakeviz.
+        Error:
+            404 Not Found:
+                - No artifact exists for the given identifier.
+    """
+
+    permission_classes = [rest_permissions.IsAdminUser]
+
+    def get(self, request, profile_id):
+        artifact_path = base_profiler.get_artifact_path(profile_id)
+        if not artifact_path.exists():
+            raise Http404
+        return FileResponse(open(artifact_path, "rb"), as_attachment=True)
+
+
+class MetricsView(rest_views.APIView):
+    """
+    API view exposing process-local runtime metrics of the worker that
+    serves the request.
+
+    Permissions: IsAdminUser:
+        Only staff users can read metrics.
+
+    Method: GET
+        Parameters: None
+        Response:
+            200 OK:
+                Example:
+                {
+                    "database_pools": {
+                        "default": {
+                            "size": 4,
+                            "max_size": 10,
+                            "in_use": 1,
+                            "available": 3,
+                            "utilization": 0.1,
+                            "requests": 1520,
+                            "requests_waiting": 0,
+                            "requests_queued": 12,
+                            "average_wait_ms": 3.5,
+                            ...
+                        }
+                    },
+                    "counters": {
+                        "db.pool.exhausted": 0
+                    }
+                }
+    """
+
+    permission_classes = [rest_permissions.IsAdminUser]
+
+    def get(self, request):
+        return rest_response.Response(
+            {
+                "database_pools": base_metrics.get_pool_stats(),
+                "counters": base_metrics.get_counters(),
+            }
+        )
+
+
+class ResizedImageView(View):
+    """
+    View serving a poster or cinema image from the media storage at one of
+    the allowed widths, resized on first request and then from the resized
+    image cache.
+
+    A plain Django view, as it serves image bytes rather than an API
+    representation.
+
+    Method: GET
+        Parameters:
+            width (int, path parameter):
+                One of ImageConstants.RESIZE_WIDTHS. Narrower images are
+                not enlarged.
+            name (str, path parameter):
+                Storage name of the image, as in its media URL.
+                Example: /api/media/480/movies/poster.jpg
+        Response:
+            200 OK:
+                The image as WebP when the Accept header allows it, JPEG
+                otherwise.
+            304 Not Modified:
+                The If-None-Match header matches the resized image.
+        Error:
+            404 Not Found:
+                - The width is not allowed.
+                - The image does not exist, is outside the served
+                  directories or cannot be decoded.
+    """
+
+    def get(self, request, width, name):
+        if width not in base_constants.ImageConstants.RESIZE_WIDTHS or not name.startswith(
+            base_constants.ImageConstants.RESIZE_DIRECTORIES
+        ):
+            raise Http404
+        try:
+            modified_time = default_storage.get_modified_time(name)
+        except (OSError, SuspiciousFileOperation):
+            raise Http404
+
+        image_format = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+        key = base_image_cache.get_key(name, modified_time, width, image_format)
+        etag = f'"{key}"'
+        if etag in http_utils.parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            try:
+                file = base_image_cache.get_resized(name, key, width, image_format)
+            except (OSError, SuspiciousFileOperation):
+                raise Http404
+            response = FileResponse(file, content_type=f"image/{image_format}")
+
+        response.headers["ETag"] = etag
+        cache_utils.patch_cache_control(
+            response, public=True, max_age=base_constants.ImageConstants.RESIZE_MAX_AGE
+        )
+        cache_utils.patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class MediaView(View):
+    """
+    View serving uploaded files from MEDIA_ROOT without reading them in
+    Python, see ``apps.base.media.serve``.
+
+    Method: GET, HEAD
+        Parameters:
+            name (str, path parameter):
+                Storage name of the file.
+                Example: /media/movies/variants/3f2a9c0d1e4b5a67.webp
+            Range (header, optional):
+                A single byte range, e.g. "bytes=0-1023".
+            If-None-Match, If-Modified-Since, If-Range (headers, optional)
+        Response:
+            200 OK:
+                The file, with ETag, Last-Modified and Cache-Control.
+            206 Partial Content:
+                The requested range of the file.
+            304 Not Modified:
+                The client's copy is current.
+        Error:
+            404 Not Found:
+                - No such file under MEDIA_ROOT.
+            416 Range Not Satisfiable:
+                - The range starts past the end of the file.
+    """
+
+    def get(self, request, name):
+        return base_media.serve(request, name)
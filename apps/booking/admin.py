@@ -1,5 +1,51 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
+from django.utils import timezone
 
+from apps.base import admin as base_admin
+from apps.booking import constants as booking_constants
 from apps.booking import models as booking_models
+from apps.booking import rollups as booking_rollups
 
-admin.site.register(booking_models.Booking)
+
+@admin.register(booking_models.Booking)
+class BookingAdmin(base_admin.LargeTableAdmin):
+    """
+    Admin configuration for Booking model.
+
+    Slots and seats are picked by ID, as their tables are too large for a
+    select box, and users with the autocomplete widget. The date hierarchy
+    filters on the created_at index.
+    """
+
+    list_display = ("id", "user", "slot", "status", "created_at")
+    list_select_related = ("user", "slot__movie", "slot__cinema", "slot__language")
+    list_filter = ("status",)
+    date_hierarchy = "created_at"
+    raw_id_fields = ("slot", "seats")
+    autocomplete_fields = ("user",)
+    ordering = ("-created_at",)
+    actions = ["cancel_bookings"]
+
+    @admin.action(description="Cancel selected bookings")
+    def cancel_bookings(self, request, queryset):
+        """
+        Cancels the selected active bookings in one UPDATE, and takes them
+        out of the booking rollups with grouped queries rather than one
+        save per booking.
+        """
+        database = queryset.db
+        with transaction.atomic(using=database):
+            # Locked, so that the rollups count exactly the bookings updated.
+            booking_ids = list(
+                queryset.filter(status=booking_constants.BookingStatus.BOOKED)
+                .select_for_update()
+                .values_list("id", flat=True)
+            )
+            active = booking_models.Booking.objects.using(database).filter(id__in=booking_ids)
+            changes = booking_rollups.get_cancellation_changes(active)
+            count = active.update(
+                status=booking_constants.BookingStatus.CANCELLED, updated_at=timezone.now()
+            )
+            transaction.on_commit(lambda: booking_rollups.record_changes(changes), using=database)
+        self.message_user(request, f"Cancelled {count} bookings.", messages.SUCCESS)
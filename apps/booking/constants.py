@@ -18,6 +18,31 @@ class BookingStatus(db_models.TextChoices):
     CANCELLED = "C", "Cancelled"
 
 
+class RollupDimension(db_models.TextChoices):
+    """
+    What a booking rollup row totals: one cinema, movie or city.
+    """
+
+    CINEMA = "cinema", "Cinema"
+    MOVIE = "movie", "Movie"
+    CITY = "city", "City"
+
+
+class RollupConstants:
+    """
+    Constants used for the booking rollups.
+    """
+
+    DIMENSION_MAX_LENGTH = 6
+    # Days an analytics request may cover, which bounds its cost.
+    MAX_DAYS = 366
+    DEFAULT_DAYS = 30
+    # Days recomputed and replaced per transaction by the rebuild command.
+    REBUILD_DAYS_PER_BATCH = 7
+    # Totals kept per row.
+    FIELDS = ("revenue", "seats_sold", "seats_offered", "shows", "bookings", "cancellations")
+
+
 class ErrorMessages:
     """
     Centralized error message constants for the Booking app.
@@ -31,3 +56,40 @@ class ErrorMessages:
     # Cancellation Errors
     ALREADY_CANCELLED = "This booking has already been cancelled."
     PAST_SHOW_CANCEL = "Cannot cancel a booking for a show that has already started or finished."
+
+    # Export Errors
+    EXPORT_SCOPE_REQUIRED = "Please select a cinema or a showtime to export."
+
+    # Analytics Errors
+    INVALID_DATE_RANGE = "The end date must not be before the start date."
+    DATE_RANGE_TOO_LONG = "Please select at most {days} days."
+    REBUILD_ARCHIVED_DAYS = (
+        "Shows before {day} may have been archived, and rebuilding their days would delete "
+        "their rollups. Start on {day} or later, or pass --force."
+    )
+
+
+class ExportConstants:
+    """
+    Constants used for exporting bookings.
+    """
+
+    # Rows fetched per round trip from the server-side cursor, and looked up
+    # together in the shared catalog and user tables.
+    CHUNK_SIZE = 2000
+    CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+    # One row per booked seat.
+    COLUMNS = (
+        "booking_id",
+        "status",
+        "booked_at",
+        "slot_id",
+        "show_start",
+        "movie_id",
+        "movie_name",
+        "cinema_id",
+        "seat_id",
+        "row_number",
+        "seat_number",
+        "user_email",
+    )
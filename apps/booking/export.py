@@ -0,0 +1,157 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+
+from django.utils import timezone
+
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.movie import models as movie_models
+from apps.user import models as user_models
+
+
+def get_queryset(cinema_id=None, slot_id=None, show_date=None, status=None):
+    """
+    Returns the booked seats of a cinema or a slot as value tuples ordered
+    by booking, read from the database holding the slot.
+
+    Users and movie names are not joined: they are shared tables, which a
+    city shard does not hold, and are looked up per chunk instead.
+
+    Args:
+        cinema_id (int): Export the bookings of this cinema.
+        slot_id (int): Export the bookings of this slot; takes precedence.
+        show_date (date): Only shows starting on this day, in the current
+            time zone.
+        status (str): Only bookings with this status.
+    """
+    through = booking_models.Booking.seats.through
+    if slot_id is not None:
+        queryset = through.objects.db_manager(hints={"slot_id": slot_id}).filter(
+            booking__slot_id=slot_id
+        )
+    else:
+        queryset = through.objects.db_manager(hints={"cinema_id": cinema_id}).filter(
+            booking__slot__cinema_id=cinema_id
+        )
+
+    if show_date is not None:
+        start = timezone.make_aware(datetime.datetime.combine(show_date, datetime.time.min))
+        # A range on the partition key lets PostgreSQL scan one partition.
+        queryset = queryset.filter(
+            booking__slot__start_time__gte=start,
+            booking__slot__start_time__lt=start + datetime.timedelta(days=1),
+        )
+    if status:
+        queryset = queryset.filter(booking__status=status)
+
+    return queryset.order_by("booking_id", "seat__row_number", "seat__seat_number").values_list(
+        "booking_id",
+        "booking__status",
+        "booking__created_at",
+        "booking__slot_id",
+        "booking__slot__start_time",
+        "booking__slot__movie_id",
+        "booking__slot__cinema_id",
+        "seat_id",
+        "seat__row_number",
+        "seat__seat_number",
+        "booking__user_id",
+    )
+
+
+def iter_chunks(queryset, chunk_size=booking_constants.ExportConstants.CHUNK_SIZE):
+    """
+    Yields lists of at most ``chunk_size`` export rows, in the order of
+    ExportConstants.COLUMNS.
+
+    Rows come from a server-side cursor on PostgreSQL, so memory use depends
+    on the chunk size rather than on the number of rows. Movie names are
+    remembered for the whole export; user emails only for their chunk.
+    """
+    movie_names = {}
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        missing = {row[5] for row in chunk} - movie_names.keys()
+        if missing:
+            movie_names.update(
+                movie_models.Movie.objects.filter(id__in=missing).values_list("id", "name")
+            )
+        emails = dict(
+            user_models.User.objects.filter(id__in={row[10] for row in chunk}).values_list(
+                "id", "email"
+            )
+        )
+
+        yield [
+            (
+                booking_id,
+                status,
+                booked_at,
+                slot_id,
+                show_start,
+                movie_id,
+                movie_names.get(movie_id),
+                cinema_id,
+                seat_id,
+                row_number,
+                seat_number,
+                emails.get(user_id),
+            )
+            for (
+                booking_id,
+                status,
+                booked_at,
+                slot_id,
+                show_start,
+                movie_id,
+                cinema_id,
+                seat_id,
+                row_number,
+                seat_number,
+                user_id,
+            ) in chunk
+        ]
+
+
+def _format(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def render_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(booking_constants.ExportConstants.COLUMNS)
+    yield buffer.getvalue()
+
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_format(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+
+
+def render_jsonl(chunks):
+    columns = booking_constants.ExportConstants.COLUMNS
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=datetime.datetime.isoformat) + "\n"
+            for row in chunk
+        )
+
+
+RENDERERS = {"csv": render_csv, "jsonl": render_jsonl}
+
+
+def export(queryset, file_format, chunk_size=booking_constants.ExportConstants.CHUNK_SIZE):
+    """
+    Returns a generator of text, one piece per chunk of rows, of the export
+    of ``queryset`` (see ``get_queryset``) as "csv" or "jsonl".
+    """
+    return RENDERERS[file_format](iter_chunks(queryset, chunk_size))
@@ -0,0 +1,62 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.booking import constants as booking_constants
+from apps.booking import export as booking_export
+
+
+class Command(BaseCommand):
+    """
+    Writes the bookings of a cinema or a showtime as CSV or JSONL, one row
+    per booked seat, the same as the booking export endpoint.
+
+    Rows are streamed from a server-side cursor and written chunk by chunk,
+    so memory use does not grow with the number of bookings.
+
+    Usage:
+        python manage.py export_bookings --cinema 3 --date 2026-10-18 --output bookings.csv
+        python manage.py export_bookings --slot 7 --format jsonl > bookings.jsonl
+    """
+
+    help = "Exports the bookings of a cinema or a showtime as CSV or JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cinema", type=int)
+        parser.add_argument("--slot", type=int)
+        parser.add_argument(
+            "--date", type=datetime.date.fromisoformat, help="Only shows starting on this day."
+        )
+        parser.add_argument("--status", choices=booking_constants.BookingStatus.values)
+        parser.add_argument(
+            "--format", choices=booking_export.RENDERERS, default="csv", dest="file_format"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=booking_constants.ExportConstants.CHUNK_SIZE
+        )
+        parser.add_argument("--output", help="File to write, standard output by default.")
+
+    def handle(self, *args, **options):
+        if options["cinema"] is None and options["slot"] is None:
+            raise CommandError(booking_constants.ErrorMessages.EXPORT_SCOPE_REQUIRED)
+
+        queryset = booking_export.get_queryset(
+            cinema_id=options["cinema"],
+            slot_id=options["slot"],
+            show_date=options["date"],
+            status=options["status"],
+        )
+        output = (
+            open(options["output"], "w", encoding="utf-8", newline="")
+            if options["output"]
+            else sys.stdout
+        )
+        try:
+            for text in booking_export.export(
+                queryset, options["file_format"], options["chunk_size"]
+            ):
+                output.write(text)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,67 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.booking import constants as booking_constants
+from apps.booking import rollups as booking_rollups
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the booking rollups of a range of show days from the slots
+    and bookings on every database, replacing the stored rows.
+
+    Use it to fill the rollups for existing history, and to correct days
+    after changes the incremental updates do not see, such as bulk
+    updates, deleted bookings or seats changed from the seat side. Days are
+    rebuilt in batches, each in its own transaction.
+
+    Days whose shows may have been archived (see archive_finished_shows)
+    have nothing left to count, and rebuilding them would delete their
+    rollups, so ranges starting before them are refused unless ``--force``
+    is given, e.g. when shows were archived with a longer retention.
+
+    Usage:
+        python manage.py rebuild_booking_rollups --start 2026-01-01
+        python manage.py rebuild_booking_rollups --start 2026-10-01 --end 2026-10-07
+        python manage.py rebuild_booking_rollups --start 2026-01-01 --force
+    """
+
+    help = "Recomputes the booking rollups of a range of show days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=datetime.date.fromisoformat, required=True)
+        parser.add_argument(
+            "--end", type=datetime.date.fromisoformat, help="Last day, today by default."
+        )
+        parser.add_argument(
+            "--days-per-batch",
+            type=int,
+            default=booking_constants.RollupConstants.REBUILD_DAYS_PER_BATCH,
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Also rebuild days that may have been archived."
+        )
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+        if end < start:
+            raise CommandError(booking_constants.ErrorMessages.INVALID_DATE_RANGE)
+        first_day = booking_rollups.get_first_rebuildable_day()
+        if start < first_day and not options["force"]:
+            raise CommandError(
+                booking_constants.ErrorMessages.REBUILD_ARCHIVED_DAYS.format(day=first_day)
+            )
+
+        step = datetime.timedelta(days=options["days_per_batch"])
+        total = 0
+        while start <= end:
+            batch_end = min(start + step - datetime.timedelta(days=1), end)
+            rows = booking_rollups.rebuild(start, batch_end)
+            self.stdout.write(f"{start} to {batch_end}: {rows} rollup rows.")
+            total += rows
+            start = batch_end + datetime.timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} rollup rows."))
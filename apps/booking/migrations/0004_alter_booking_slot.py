@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_alter_booking_user'),
+        ('slot', '0005_alter_slot_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='slot',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='slot.slot'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_alter_booking_slot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('dimension', models.CharField(choices=[('cinema', 'Cinema'), ('movie', 'Movie'), ('city', 'City')], max_length=6)),
+                ('object_id', models.BigIntegerField()),
+                ('day', models.DateField()),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('seats_sold', models.IntegerField(default=0)),
+                ('seats_offered', models.IntegerField(default=0)),
+                ('shows', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'object_id', 'day'), name='unique_rollup_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_bookingrollup'),
+        ('cinema', '0006_seatheatmap'),
+        ('slot', '0006_partition_slot_by_start_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at'], name='booking_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from apps.base import sharding as base_sharding
+
+FIELDS = ["user"]
+
+
+def add_foreign_keys(apps, schema_editor):
+    """
+    Enforces the foreign keys of bookings on the default database,
+    which holds the tables they reference; shards leave them unenforced.
+    """
+    base_sharding.add_foreign_keys(schema_editor, apps.get_model("booking", "Booking"), FIELDS)
+
+
+def remove_foreign_keys(apps, schema_editor):
+    base_sharding.remove_foreign_keys(schema_editor, apps.get_model("booking", "Booking"), FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_booking_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_foreign_keys, remove_foreign_keys),
+    ]
@@ -1,12 +1,20 @@
 from django.core.exceptions import ValidationError
 from django.db import models as db_models
+from django.db import transaction as db_transaction
+from django.dispatch import receiver
 
 from apps.base import models as base_models
+from apps.base import sharding as base_sharding
+from apps.base import utils as base_utils
 from apps.booking import constants as booking_constants
+from apps.booking import rollups as booking_rollups
 from apps.cinema import models as cinema_models
 from apps.slot import models as slot_models
 from apps.user import models as user_models
 
+# Imported on the first booking counted, keeping NumPy off the startup path.
+movie_trending = base_utils.LazyModule("apps.movie.trending")
+
 
 class Booking(base_models.TimeStampedModel):
     """
@@ -19,10 +27,20 @@ class Booking(base_models.TimeStampedModel):
     """
 
     user = db_models.ForeignKey(
-        user_models.User, on_delete=db_models.CASCADE, related_name="bookings"
+        user_models.User,
+        on_delete=db_models.CASCADE,
+        related_name="bookings",
+        # Bookings can live on a city shard while users are shared; the
+        # reference is enforced on the default database only (migration 0007)
+        db_constraint=False,
     )
     slot = db_models.ForeignKey(
-        slot_models.Slot, on_delete=db_models.CASCADE, related_name="bookings"
+        slot_models.Slot,
+        on_delete=db_models.CASCADE,
+        related_name="bookings",
+        # The slot table is partitioned by start time, so its primary key is
+        # (id, start_time) and cannot be referenced by slot ID alone.
+        db_constraint=False,
     )
     status = db_models.CharField(
         max_length=booking_constants.BookingConstants.STATUS_MAX_LENGTH,
@@ -31,6 +49,12 @@ class Booking(base_models.TimeStampedModel):
     )
     seats = db_models.ManyToManyField(cinema_models.Seat, related_name="bookings")
 
+    objects = base_sharding.ShardedQuerySet.as_manager()
+
+    class Meta:
+        # Backs the date hierarchy of the admin.
+        indexes = [db_models.Index(fields=["created_at"], name="booking_created_at_idx")]
+
     def __str__(self):
         return f"Booking {self.id} by {self.user.email} for {self.slot}"
 
@@ -46,11 +70,177 @@ class Booking(base_models.TimeStampedModel):
             return
 
         # Check if this seat is already taken for this specific slot
-        occupied = Booking.objects.filter(
-            slot=self.slot,
-            status=booking_constants.BookingStatus.BOOKED,
-            seats__in=self.seats.all(),
-        ).exclude(id=self.id)
+        occupied = (
+            Booking.objects.db_manager(hints={"instance": self})
+            .filter(
+                slot=self.slot,
+                status=booking_constants.BookingStatus.BOOKED,
+                seats__in=self.seats.all(),
+            )
+            .exclude(id=self.id)
+        )
 
         if occupied.exists():
             raise ValidationError(booking_constants.ErrorMessages.SEAT_ALREADY_OCCUPIED)
+
+
+class BookingRollup(base_models.TimeStampedModel):
+    """
+    Booking totals of one cinema, movie or city for the shows of one day.
+
+    Rows are updated as bookings are made and cancelled and as shows are
+    scheduled, and can be recomputed for a range of days with the
+    rebuild_booking_rollups command. They live on the default database and
+    are kept after the shows and bookings they count are archived.
+
+    Attributes:
+        dimension (str): Whether the row totals a cinema, movie or city.
+        object_id (int): ID of that cinema, movie or city.
+        day (date): Local date the shows start on.
+        revenue (int): Price of the booked seats.
+        seats_sold (int): Seats of active bookings.
+        seats_offered (int): Seats of the scheduled shows.
+        shows (int): Scheduled shows.
+        bookings (int): Active bookings.
+        cancellations (int): Cancelled bookings.
+    """
+
+    dimension = db_models.CharField(
+        max_length=booking_constants.RollupConstants.DIMENSION_MAX_LENGTH,
+        choices=booking_constants.RollupDimension.choices,
+    )
+    object_id = db_models.BigIntegerField()
+    day = db_models.DateField()
+    revenue = db_models.BigIntegerField(default=0)
+    seats_sold = db_models.IntegerField(default=0)
+    seats_offered = db_models.IntegerField(default=0)
+    shows = db_models.IntegerField(default=0)
+    bookings = db_models.IntegerField(default=0)
+    cancellations = db_models.IntegerField(default=0)
+
+    class Meta:
+        # Also the index analytics queries read a day range from.
+        constraints = [
+            db_models.UniqueConstraint(
+                fields=["dimension", "object_id", "day"],
+                name="unique_rollup_per_day",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_dimension_display()} {self.object_id} on {self.day}"
+
+
+@receiver(db_models.signals.post_save, sender=slot_models.Slot)
+def count_scheduled_show(sender, instance, created, **kwargs):
+    """
+    Adds a new show and its seats to the rollups of its day once the slot
+    is committed.
+
+    Args:
+        sender (Model): The model class (Slot).
+        instance (Slot): The slot saved.
+        created (bool): Boolean indicating if a new record was created.
+    """
+    if created:
+        db_transaction.on_commit(
+            lambda: booking_rollups.record_show(instance), using=instance._state.db
+        )
+
+
+@receiver(db_models.signals.pre_save, sender=Booking)
+def remember_booking_status(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps the stored status of a booking being saved, so that the rollups
+    can tell a cancellation from other changes.
+
+    Args:
+        sender (Model): The model class (Booking).
+        instance (Booking): The booking being saved.
+        update_fields (frozenset): Fields being saved, None for all.
+    """
+    if instance._state.adding or (update_fields is not None and "status" not in update_fields):
+        instance._rollup_status = None
+        return
+    instance._rollup_status = (
+        Booking.objects.using(instance._state.db)
+        .filter(pk=instance.pk)
+        .values_list("status", flat=True)
+        .first()
+    )
+
+
+@receiver(db_models.signals.post_save, sender=Booking)
+def count_booking_status(sender, instance, created, **kwargs):
+    """
+    Counts a new booking, or a booking cancelled or restored along with its
+    seats and revenue, in the rollups once the save is committed.
+
+    Args:
+        sender (Model): The model class (Booking).
+        instance (Booking): The booking saved.
+        created (bool): Boolean indicating if a new record was created.
+    """
+    previous = None if created else getattr(instance, "_rollup_status", None)
+    if created or (previous is not None and previous != instance.status):
+        status = instance.status
+        # Counted now: the seats may be changed later in the transaction.
+        seats = 0 if created else instance.seats.count()
+        db_transaction.on_commit(
+            lambda: booking_rollups.record_status(instance, previous, status, seats),
+            using=instance._state.db,
+        )
+
+
+@receiver(db_models.signals.post_save, sender=Booking)
+def count_trending_booking(sender, instance, created, **kwargs):
+    """
+    Counts a new booking towards its movie trending in its city once the
+    booking is committed.
+
+    Args:
+        sender (Model): The model class (Booking).
+        instance (Booking): The booking saved.
+        created (bool): Boolean indicating if a new record was created.
+    """
+    if created and instance.status == booking_constants.BookingStatus.BOOKED:
+        db_transaction.on_commit(
+            lambda: movie_trending.record_booking(instance), using=instance._state.db
+        )
+
+
+@receiver(db_models.signals.m2m_changed, sender=Booking.seats.through)
+def count_booked_seats(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Counts seats added to or removed from an active booking, and their
+    revenue, in the rollups once the change is committed.
+
+    Changes made from the seat side (``seat.bookings``) are not counted;
+    the rebuild command picks them up.
+
+    Args:
+        sender (Model): The through model of Booking.seats.
+        instance (Booking): The booking whose seats changed.
+        action (str): The m2m_changed action.
+        reverse (bool): Whether the change was made from the seat side.
+        pk_set (set): IDs of the seats added or removed.
+    """
+    if reverse or instance.status != booking_constants.BookingStatus.BOOKED:
+        return
+
+    if action == "pre_clear":
+        instance._rollup_cleared = instance.seats.count()
+        return
+    if action == "post_add":
+        seats = len(pk_set)
+    elif action == "post_remove":
+        seats = -len(pk_set)
+    elif action == "post_clear":
+        seats = -getattr(instance, "_rollup_cleared", 0)
+    else:
+        return
+
+    if seats:
+        db_transaction.on_commit(
+            lambda: booking_rollups.record_seats(instance, seats), using=instance._state.db
+        )
@@ -0,0 +1,284 @@
+import collections
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.base import sharding as base_sharding
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.cinema import models as cinema_models
+from apps.slot import models as slot_models
+
+
+def get_dimensions(cinema_id, movie_id, city_id):
+    """
+    Returns the (dimension, object ID) of every rollup row a show counts
+    towards, always in the same order so that concurrent updates take
+    their row locks in the same order.
+    """
+    return [
+        (booking_constants.RollupDimension.CINEMA, cinema_id),
+        (booking_constants.RollupDimension.MOVIE, movie_id),
+        (booking_constants.RollupDimension.CITY, city_id),
+    ]
+
+
+def apply(day, cinema_id, movie_id, city_id, **changes):
+    """
+    Adds ``changes``, a mapping of rollup field to amount, to the rollups of
+    a cinema, movie and city for ``day``, creating missing rows.
+
+    Each row is updated with a single ``UPDATE ... SET field = field + n``
+    in its own transaction, so that rows are locked only briefly however
+    many bookings of a city come in at once.
+    """
+    changes = {field: amount for field, amount in changes.items() if amount}
+    if not changes:
+        return
+
+    increments = {field: F(field) + amount for field, amount in changes.items()}
+    for dimension, object_id in get_dimensions(cinema_id, movie_id, city_id):
+        if object_id is None:
+            continue
+        rows = booking_models.BookingRollup.objects.filter(
+            dimension=dimension, object_id=object_id, day=day
+        )
+        if rows.update(**increments, updated_at=timezone.now()):
+            continue
+        try:
+            with transaction.atomic():
+                booking_models.BookingRollup.objects.create(
+                    dimension=dimension, object_id=object_id, day=day, **changes
+                )
+        except IntegrityError:
+            # Created by a concurrent update in the meantime.
+            rows.update(**increments, updated_at=timezone.now())
+
+
+def get_capacity(cinema_id):
+    """
+    Returns the city and the number of seats of a cinema.
+    """
+    rows, seats_per_row = (
+        cinema_models.Cinema.objects.filter(pk=cinema_id)
+        .values_list("rows", "seats_per_row")
+        .first()
+    ) or (0, 0)
+    return base_sharding.get_cinema_city(cinema_id), rows * seats_per_row
+
+
+def record_show(slot):
+    city_id, capacity = get_capacity(slot.cinema_id)
+    apply(
+        timezone.localdate(slot.start_time),
+        slot.cinema_id,
+        slot.movie_id,
+        city_id,
+        shows=1,
+        seats_offered=capacity,
+    )
+
+
+def record_status(booking, previous, status, seats):
+    """
+    Records a booking made, or changed from ``previous`` to ``status`` with
+    ``seats`` seats. Seats are counted as they are added to the booking, so
+    a new booking only counts itself.
+    """
+    slot = booking.slot
+    changes = collections.Counter()
+    if previous is None:
+        booked = status == booking_constants.BookingStatus.BOOKED
+        changes["bookings" if booked else "cancellations"] += 1
+    else:
+        sign = 1 if status == booking_constants.BookingStatus.BOOKED else -1
+        changes.update(
+            bookings=sign,
+            cancellations=-sign,
+            seats_sold=sign * seats,
+            revenue=sign * seats * slot.price,
+        )
+    apply(
+        timezone.localdate(slot.start_time),
+        slot.cinema_id,
+        slot.movie_id,
+        base_sharding.get_cinema_city(slot.cinema_id),
+        **changes,
+    )
+
+
+def record_seats(booking, seats):
+    """
+    Records ``seats`` seats added to an active booking, or removed when
+    negative.
+    """
+    slot = booking.slot
+    apply(
+        timezone.localdate(slot.start_time),
+        slot.cinema_id,
+        slot.movie_id,
+        base_sharding.get_cinema_city(slot.cinema_id),
+        seats_sold=seats,
+        revenue=seats * slot.price,
+    )
+
+
+def get_cancellation_changes(bookings):
+    """
+    Returns the rollup changes of cancelling the active ``bookings``, by
+    (day, cinema ID, movie ID), computed with two grouped queries.
+    """
+    tzinfo = timezone.get_current_timezone()
+    changes = collections.defaultdict(collections.Counter)
+
+    counts = (
+        bookings.annotate(day=TruncDate("slot__start_time", tzinfo=tzinfo))
+        .values("day", "slot__cinema_id", "slot__movie_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in counts:
+        key = (row["day"], row["slot__cinema_id"], row["slot__movie_id"])
+        changes[key].update(bookings=-row["count"], cancellations=row["count"])
+
+    seats = (
+        booking_models.Booking.seats.through.objects.using(bookings.db)
+        .filter(booking__in=bookings)
+        .annotate(day=TruncDate("booking__slot__start_time", tzinfo=tzinfo))
+        .values("day", "booking__slot__cinema_id", "booking__slot__movie_id")
+        .annotate(seats=Count("id"), revenue=Sum("booking__slot__price"))
+        .order_by()
+    )
+    for row in seats:
+        key = (row["day"], row["booking__slot__cinema_id"], row["booking__slot__movie_id"])
+        changes[key].update(seats_sold=-row["seats"], revenue=-row["revenue"])
+    return changes
+
+
+def record_changes(changes):
+    """
+    Applies ``changes`` by (day, cinema ID, movie ID), as returned by
+    ``get_cancellation_changes``.
+    """
+    for (day, cinema_id, movie_id), counts in changes.items():
+        apply(day, cinema_id, movie_id, base_sharding.get_cinema_city(cinema_id), **counts)
+
+
+def compute(start, end):
+    """
+    Returns the rollup totals of the shows of days ``start`` to ``end``,
+    inclusive, computed from the slots and bookings on every database, as
+    unsaved BookingRollup rows.
+    """
+    begin = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    finish = timezone.make_aware(
+        datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min)
+    )
+    tzinfo = timezone.get_current_timezone()
+    totals = collections.defaultdict(collections.Counter)
+
+    for alias in base_sharding.get_databases():
+        slots = (
+            slot_models.Slot.objects.using(alias)
+            .filter(start_time__gte=begin, start_time__lt=finish)
+            .annotate(day=TruncDate("start_time", tzinfo=tzinfo))
+            .values("cinema_id", "movie_id", "day")
+            .annotate(shows=Count("id"))
+            .order_by()
+        )
+        for row in slots:
+            totals[row["cinema_id"], row["movie_id"], row["day"]]["shows"] += row["shows"]
+
+        bookings = (
+            booking_models.Booking.objects.using(alias)
+            .filter(slot__start_time__gte=begin, slot__start_time__lt=finish)
+            .annotate(day=TruncDate("slot__start_time", tzinfo=tzinfo))
+            .values("slot__cinema_id", "slot__movie_id", "day", "status")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row in bookings:
+            field = (
+                "bookings"
+                if row["status"] == booking_constants.BookingStatus.BOOKED
+                else "cancellations"
+            )
+            totals[row["slot__cinema_id"], row["slot__movie_id"], row["day"]][field] += row["count"]
+
+        seats = (
+            booking_models.Booking.seats.through.objects.using(alias)
+            .filter(
+                booking__status=booking_constants.BookingStatus.BOOKED,
+                booking__slot__start_time__gte=begin,
+                booking__slot__start_time__lt=finish,
+            )
+            .annotate(day=TruncDate("booking__slot__start_time", tzinfo=tzinfo))
+            .values("booking__slot__cinema_id", "booking__slot__movie_id", "day")
+            .annotate(seats=Count("id"), revenue=Sum("booking__slot__price"))
+            .order_by()
+        )
+        for row in seats:
+            key = (row["booking__slot__cinema_id"], row["booking__slot__movie_id"], row["day"])
+            totals[key].update(seats_sold=row["seats"], revenue=row["revenue"])
+
+    cinema_rows = (
+        cinema_models.Cinema.objects.using(base_sharding.PRIMARY_ALIAS)
+        .filter(id__in={cinema_id for cinema_id, _, _ in totals})
+        .values_list("id", "city_id", "rows", "seats_per_row")
+    )
+    cinemas = {
+        cinema_id: (city_id, rows * seats_per_row)
+        for cinema_id, city_id, rows, seats_per_row in cinema_rows
+    }
+
+    rollups = collections.defaultdict(collections.Counter)
+    for (cinema_id, movie_id, day), counts in totals.items():
+        city_id, capacity = cinemas.get(cinema_id, (None, 0))
+        counts["seats_offered"] = counts["shows"] * capacity
+        for dimension, object_id in get_dimensions(cinema_id, movie_id, city_id):
+            if object_id is not None:
+                rollups[dimension, object_id, day].update(counts)
+
+    return [
+        booking_models.BookingRollup(
+            dimension=dimension,
+            object_id=object_id,
+            day=day,
+            **{field: counts[field] for field in booking_constants.RollupConstants.FIELDS},
+        )
+        for (dimension, object_id, day), counts in rollups.items()
+    ]
+
+
+def get_first_rebuildable_day():
+    """
+    Returns the first show day whose shows are all still in the databases.
+
+    archive_finished_shows deletes the shows that ended more than
+    SHOW_ARCHIVE_RETENTION_DAYS ago; those of later days started, and so
+    ended, after that.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=settings.SHOW_ARCHIVE_RETENTION_DAYS)
+    return timezone.localdate(cutoff) + datetime.timedelta(days=1)
+
+
+def rebuild(start, end):
+    """
+    Replaces the rollups of days ``start`` to ``end``, inclusive, with
+    totals recomputed from the slots and bookings, in one transaction.
+
+    Returns the number of rows written. Days whose shows were archived have
+    no slots left to count and end up without rollups: callers start at
+    ``get_first_rebuildable_day`` at the earliest.
+    """
+    rollups = compute(start, end)
+    with transaction.atomic(using=base_sharding.PRIMARY_ALIAS):
+        booking_models.BookingRollup.objects.using(base_sharding.PRIMARY_ALIAS).filter(
+            day__gte=start, day__lte=end
+        ).delete()
+        booking_models.BookingRollup.objects.using(base_sharding.PRIMARY_ALIAS).bulk_create(rollups)
+    return len(rollups)
@@ -0,0 +1,104 @@
+import datetime
+
+from django.utils import timezone
+from rest_framework import serializers as rest_serializers
+
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+
+
+class BookingExportSerializer(rest_serializers.Serializer):
+    """
+    Validates the query parameters of a booking export.
+
+    Fields:
+        cinema (int): Export the bookings of this cinema.
+        slot (int): Export the bookings of this showtime.
+        date (date): Only shows starting on this day.
+        status (str): Only bookings with this status ("B" or "C").
+
+    One of cinema or slot is required.
+    """
+
+    cinema = rest_serializers.IntegerField(required=False, min_value=1)
+    slot = rest_serializers.IntegerField(required=False, min_value=1)
+    date = rest_serializers.DateField(required=False)
+    status = rest_serializers.ChoiceField(
+        choices=booking_constants.BookingStatus.choices, required=False
+    )
+
+    def validate(self, attrs):
+        if "cinema" not in attrs and "slot" not in attrs:
+            raise rest_serializers.ValidationError(
+                booking_constants.ErrorMessages.EXPORT_SCOPE_REQUIRED
+            )
+        return attrs
+
+
+class BookingAnalyticsQuerySerializer(rest_serializers.Serializer):
+    """
+    Validates the date range of a booking analytics request.
+
+    Fields:
+        start (date): First show day, DEFAULT_DAYS before end by default.
+        end (date): Last show day, today by default.
+    """
+
+    start = rest_serializers.DateField(required=False)
+    end = rest_serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault(
+            "start",
+            attrs["end"]
+            - datetime.timedelta(days=booking_constants.RollupConstants.DEFAULT_DAYS - 1),
+        )
+        if attrs["end"] < attrs["start"]:
+            raise rest_serializers.ValidationError(
+                booking_constants.ErrorMessages.INVALID_DATE_RANGE
+            )
+        max_days = booking_constants.RollupConstants.MAX_DAYS
+        if (attrs["end"] - attrs["start"]).days >= max_days:
+            raise rest_serializers.ValidationError(
+                booking_constants.ErrorMessages.DATE_RANGE_TOO_LONG.format(days=max_days)
+            )
+        return attrs
+
+
+class BookingRollupSerializer(rest_serializers.ModelSerializer):
+    """
+    Serializer for the booking totals of one show day.
+
+    Fields:
+        day (date): Show day.
+        revenue (int): Price of the booked seats.
+        seats_sold (int): Seats of active bookings.
+        seats_offered (int): Seats of the scheduled shows.
+        occupancy (float): Share of the offered seats that are sold.
+        shows (int): Scheduled shows.
+        bookings (int): Active bookings.
+        cancellations (int): Cancelled bookings.
+    """
+
+    occupancy = rest_serializers.SerializerMethodField()
+
+    class Meta:
+        model = booking_models.BookingRollup
+        fields = [
+            "day",
+            "revenue",
+            "seats_sold",
+            "seats_offered",
+            "occupancy",
+            "shows",
+            "bookings",
+            "cancellations",
+        ]
+
+    def get_occupancy(self, rollup):
+        return get_occupancy(rollup.seats_sold, rollup.seats_offered)
+
+
+def get_occupancy(seats_sold, seats_offered):
+    return round(seats_sold / seats_offered, 4) if seats_offered else None
@@ -1,3 +1,121 @@
-from django.test import TestCase
+import datetime
+import io
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt import tokens as jwt_tokens
+
+from apps.base import models as base_models
+from apps.base import statement_timeouts as base_statement_timeouts
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.booking import views as booking_views
+from apps.cinema import models as cinema_models
+from apps.movie import models as movie_models
+from apps.slot import models as slot_models
+from apps.user import models as user_models
+
+
+class BookingExportTests(TestCase):
+    """
+    Streaming of the booking export on the WSGI and the ASGI stack.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        city = base_models.City.objects.create(name="mumbai")
+        language = base_models.Language.objects.create(name="english")
+        movie = movie_models.Movie.objects.create(
+            name="movie",
+            description="description",
+            duration=datetime.timedelta(hours=2),
+            release_date=datetime.date(2020, 1, 1),
+            poster="poster.jpg",
+        )
+        cls.cinema = cinema_models.Cinema.objects.create(
+            name="cinema", city=city, address="address", rows=2, seats_per_row=3, image="c.jpg"
+        )
+        start = timezone.now() + datetime.timedelta(days=1)
+        slot = slot_models.Slot.objects.create(
+            price=100,
+            start_time=start,
+            end_time=start + datetime.timedelta(hours=2),
+            movie=movie,
+            cinema=cls.cinema,
+            language=language,
+        )
+        user = user_models.User.objects.create_user(email="user@example.com", password="x")
+        booking = booking_models.Booking.objects.create(user=user, slot=slot)
+        booking.seats.add(*cls.cinema.seats.all()[:2])
+        cls.staff = user_models.User.objects.create_user(
+            email="staff@example.com", password="x", is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("booking-export", args=["csv"]) + f"?cinema={self.cinema.pk}"
+        token = jwt_tokens.AccessToken.for_user(self.staff)
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    @override_settings(DB_STATEMENT_TIMEOUT_READ_MS=2000)
+    def test_export_has_no_query_time_budget(self):
+        self.assertIsNone(
+            base_statement_timeouts.get_view_timeout(booking_views.BookingExportView, "GET")
+        )
+
+    def test_export_is_streamed_on_wsgi(self):
+        response = self.client.get(self.url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+    async def test_export_is_streamed_on_asgi(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([part async for part in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 3)
+
+
+@override_settings(SHOW_ARCHIVE_RETENTION_DAYS=30, DATABASE_SHARDS=[])
+class RebuildBookingRollupsTests(TestCase):
+    """
+    The rebuild_booking_rollups command and days whose shows were archived.
+    """
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.archived_day = today - datetime.timedelta(days=31)
+        booking_models.BookingRollup.objects.create(
+            dimension=booking_constants.RollupDimension.CINEMA,
+            object_id=1,
+            day=self.archived_day,
+            revenue=500,
+        )
+
+    def rebuild(self, start, *args):
+        call_command(
+            "rebuild_booking_rollups", "--start", start.isoformat(), *args, stdout=io.StringIO()
+        )
+
+    def test_days_that_may_have_been_archived_are_refused(self):
+        with self.assertRaises(CommandError):
+            self.rebuild(self.archived_day)
+
+        self.assertTrue(booking_models.BookingRollup.objects.filter(day=self.archived_day))
+
+    def test_later_days_are_rebuilt(self):
+        self.rebuild(timezone.localdate() - datetime.timedelta(days=29))
+
+        self.assertTrue(booking_models.BookingRollup.objects.filter(day=self.archived_day))
+
+    def test_force_rebuilds_days_that_may_have_been_archived(self):
+        self.rebuild(self.archived_day, "--force")
+
+        self.assertFalse(booking_models.BookingRollup.objects.filter(day=self.archived_day))
@@ -0,0 +1,16 @@
+from django.urls import path, re_path
+
+from apps.booking import views as booking_views
+
+urlpatterns = [
+    re_path(
+        r"^export/(?P<file_format>csv|jsonl)/$",
+        booking_views.BookingExportView.as_view(),
+        name="booking-export",
+    ),
+    path(
+        "analytics/<str:dimension>/<int:object_id>/",
+        booking_views.BookingAnalyticsView.as_view(),
+        name="booking-analytics",
+    ),
+]
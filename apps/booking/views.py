@@ -1,3 +1,173 @@
-from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import permissions as rest_permissions
+from rest_framework import response as rest_response
+from rest_framework import views as rest_views
 
-# Create your views here.
+from apps.base import async_views as base_async_views
+from apps.booking import constants as booking_constants
+from apps.booking import export as booking_export
+from apps.booking import models as booking_models
+from apps.booking import serializers as booking_serializers
+
+
+class BookingExportView(rest_views.APIView):
+    """
+    API view to download the bookings of a cinema or a showtime, one row
+    per booked seat with the show, movie and user email.
+
+    The file is streamed while it is read from the database, so it can be
+    of any size, on the WSGI and the ASGI stack alike. The export has no
+    query time budget: its query runs for as long as the file is sent, and
+    cancelling it would cut the file short after the 200 response.
+
+    Permissions: IsAdminUser:
+        Only staff users can export bookings.
+
+    Method: GET
+        Parameters:
+            file_format (str, path parameter):
+                "csv" or "jsonl".
+            cinema (int, query parameter):
+                Cinema whose bookings are exported.
+            slot (int, query parameter):
+                Showtime whose bookings are exported.
+            date (date, optional, query parameter):
+                Only shows starting on this day.
+                Example: /api/bookings/export/csv/?cinema=3&date=2026-10-18
+            status (str, optional, query parameter):
+                Only bookings with this status ("B" or "C").
+        Response:
+            200 OK:
+                The export as an attachment. CSV has a header row; JSONL
+                has one object per line.
+                Example (JSONL):
+                {"booking_id": 41, "status": "B", "booked_at": "...",
+                 "slot_id": 7, "show_start": "...", "movie_id": 2,
+                 "movie_name": "Dune", "cinema_id": 3, "seat_id": 120,
+                 "row_number": 4, "seat_number": 9,
+                 "user_email": "user@example.com"}
+        Error:
+            400 Bad Request:
+                - Neither cinema nor slot is given, or a parameter is invalid.
+    """
+
+    permission_classes = [rest_permissions.IsAdminUser]
+    statement_timeout = 0
+
+    def get(self, request, file_format):
+        serializer = booking_serializers.BookingExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        queryset = booking_export.get_queryset(
+            cinema_id=params.get("cinema"),
+            slot_id=params.get("slot"),
+            show_date=params.get("date"),
+            status=params.get("status"),
+        )
+        content = booking_export.export(queryset, file_format)
+        if isinstance(request._request, ASGIRequest):
+            content = base_async_views.iterate_in_thread(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type=booking_constants.ExportConstants.CONTENT_TYPES[file_format],
+        )
+        scope = f"slot-{params['slot']}" if "slot" in params else f"cinema-{params['cinema']}"
+        if "date" in params:
+            scope = f"{scope}-{params['date'].isoformat()}"
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="bookings-{scope}.{file_format}"'
+        )
+        return response
+
+
+class BookingAnalyticsView(rest_views.APIView):
+    """
+    API view to retrieve the revenue and occupancy of a cinema, movie or
+    city per show day, read from the booking rollups.
+
+    The cost depends only on the number of days requested, not on the
+    number of shows or bookings.
+
+    Permissions: IsAdminUser:
+        Only staff users can read analytics.
+
+    Method: GET
+        Parameters:
+            dimension (str, path parameter):
+                "cinema", "movie" or "city".
+            object_id (int, path parameter):
+                ID of the cinema, movie or city.
+            start (date, optional, query parameter):
+                First show day, 30 days before end by default.
+            end (date, optional, query parameter):
+                Last show day, today by default.
+                Example: /api/bookings/analytics/cinema/3/?start=2026-10-01
+        Response:
+            200 OK:
+                Totals over the range and per day; days without shows are
+                left out.
+                Example:
+                {
+                    "dimension": "cinema",
+                    "id": 3,
+                    "start": "2026-10-01",
+                    "end": "2026-10-19",
+                    "totals": {
+                        "revenue": 184500,
+                        "seats_sold": 1230,
+                        "seats_offered": 2400,
+                        "occupancy": 0.5125,
+                        "shows": 16,
+                        "bookings": 512,
+                        "cancellations": 31
+                    },
+                    "days": [
+                        {
+                            "day": "2026-10-01",
+                            "revenue": 9750,
+                            ...
+                        }
+                    ]
+                }
+        Error:
+            400 Bad Request:
+                - The end is before the start, or the range is longer than
+                  366 days.
+            404 Not Found:
+                - Unknown dimension.
+    """
+
+    permission_classes = [rest_permissions.IsAdminUser]
+    read_replica = True
+
+    def get(self, request, dimension, object_id):
+        if dimension not in booking_constants.RollupDimension.values:
+            raise Http404
+        serializer = booking_serializers.BookingAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        start, end = serializer.validated_data["start"], serializer.validated_data["end"]
+
+        rollups = booking_models.BookingRollup.objects.filter(
+            dimension=dimension, object_id=object_id, day__gte=start, day__lte=end
+        ).order_by("day")
+        days = booking_serializers.BookingRollupSerializer(rollups, many=True).data
+
+        totals = {
+            field: sum(day[field] for day in days)
+            for field in booking_constants.RollupConstants.FIELDS
+        }
+        totals["occupancy"] = booking_serializers.get_occupancy(
+            totals["seats_sold"], totals["seats_offered"]
+        )
+        return rest_response.Response(
+            {
+                "dimension": dimension,
+                "id": object_id,
+                "start": start,
+                "end": end,
+                "totals": totals,
+                "days": days,
+            }
+        )
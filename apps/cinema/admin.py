@@ -1,6 +1,33 @@
 from django.contrib import admin
 
+from apps.base import admin as base_admin
 from apps.cinema import models as cinema_models
 
-admin.site.register(cinema_models.Cinema)
-admin.site.register(cinema_models.Seat)
+
+@admin.register(cinema_models.Cinema)
+class CinemaAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for Cinema model, searchable by name for the
+    autocomplete widgets of the seat and slot admins.
+    """
+
+    list_display = ("name", "city", "rows", "seats_per_row")
+    list_select_related = ("city",)
+    list_filter = ("city",)
+    search_fields = ["name"]
+    autocomplete_fields = ("city",)
+
+
+@admin.register(cinema_models.Seat)
+class SeatAdmin(base_admin.LargeTableAdmin):
+    """
+    Admin configuration for Seat model.
+
+    Seats are listed in the order of the unique (cinema, row, seat) index,
+    with their cinema and its city loaded along with them.
+    """
+
+    list_display = ("id", "cinema", "row_number", "seat_number")
+    list_select_related = ("cinema__city",)
+    autocomplete_fields = ("cinema",)
+    ordering = ("cinema", "row_number", "seat_number")
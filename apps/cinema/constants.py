@@ -5,6 +5,34 @@ class CinemaConstants:
 
     NAME_MAX_LENGTH = 100
     CINEMA_IMAGE_DIR = "cinemas/"
+    # Image variants as name: (width, height), in a 16:9 aspect ratio.
+    IMAGE_VARIANTS = {"thumbnail": (160, 90), "card": (480, 270), "banner": (1280, 720)}
+
+
+class HeatmapConstants:
+    """
+    Constants used for the seat popularity heatmaps.
+    """
+
+    # Shows that started this many days ago or later are counted.
+    DAYS = 90
+    # Arrays stored per cinema, each of shape rows x seats_per_row.
+    ARRAYS = ("popularity", "lead_time_hours", "sell_order")
+    # Decimal places of heatmap values in API responses.
+    PRECISION = 3
+
+
+class OnboardingConstants:
+    """
+    Constants used for importing cinema lists.
+    """
+
+    FIELDS = ("name", "city", "address", "rows", "seats_per_row")
+    FORMATS = ("csv", "json")
+    # Cinemas inserted per batch, with their seats.
+    CINEMA_BATCH_SIZE = 100
+    # Seats built in memory and inserted at once.
+    SEAT_BATCH_SIZE = 5000
 
 
 class ErrorMessages:
@@ -13,3 +41,9 @@ class ErrorMessages:
     """
 
     INVALID_DATE_FORMAT = "Invalid date format. Please use YYYY-MM-DD."
+    CITY_ON_OTHER_SHARD = "A cinema cannot be moved to a city on another database shard."
+    MISSING_FIELDS = "Missing fields: {fields}."
+    INVALID_LAYOUT = "rows and seats_per_row must be whole numbers of at least 1."
+    UNKNOWN_CITY = "Unknown city '{city}'; pass --create-cities to create it."
+    UNKNOWN_FORMAT = "Cannot tell the format of '{path}'; pass --format csv or json."
+    INVALID_JSON = "A JSON cinema list must be an array of objects."
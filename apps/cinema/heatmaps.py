@@ -0,0 +1,145 @@
+import datetime
+import io
+
+import numpy as np
+from django.db.models import DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.cinema import constants as cinema_constants
+from apps.cinema import models as cinema_models
+from apps.slot import models as slot_models
+
+# One booked seat: its position, its show and how long before the show
+# started it was booked.
+BOOKED_SEAT_DTYPE = np.dtype(
+    [("row", np.int32), ("seat", np.int32), ("slot", np.int64), ("lead", np.float64)]
+)
+
+
+def load_booked_seats(cinema, since, until):
+    """
+    Returns the booked seats of the shows of ``cinema`` that started from
+    ``since`` until before ``until``, as a structured array of
+    BOOKED_SEAT_DTYPE with zero-based coordinates, and the number of shows.
+
+    Rows are read as value tuples with a server-side cursor, without
+    building model instances, and only the array is kept.
+    """
+    hints = {"cinema_id": cinema.pk}
+    slots = slot_models.Slot.objects.db_manager(hints=hints).filter(
+        cinema_id=cinema.pk, start_time__gte=since, start_time__lt=until
+    )
+    booked_seats = (
+        booking_models.Booking.seats.through.objects.db_manager(hints=hints)
+        .filter(
+            booking__slot__cinema_id=cinema.pk,
+            booking__slot__start_time__gte=since,
+            booking__slot__start_time__lt=until,
+            booking__status=booking_constants.BookingStatus.BOOKED,
+        )
+        .annotate(
+            lead=ExpressionWrapper(
+                F("booking__slot__start_time") - F("booking__created_at"),
+                output_field=DurationField(),
+            )
+        )
+        .values_list("seat__row_number", "seat__seat_number", "booking__slot_id", "lead")
+    )
+    rows = (
+        (row - 1, seat - 1, slot_id, lead.total_seconds())
+        for row, seat, slot_id, lead in booked_seats.iterator()
+    )
+    return np.fromiter(rows, dtype=BOOKED_SEAT_DTYPE), slots.count()
+
+
+def compute(booked_seats, shows, rows, seats_per_row):
+    """
+    Returns the heatmaps of a hall of ``rows`` x ``seats_per_row`` seats
+    from its booked seats over ``shows`` shows:
+
+    - popularity: share of the shows in which the seat was booked.
+    - lead_time_hours: mean hours between booking the seat and the show.
+    - sell_order: mean position at which the seat sold within its show,
+      from 0 for the first seat sold to 1 for the last seat of the hall.
+
+    Seats never sold have no lead time or sell order (NaN).
+    """
+    shape = (rows, seats_per_row)
+    capacity = rows * seats_per_row
+    if not len(booked_seats) or not shows:
+        return {
+            "popularity": np.zeros(shape, dtype=np.float32),
+            "lead_time_hours": np.full(shape, np.nan, dtype=np.float32),
+            "sell_order": np.full(shape, np.nan, dtype=np.float32),
+        }
+
+    index = booked_seats["row"] * seats_per_row + booked_seats["seat"]
+    sold = np.bincount(index, minlength=capacity)
+
+    # Order the seats of each show from the first booked to the last, then
+    # number them within their show.
+    order = np.lexsort((-booked_seats["lead"], booked_seats["slot"]))
+    slots = booked_seats["slot"][order]
+    starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+    sizes = np.diff(np.r_[starts, len(slots)])
+    position = np.empty(len(order), dtype=np.float64)
+    position[order] = np.arange(len(order)) - np.repeat(starts, sizes)
+
+    with np.errstate(invalid="ignore"):
+        lead_seconds = np.bincount(index, weights=booked_seats["lead"], minlength=capacity) / sold
+        sell_order = np.bincount(index, weights=position, minlength=capacity) / sold
+    sell_order /= max(capacity - 1, 1)
+
+    return {
+        "popularity": (sold / shows).reshape(shape).astype(np.float32),
+        "lead_time_hours": (lead_seconds / 3600).reshape(shape).astype(np.float32),
+        "sell_order": sell_order.reshape(shape).astype(np.float32),
+    }
+
+
+def pack(heatmaps):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **heatmaps)
+    return buffer.getvalue()
+
+
+def unpack(data):
+    with np.load(io.BytesIO(bytes(data))) as archive:
+        return {name: archive[name] for name in cinema_constants.HeatmapConstants.ARRAYS}
+
+
+def build(cinema, days=cinema_constants.HeatmapConstants.DAYS):
+    """
+    Computes and stores the heatmaps of ``cinema`` from the shows of the
+    last ``days`` days, and returns the SeatHeatmap.
+    """
+    until = timezone.now()
+    since = until - datetime.timedelta(days=days)
+    booked_seats, shows = load_booked_seats(cinema, since, until)
+    heatmaps = compute(booked_seats, shows, cinema.rows, cinema.seats_per_row)
+
+    heatmap, _ = cinema_models.SeatHeatmap.objects.update_or_create(
+        cinema=cinema,
+        defaults={
+            "shows": shows,
+            "seats_sold": len(booked_seats),
+            "period_start": since,
+            "period_end": until,
+            "data": pack(heatmaps),
+        },
+    )
+    return heatmap
+
+
+def to_json(heatmap):
+    """
+    Returns the heatmaps of a SeatHeatmap as nested lists by row then seat,
+    rounded, with None for seats never sold.
+    """
+    precision = cinema_constants.HeatmapConstants.PRECISION
+    return {
+        name: np.where(np.isnan(array), None, array.astype(np.float64).round(precision)).tolist()
+        for name, array in unpack(heatmap.data).items()
+    }
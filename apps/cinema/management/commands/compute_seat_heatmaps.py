@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.cinema import constants as cinema_constants
+from apps.cinema import heatmaps as cinema_heatmaps
+from apps.cinema import models as cinema_models
+
+
+class Command(BaseCommand):
+    """
+    Computes the seat popularity heatmaps of every cinema, or of the given
+    cinemas, from the bookings of the shows of the last ``--days`` days,
+    replacing the stored ones. Meant to run daily.
+
+    Usage:
+        python manage.py compute_seat_heatmaps
+        python manage.py compute_seat_heatmaps --cinema 3 --cinema 7 --days 30
+    """
+
+    help = "Computes the seat popularity heatmaps of cinemas from recent bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cinema", type=int, action="append", dest="cinemas", help="Only this cinema ID."
+        )
+        parser.add_argument("--days", type=int, default=cinema_constants.HeatmapConstants.DAYS)
+
+    def handle(self, *args, **options):
+        cinemas = cinema_models.Cinema.objects.only("id", "rows", "seats_per_row").order_by("id")
+        if options["cinemas"]:
+            cinemas = cinemas.filter(id__in=options["cinemas"])
+
+        count = 0
+        for cinema in cinemas.iterator():
+            heatmap = cinema_heatmaps.build(cinema, options["days"])
+            self.stdout.write(
+                f"Cinema {cinema.pk}: {heatmap.seats_sold} seats sold over {heatmap.shows} shows."
+            )
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Computed the seat heatmaps of {count} cinemas."))
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cinema import constants as cinema_constants
+from apps.cinema import onboarding as cinema_onboarding
+
+
+class Command(BaseCommand):
+    """
+    Imports a list of cinemas, such as a new chain, from a CSV file with a
+    header line or a JSON array of objects, with the fields name, city,
+    address, rows and seats_per_row. Cinemas are created in batches with
+    their seats; cinemas already there are left as they are, so an import
+    can be run again, for example after it was interrupted.
+
+    Usage:
+        python manage.py import_cinemas chain.csv
+        python manage.py import_cinemas chain.json --create-cities --batch-size 200
+    """
+
+    help = "Imports cinemas and their seats from a CSV or JSON list."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file of cinemas.")
+        parser.add_argument(
+            "--format",
+            choices=cinema_constants.OnboardingConstants.FORMATS,
+            help="Format of the file; defaults to its extension.",
+        )
+        parser.add_argument(
+            "--create-cities", action="store_true", help="Create the cities that do not exist."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=cinema_constants.OnboardingConstants.CINEMA_BATCH_SIZE,
+            help="Cinemas inserted at once.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in cinema_onboarding.READERS:
+            raise CommandError(cinema_constants.ErrorMessages.UNKNOWN_FORMAT.format(path=path))
+
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                report, errors = cinema_onboarding.import_cinemas(
+                    cinema_onboarding.READERS[file_format](file),
+                    create_cities=options["create_cities"],
+                    batch_size=options["batch_size"],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for number, message in errors:
+            self.stderr.write(f"Entry {number} skipped: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report['created']} cinemas and {report['seats']} seats; "
+                f"{report['existing']} already existed, {len(errors)} skipped."
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0003_remove_cinema_unique_cinema_at_each_address'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seat',
+            name='cinema',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='cinema.cinema'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0005_cinema_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHeatmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('shows', models.PositiveIntegerField()),
+                ('seats_sold', models.PositiveIntegerField()),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('data', models.BinaryField()),
+                ('cinema', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seat_heatmap', to='cinema.cinema')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from apps.base import sharding as base_sharding
+
+FIELDS = ["cinema"]
+
+
+def add_foreign_keys(apps, schema_editor):
+    """
+    Enforces the foreign keys of seats on the default database,
+    which holds the tables they reference; shards leave them unenforced.
+    """
+    base_sharding.add_foreign_keys(schema_editor, apps.get_model("cinema", "Seat"), FIELDS)
+
+
+def remove_foreign_keys(apps, schema_editor):
+    base_sharding.remove_foreign_keys(schema_editor, apps.get_model("cinema", "Seat"), FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0006_seatheatmap'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_foreign_keys, remove_foreign_keys),
+    ]
@@ -1,10 +1,12 @@
 from django.core.exceptions import ValidationError
 from django.db import models as db_models
-from django.db import transaction as db_transaction
 from django.dispatch import receiver
 
+from apps.base import images as base_images
 from apps.base import models as base_models
+from apps.base import sharding as base_sharding
 from apps.cinema import constants as cinema_constants
+from apps.cinema import onboarding as cinema_onboarding
 
 
 class Cinema(base_models.TimeStampedModel):
@@ -18,6 +20,8 @@ class Cinema(base_models.TimeStampedModel):
         rows (int): Total count of horizontal seating rows.
         seats_per_row (int): Total count of vertical seating columns per row.
         image (ImageField): Image of the cinema hall.
+        image_variants (dict): Storage names of the resized image variants by
+            name and format, and the image they were made from.
     """
 
     name = db_models.CharField(
@@ -34,6 +38,7 @@ class Cinema(base_models.TimeStampedModel):
         null=True,
         blank=True,
     )
+    image_variants = db_models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         # Unique constraint for cinema
@@ -59,6 +64,15 @@ class Cinema(base_models.TimeStampedModel):
             ):
                 raise ValidationError(cinema_constants.ErrorMessages.NOT_ALLOWED)
 
+            # Seats and slots stay on the shard of the original city
+            if base_sharding.is_enabled() and (
+                base_sharding.shard_for_city(original.city_id)
+                != base_sharding.shard_for_city(self.city_id)
+            ):
+                raise ValidationError(
+                    {"city": cinema_constants.ErrorMessages.CITY_ON_OTHER_SHARD}
+                )
+
         super().clean()
 
 
@@ -75,11 +89,18 @@ class Seat(base_models.TimeStampedModel):
     """
 
     cinema = db_models.ForeignKey(
-        Cinema, on_delete=db_models.CASCADE, related_name="seats"
+        Cinema,
+        on_delete=db_models.CASCADE,
+        related_name="seats",
+        # Seats can live on a city shard while cinemas are shared; the
+        # reference is enforced on the default database only (migration 0007)
+        db_constraint=False,
     )
     row_number = db_models.PositiveSmallIntegerField()
     seat_number = db_models.PositiveSmallIntegerField()
 
+    objects = base_sharding.ShardedQuerySet.as_manager()
+
     class Meta:
         # Unique constraint for the Seat
         constraints = [
@@ -114,24 +135,85 @@ class Seat(base_models.TimeStampedModel):
         super().clean()
 
 
+class SeatHeatmap(base_models.TimeStampedModel):
+    """
+    Seat popularity heatmaps of a cinema, computed by the
+    compute_seat_heatmaps command from the bookings of recent shows.
+
+    The heatmaps are stored together as one compressed NumPy archive with
+    one rows x seats_per_row array per heatmap; see
+    ``apps.cinema.heatmaps`` for what each holds.
+
+    Attributes:
+        cinema (OneToOneField): The cinema the heatmaps describe.
+        shows (int): Shows counted.
+        seats_sold (int): Booked seats counted.
+        period_start (datetime): Start of the earliest show counted.
+        period_end (datetime): Time the shows counted started before.
+        data (bytes): The heatmaps as an ``.npz`` archive.
+    """
+
+    cinema = db_models.OneToOneField(
+        Cinema, on_delete=db_models.CASCADE, related_name="seat_heatmap"
+    )
+    shows = db_models.PositiveIntegerField()
+    seats_sold = db_models.PositiveIntegerField()
+    period_start = db_models.DateTimeField()
+    period_end = db_models.DateTimeField()
+    data = db_models.BinaryField()
+
+    def __str__(self):
+        return f"Seat heatmap of {self.cinema}"
+
+
 @receiver(db_models.signals.post_save, sender=Cinema)
 def create_cinema_seats(sender, instance, created, **kwargs):
     """
     Automatically generates a grid of Seat objects upon Cinema creation.
 
     This signal iterates through the defined rows and seats_per_row of the
-    cinema instance and performs a bulk insertion for efficiency.
+    cinema instance and performs batched bulk insertions for efficiency on
+    the database of the cinema's city.
 
     Args:
         sender (Model): The model class (Cinema).
         instance (Cinema): The actual instance being saved.
         created (bool): Boolean indicating if a new record was created.
     """
+    base_sharding.invalidate_cinema(instance.pk)
+
     if created:
-        with db_transaction.atomic():
-            seats_to_create = [
-                Seat(cinema=instance, row_number=row, seat_number=seat)
-                for row in range(1, instance.rows + 1)
-                for seat in range(1, instance.seats_per_row + 1)
-            ]
-            Seat.objects.bulk_create(seats_to_create)
+        cinema_onboarding.create_seats([instance])
+
+
+@receiver(db_models.signals.post_save, sender=Cinema)
+def generate_image_variants(sender, instance, **kwargs):
+    """
+    Makes the resized variants of a new or changed cinema image once the
+    save is committed, in the image variant pool.
+
+    Args:
+        sender (Model): The model class (Cinema).
+        instance (Cinema): The cinema saved.
+    """
+    base_images.generate_on_commit(
+        instance, "image", "image_variants", cinema_constants.CinemaConstants.IMAGE_VARIANTS
+    )
+
+
+@receiver(db_models.signals.pre_delete, sender=Cinema)
+def delete_sharded_cinema_seats(sender, instance, **kwargs):
+    """
+    Deletes the seats of a cinema whose city is on a shard, which the
+    cascade from the default database cannot reach.
+
+    Args:
+        sender (Model): The model class (Cinema).
+        instance (Cinema): The cinema being deleted.
+    """
+    if not base_sharding.is_enabled():
+        return
+
+    database = base_sharding.shard_for_city(instance.city_id)
+    if database != base_sharding.PRIMARY_ALIAS:
+        Seat.objects.using(database).filter(cinema_id=instance.pk).delete()
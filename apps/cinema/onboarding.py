@@ -0,0 +1,261 @@
+import collections
+import csv
+import itertools
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import router as db_router
+from django.db import transaction
+from django.db.models import Count
+
+from apps.base import models as base_models
+from apps.cinema import constants as cinema_constants
+from apps.cinema import models as cinema_models
+
+
+def read_csv(file):
+    """
+    Yields the rows of a CSV cinema list with a header line, one at a time.
+    """
+    yield from csv.DictReader(file)
+
+
+def read_json(file):
+    """
+    Yields the objects of a JSON array of cinemas.
+    """
+    records = json.load(file)
+    if not isinstance(records, list):
+        raise ValueError(cinema_constants.ErrorMessages.INVALID_JSON)
+    yield from records
+
+
+READERS = {"csv": read_csv, "json": read_json}
+
+
+def normalize_city(name):
+    # As City.save() stores it.
+    return str(name).lower().strip()
+
+
+def clean(record):
+    """
+    Returns the fields of a cinema list entry, validated like a Cinema and
+    with the city name normalized.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValidationError(cinema_constants.ErrorMessages.INVALID_JSON)
+    missing = [
+        field for field in cinema_constants.OnboardingConstants.FIELDS if not record.get(field)
+    ]
+    if missing:
+        raise ValidationError(
+            cinema_constants.ErrorMessages.MISSING_FIELDS.format(fields=", ".join(missing))
+        )
+
+    cinema = cinema_models.Cinema(
+        name=str(record["name"]).strip(),
+        address=str(record["address"]).strip(),
+        rows=record["rows"],
+        seats_per_row=record["seats_per_row"],
+    )
+    cinema.full_clean(exclude=["city"], validate_unique=False, validate_constraints=False)
+    if cinema.rows < 1 or cinema.seats_per_row < 1:
+        raise ValidationError(cinema_constants.ErrorMessages.INVALID_LAYOUT)
+
+    return {
+        "name": cinema.name,
+        "city": normalize_city(record["city"]),
+        "address": cinema.address,
+        "rows": cinema.rows,
+        "seats_per_row": cinema.seats_per_row,
+    }
+
+
+def resolve_cities(names, known, create=False):
+    """
+    Adds the IDs of the cities ``names`` to ``known``, a mapping of
+    normalized name to ID, with one query for those not known yet. Missing
+    cities are created, in one INSERT, when ``create`` is set.
+    """
+    missing = set(names) - known.keys()
+    if not missing:
+        return
+    cities = base_models.City.objects.filter(name__in=missing)
+    known.update(cities.values_list("name", "id"))
+
+    missing -= known.keys()
+    if missing and create:
+        # New cities are on the default database, so the cached mapping of
+        # cities to shards needs no update.
+        base_models.City.objects.bulk_create(
+            [base_models.City(name=name) for name in sorted(missing)], ignore_conflicts=True
+        )
+        known.update(cities.values_list("name", "id"))
+
+
+def iter_seats(cinema):
+    for row in range(1, cinema.rows + 1):
+        for seat in range(1, cinema.seats_per_row + 1):
+            yield cinema_models.Seat(cinema_id=cinema.pk, row_number=row, seat_number=seat)
+
+
+def create_seats(
+    cinemas, batch_size=cinema_constants.OnboardingConstants.SEAT_BATCH_SIZE, skip_existing=False
+):
+    """
+    Creates the grid of seats of ``cinemas`` on the database of their city,
+    in one transaction per database. Seats are built and inserted
+    ``batch_size`` at a time, so that memory use does not grow with the size
+    of the halls. With ``skip_existing``, seats already created are left as
+    they are, which completes cinemas whose seats were partly created.
+
+    Returns the number of seats inserted, or attempted with
+    ``skip_existing``.
+    """
+    by_database = collections.defaultdict(list)
+    for cinema in cinemas:
+        by_database[db_router.db_for_write(cinema_models.Seat, city_id=cinema.city_id)].append(
+            cinema
+        )
+
+    count = 0
+    for database, database_cinemas in by_database.items():
+        seats = itertools.chain.from_iterable(iter_seats(cinema) for cinema in database_cinemas)
+        with transaction.atomic(using=database):
+            while batch := list(itertools.islice(seats, batch_size)):
+                cinema_models.Seat.objects.using(database).bulk_create(
+                    batch, ignore_conflicts=skip_existing
+                )
+                count += len(batch)
+    return count
+
+
+def get_incomplete(cinemas):
+    """
+    Returns the cinemas of ``cinemas`` with fewer seats than their layout,
+    counted with one grouped query per database.
+    """
+    by_database = collections.defaultdict(list)
+    for cinema in cinemas:
+        by_database[db_router.db_for_read(cinema_models.Seat, city_id=cinema.city_id)].append(
+            cinema
+        )
+
+    incomplete = []
+    for database, database_cinemas in by_database.items():
+        seat_counts = dict(
+            cinema_models.Seat.objects.using(database)
+            .filter(cinema_id__in=[cinema.pk for cinema in database_cinemas])
+            .values_list("cinema_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        incomplete.extend(
+            cinema
+            for cinema in database_cinemas
+            if seat_counts.get(cinema.pk, 0) < cinema.rows * cinema.seats_per_row
+        )
+    return incomplete
+
+
+def import_batch(entries, cities, create_cities=False):
+    """
+    Creates the cinemas of ``entries``, a list of (entry number, cleaned
+    fields), that do not exist yet, and the missing seats of all of them.
+
+    Cinemas are matched on the unique_cinema_location fields (name, city,
+    address), so importing a list again creates nothing, and completes the
+    seats of cinemas an interrupted import left without all of them.
+
+    Returns the counts of created and existing cinemas and of seats, and the
+    errors of the entries skipped.
+    """
+    report = collections.Counter()
+    errors = []
+    resolve_cities({fields["city"] for _, fields in entries}, cities, create_cities)
+
+    wanted = {}
+    for number, fields in entries:
+        city_id = cities.get(fields["city"])
+        if city_id is None:
+            errors.append((number, cinema_constants.ErrorMessages.UNKNOWN_CITY.format(**fields)))
+            continue
+        # The first of duplicate entries wins.
+        wanted.setdefault((fields["name"], city_id, fields["address"]), fields)
+    if not wanted:
+        return report, errors
+
+    def find():
+        return {
+            (cinema.name, cinema.city_id, cinema.address): cinema
+            for cinema in cinema_models.Cinema.objects.filter(
+                name__in={name for name, _, _ in wanted},
+                city_id__in={city_id for _, city_id, _ in wanted},
+            ).only("id", "name", "city_id", "address", "rows", "seats_per_row")
+            if (cinema.name, cinema.city_id, cinema.address) in wanted
+        }
+
+    existing = find()
+    new = [
+        cinema_models.Cinema(
+            name=name,
+            city_id=city_id,
+            address=address,
+            rows=fields["rows"],
+            seats_per_row=fields["seats_per_row"],
+        )
+        for (name, city_id, address), fields in wanted.items()
+        if (name, city_id, address) not in existing
+    ]
+    if new:
+        # Cinemas imported concurrently by someone else are skipped; their
+        # IDs, which the insert does not return then, are read back.
+        cinema_models.Cinema.objects.bulk_create(new, ignore_conflicts=True)
+    cinemas = find()
+
+    report["created"] += len(cinemas) - len(existing)
+    report["existing"] += len(existing)
+    # Existing cinemas keep their layout, which cannot change after creation.
+    created = [cinema for key, cinema in cinemas.items() if key not in existing]
+    report["seats"] += create_seats(
+        created + get_incomplete(list(existing.values())), skip_existing=True
+    )
+    return report, errors
+
+
+def import_cinemas(
+    records,
+    create_cities=False,
+    batch_size=cinema_constants.OnboardingConstants.CINEMA_BATCH_SIZE,
+):
+    """
+    Imports a list of cinema entries, dictionaries with the fields of
+    OnboardingConstants.FIELDS, ``batch_size`` cinemas at a time. Each
+    batch resolves its cities with one query and inserts its cinemas with
+    one INSERT; seats are streamed in batches of SEAT_BATCH_SIZE.
+
+    Created cinemas do not go through Cinema.save(): they have no image to
+    make variants of, and their seats are created here.
+
+    Returns the counts of created and existing cinemas and of seats, and
+    the (entry number, message) of the entries skipped.
+    """
+    report = collections.Counter()
+    errors = []
+    cities = {}
+    entries = enumerate(records, start=1)
+    while batch := list(itertools.islice(entries, batch_size)):
+        cleaned = []
+        for number, record in batch:
+            try:
+                cleaned.append((number, clean(record)))
+            except ValidationError as e:
+                errors.append((number, " ".join(e.messages)))
+        batch_report, batch_errors = import_batch(cleaned, cities, create_cities)
+        report.update(batch_report)
+        errors.extend(batch_errors)
+    return report, errors
@@ -1,5 +1,8 @@
 from rest_framework import serializers as rest_serializers
 
+from apps.base import images as base_images
+from apps.base import serializers as base_serializers
+from apps.base import tracing as base_tracing
 from apps.cinema import models as cinema_models
 
 
@@ -10,18 +13,22 @@ class CinemaSerializer(rest_serializers.ModelSerializer):
     Fields:
         id (int): Unique identifier of the cinema.
         image (str): URL of the cinema image.
+        image_variants (dict): URLs of the resized cinema images by size
+            (thumbnail, card, banner) and format (webp, jpeg).
         name (str): Name of the cinema.
         city (str): Name of the city where the cinema is located.
         address (str): Full address of the cinema.
     """
 
     city = rest_serializers.SlugRelatedField(read_only=True, slug_field="name")
+    image_variants = base_serializers.ImageVariantsField()
 
     class Meta:
         model = cinema_models.Cinema
         fields = [
             "id",
             "image",
+            "image_variants",
             "name",
             "city",
             "address",
@@ -37,6 +44,7 @@ class CinemaDetailSerializer(CinemaSerializer):
     Fields:
         id (int): Unique identifier of the cinema.
         image (str): URL of the cinema image.
+        image_variants (dict): URLs of the resized cinema images.
         name (str): Name of the cinema.
         city (str): Name of the city where the cinema is located.
         address (str): Full address of the cinema.
@@ -45,6 +53,7 @@ class CinemaDetailSerializer(CinemaSerializer):
             id (int): Unique identifier of the movie.
             name (str): The title of the movie.
             poster (str): URL of the movie poster image.
+            poster_variants (dict): URLs of the resized posters.
             duration (str): Duration of the movie.
             genres ([str]): List of genre names associated with the movie.
 
@@ -63,6 +72,7 @@ class CinemaDetailSerializer(CinemaSerializer):
     class Meta(CinemaSerializer.Meta):
         fields = CinemaSerializer.Meta.fields + ["movies"]
 
+    @base_tracing.traced("serializer.get_movies")
     def get_movies(self, cinema):
         """
         The method provides a hierarchical grouping of available
@@ -85,6 +95,9 @@ class CinemaDetailSerializer(CinemaSerializer):
                         "id": movie.id,
                         "name": movie.name,
                         "poster": poster_url,
+                        "poster_variants": base_images.get_variant_urls(
+                            movie.poster_variants, request
+                        ),
                         "duration": str(movie.duration),
                         "genres": [{"id": g.id, "name": g.name} for g in movie.genres.all()],
                     },
@@ -1,3 +1,40 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from apps.cinema import heatmaps as cinema_heatmaps
+
+
+class SeatHeatmapTests(SimpleTestCase):
+    """
+    The heatmaps of a hall of 2 x 2 seats, worked out by hand.
+    """
+
+    def test_heatmaps_of_booked_seats(self):
+        # Show 1 sold seats (1, 1), (1, 2) then (2, 2); show 2 sold (1, 1)
+        # then (1, 2). The shows are interleaved, as read from the database.
+        booked_seats = np.array(
+            [
+                (0, 1, 2, 1800),
+                (0, 0, 1, 7200),
+                (1, 1, 1, 0),
+                (0, 0, 2, 3600),
+                (0, 1, 1, 3600),
+            ],
+            dtype=cinema_heatmaps.BOOKED_SEAT_DTYPE,
+        )
+
+        heatmaps = cinema_heatmaps.compute(booked_seats, shows=2, rows=2, seats_per_row=2)
+
+        np.testing.assert_allclose(heatmaps["popularity"], [[1, 1], [0, 0.5]])
+        np.testing.assert_allclose(heatmaps["lead_time_hours"], [[1.5, 0.75], [np.nan, 0]])
+        # Positions 0 and 0, 1 and 1, then 2, over the last position, 3.
+        np.testing.assert_allclose(heatmaps["sell_order"], [[0, 1 / 3], [np.nan, 2 / 3]])
+
+    def test_heatmaps_without_booked_seats(self):
+        booked_seats = np.empty(0, dtype=cinema_heatmaps.BOOKED_SEAT_DTYPE)
+
+        heatmaps = cinema_heatmaps.compute(booked_seats, shows=3, rows=2, seats_per_row=2)
+
+        np.testing.assert_array_equal(heatmaps["popularity"], np.zeros((2, 2)))
+        self.assertTrue(np.isnan(heatmaps["lead_time_hours"]).all())
+        self.assertTrue(np.isnan(heatmaps["sell_order"]).all())
@@ -1,7 +1,20 @@
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from apps.cinema import views as cinema_views
 
 router = SimpleRouter()
-router.register("", cinema_views.CinemaViewSet, basename="cinemas")
-urlpatterns = router.urls
+router.register(
+    "",
+    cinema_views.AsyncCinemaViewSet if settings.ASYNC_READ_VIEWS else cinema_views.CinemaViewSet,
+    basename="cinemas",
+)
+urlpatterns = [
+    path(
+        "<int:id>/seat-heatmap/",
+        cinema_views.SeatHeatmapView.as_view(),
+        name="cinema-seat-heatmap",
+    ),
+    *router.urls,
+]
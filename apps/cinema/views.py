@@ -1,12 +1,20 @@
 from datetime import date as date_class
 
 from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters import rest_framework as df_filters
 from rest_framework import exceptions as rest_exceptions
 from rest_framework import filters as rest_filters
+from rest_framework import permissions as rest_permissions
+from rest_framework import response as rest_response
+from rest_framework import views as rest_views
 from rest_framework import viewsets as rest_viewsets
 
+from apps.base import async_views as base_async_views
+from apps.base import sharding as base_sharding
+from apps.base import tracing as base_tracing
+from apps.base import utils as base_utils
 from apps.cinema import constants as cinema_constants
 from apps.cinema import filter as cinema_filters
 from apps.cinema import models as cinema_models
@@ -14,8 +22,11 @@ from apps.cinema import pagination as cinema_paginations
 from apps.cinema import serializers as cinema_serializers
 from apps.slot import models as slot_models
 
+# Imported on the first heatmap read, keeping NumPy off the startup path.
+cinema_heatmaps = base_utils.LazyModule("apps.cinema.heatmaps")
 
-class CinemaViewSet(rest_viewsets.ReadOnlyModelViewSet):
+
+class CinemaViewSet(base_tracing.TracedViewMixin, rest_viewsets.ReadOnlyModelViewSet):
     """
     Read-only API endpoints for browsing cinemas and
     viewing cinema showtime details.
@@ -100,6 +111,7 @@ class CinemaViewSet(rest_viewsets.ReadOnlyModelViewSet):
             - No Cinema matches the given query
     """
 
+    read_replica = True
     filterset_class = cinema_filters.CinemaFilter
     pagination_class = cinema_paginations.CinemaPagination
     filter_backends = [df_filters.DjangoFilterBackend, rest_filters.SearchFilter]
@@ -118,6 +130,7 @@ class CinemaViewSet(rest_viewsets.ReadOnlyModelViewSet):
 
         return cinema_serializers.CinemaDetailSerializer
 
+    @base_tracing.traced("view.get_queryset")
     def get_queryset(self):
         """
         Dynamically builds the queryset based on the action and
@@ -138,11 +151,18 @@ class CinemaViewSet(rest_viewsets.ReadOnlyModelViewSet):
                     {"date": cinema_constants.ErrorMessages.INVALID_DATE_FORMAT}
                 )
 
+            # Slots are read from the shard of the cinema's city
+            day_start, day_end = base_utils.get_day_bounds(parsed_date)
             slots_qs = (
-                slot_models.Slot.objects.filter(
-                    start_time__gt=timezone.now(), start_time__date=parsed_date
+                base_sharding.select_catalog(
+                    slot_models.Slot.objects.filter(
+                        start_time__gt=timezone.now(),
+                        start_time__gte=day_start,
+                        start_time__lt=day_end,
+                    ),
+                    "movie",
+                    "language",
                 )
-                .select_related("movie", "language")
                 .prefetch_related("movie__genres")
                 .order_by("start_time")
             )
@@ -153,3 +173,70 @@ class CinemaViewSet(rest_viewsets.ReadOnlyModelViewSet):
 
         # List
         return cinema_models.Cinema.objects.select_related("city")
+
+
+class AsyncCinemaViewSet(base_async_views.AsyncReadOnlyViewMixin, CinemaViewSet):
+    """
+    Async version of CinemaViewSet for the ASGI stack, with the same
+    endpoints and responses.
+    """
+
+
+class SeatHeatmapView(rest_views.APIView):
+    """
+    API view to retrieve the seat popularity heatmaps of a cinema, as last
+    computed by the compute_seat_heatmaps command.
+
+    Permissions: IsAdminUser:
+        Only staff users can read heatmaps.
+
+    Method: GET
+        Parameters:
+            id (int, path parameter):
+                ID of the cinema.
+        Response:
+            200 OK:
+                One value per seat, by row then seat number:
+                popularity is the share of shows the seat was booked in,
+                lead_time_hours the mean hours it was booked before the
+                show, and sell_order its mean position among the seats
+                sold (0 sells first); null for seats never sold.
+                Example:
+                {
+                    "cinema": 3,
+                    "rows": 2,
+                    "seats_per_row": 3,
+                    "shows": 120,
+                    "seats_sold": 410,
+                    "period_start": "2026-07-21T02:00:00+05:30",
+                    "period_end": "2026-10-19T02:00:00+05:30",
+                    "computed_at": "2026-10-19T02:00:04+05:30",
+                    "popularity": [[0.41, 0.95, 0.38], [0.2, 0.71, null]],
+                    "lead_time_hours": [[20.5, 51.0, 18.25], [6.0, 33.5, null]],
+                    "sell_order": [[0.6, 0.05, 0.62], [0.9, 0.3, null]]
+                }
+        Error:
+            404 Not Found:
+                - No heatmaps were computed for the cinema.
+    """
+
+    permission_classes = [rest_permissions.IsAdminUser]
+    read_replica = True
+
+    def get(self, request, id):
+        heatmap = get_object_or_404(
+            cinema_models.SeatHeatmap.objects.select_related("cinema"), cinema_id=id
+        )
+        return rest_response.Response(
+            {
+                "cinema": heatmap.cinema_id,
+                "rows": heatmap.cinema.rows,
+                "seats_per_row": heatmap.cinema.seats_per_row,
+                "shows": heatmap.shows,
+                "seats_sold": heatmap.seats_sold,
+                "period_start": heatmap.period_start,
+                "period_end": heatmap.period_end,
+                "computed_at": heatmap.updated_at,
+                **cinema_heatmaps.to_json(heatmap),
+            }
+        )
@@ -2,4 +2,14 @@ from django.contrib import admin
 
 from apps.movie import models as movie_models
 
-admin.site.register(movie_models.Movie)
+
+@admin.register(movie_models.Movie)
+class MovieAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for Movie model, searchable by name for the
+    autocomplete widgets of the slot admin.
+    """
+
+    list_display = ("name", "release_date", "duration")
+    search_fields = ["name"]
+    date_hierarchy = "release_date"
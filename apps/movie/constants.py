@@ -5,6 +5,8 @@ class MovieConstants:
 
     NAME_MAX_LENGTH = 150
     MOVIE_POSTER_DIR = "movies/"
+    # Poster variants as name: (width, height), in a 2:3 aspect ratio.
+    POSTER_VARIANTS = {"thumbnail": (120, 180), "card": (240, 360), "detail": (480, 720)}
 
 
 class ErrorMessages:
@@ -13,3 +15,51 @@ class ErrorMessages:
     """
 
     INVALID_DATE_FORMAT = "Invalid date format. Please use YYYY-MM-DD."
+    TRENDING_CITY_REQUIRED = "A city is required to order movies by trending."
+
+
+class TrendingConstants:
+    """
+    Constants of the sliding-window booking counters behind trending movies.
+    """
+
+    # Bookings are counted in buckets of BUCKET_SECONDS; a movie trends on
+    # the bookings of its last BUCKETS buckets (24 hours of minutes).
+    BUCKET_SECONDS = 60
+    BUCKETS = 24 * 60
+    # Movies of a city ranked by the trending ordering; the rest follow by
+    # release date.
+    TOP_MOVIES = 200
+    CACHE_KEY = "movie:trending:{city_id}"
+    ORDERING = "trending"
+    PAGINATION_ORDERING = ("-trending_score", "-release_date", "-id")
+
+
+class RecommendationConstants:
+    """
+    Constants of the "people also booked" recommendations.
+    """
+
+    # Related movies kept per movie.
+    TOP_K = 10
+    # Bookings made in the last HISTORY_DAYS days are counted.
+    HISTORY_DAYS = 365
+    # Movies booked by fewer common users are not related.
+    MIN_CO_BOOKINGS = 2
+    # Users who booked more movies than this, such as box office or test
+    # accounts, relate everything to everything and are left out.
+    MAX_MOVIES_PER_USER = 500
+    # Movie pairs generated at once, which bounds the memory of the job.
+    PAIR_BATCH_SIZE = 5_000_000
+
+
+class SimilarityConstants:
+    """
+    Constants of the genre and language similarity of movies.
+    """
+
+    # Similar movies kept per movie.
+    TOP_K = 10
+    # Movies whose similarities are computed at once, which bounds the
+    # memory of a rebuild to BLOCK_SIZE x movies scores.
+    BLOCK_SIZE = 1024
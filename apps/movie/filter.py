@@ -3,7 +3,9 @@ from datetime import timedelta
 import django_filters
 from django.utils import timezone
 
+from apps.base import sharding as base_sharding
 from apps.movie import models as movie_models
+from apps.slot import models as slot_models
 
 
 class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
@@ -30,13 +32,27 @@ class MovieFilter(django_filters.FilterSet):
 
     genres = NumberInFilter(field_name="genres__id", lookup_expr="in")
     languages = NumberInFilter(field_name="languages__id", lookup_expr="in")
-    cinemas = NumberInFilter(field_name="slots__cinema_id", lookup_expr="in")
+    cinemas = NumberInFilter(method="filter_cinemas")
     latest_days = django_filters.NumberFilter(method="filter_latest_movies")
 
     class Meta:
         model = movie_models.Movie
         fields = ["genres", "languages", "cinemas", "latest_days"]
 
+    def filter_cinemas(self, queryset, name, value):
+        """
+        Filters the queryset to return movies having slots in the given
+        cinemas, reading the slots from the shards of those cinemas.
+        """
+        movie_ids = slot_models.Slot.objects.filter(cinema_id__in=value).values_list(
+            "movie_id", flat=True
+        )
+        return queryset.filter(
+            id__in=base_sharding.subquery_values(
+                movie_ids, base_sharding.get_cinema_databases(value)
+            )
+        )
+
     def filter_latest_movies(self, queryset, name, value):
         """
         Filters the queryset to return movies released within the last N days.
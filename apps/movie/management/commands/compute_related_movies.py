@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.movie import constants as movie_constants
+from apps.movie import recommendations as movie_recommendations
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the "people also booked" related movies of every movie from
+    the bookings of the last ``--days`` days, replacing the stored ones.
+    Meant to run daily.
+
+    Usage:
+        python manage.py compute_related_movies
+        python manage.py compute_related_movies --days 180 --top-k 20
+    """
+
+    help = "Computes the related movies of each movie from the users' booking history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=movie_constants.RecommendationConstants.HISTORY_DAYS
+        )
+        parser.add_argument(
+            "--top-k", type=int, default=movie_constants.RecommendationConstants.TOP_K
+        )
+        parser.add_argument(
+            "--min-co-bookings",
+            type=int,
+            default=movie_constants.RecommendationConstants.MIN_CO_BOOKINGS,
+            help="Users who must have booked both movies for them to be related.",
+        )
+
+    def handle(self, *args, **options):
+        count = movie_recommendations.build(
+            options["days"], top_k=options["top_k"], min_co_bookings=options["min_co_bookings"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} related movies."))
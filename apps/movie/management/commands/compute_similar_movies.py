@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.movie import constants as movie_constants
+from apps.movie import similarity as movie_similarity
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the similar movies of every movie from their genres and
+    languages. Changes to genres and languages update them as they are
+    made; a rebuild is needed after movies are deleted, or once when the
+    feature is deployed.
+
+    Usage:
+        python manage.py compute_similar_movies
+        python manage.py compute_similar_movies --top-k 20
+    """
+
+    help = "Rebuilds the similar movies of each movie from their genres and languages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=movie_constants.SimilarityConstants.TOP_K)
+
+    def handle(self, *args, **options):
+        count = movie_similarity.build(options["top_k"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} similar movies."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_city_shard'),
+        ('movie', '0005_movie_poster_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('head', models.BigIntegerField()),
+                ('buckets', models.BinaryField()),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movie_trends', to='base.city')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trends', to='movie.movie')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['city', 'head'], name='movie_movie_city_id_8e6f81_idx')],
+                'constraints': [models.UniqueConstraint(fields=('city', 'movie'), name='unique_trend_per_city')],
+            },
+        ),
+    ]
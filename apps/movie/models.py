@@ -1,8 +1,15 @@
 from django.db import models as db_models
+from django.db import transaction as db_transaction
+from django.dispatch import receiver
 
+from apps.base import images as base_images
 from apps.base import models as base_models
+from apps.base import utils as base_utils
 from apps.movie import constants as movie_constants
 
+# Imported on the first similarity update, keeping NumPy off the startup path.
+movie_similarity = base_utils.LazyModule("apps.movie.similarity")
+
 
 class Movie(base_models.TimeStampedModel):
     """
@@ -16,6 +23,8 @@ class Movie(base_models.TimeStampedModel):
         genres (ManyToManyField): Genres associated with the movie.
         languages (ManyToManyField): Languages associated with the movie.
         poster (ImageField): Movie poster image.
+        poster_variants (dict): Storage names of the resized poster variants
+            by name and format, and the poster they were made from.
     """
 
     name = db_models.CharField(
@@ -32,9 +41,190 @@ class Movie(base_models.TimeStampedModel):
         null=True,
         blank=True,
     )
+    poster_variants = db_models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["-release_date"]
 
     def __str__(self):
         return self.name
+
+
+class MovieTrend(base_models.TimeStampedModel):
+    """
+    Bookings of a movie in a city over the last day, per minute, in a ring
+    buffer written by the trending counters of every worker process.
+
+    Attributes:
+        city (ForeignKey): The city the bookings were made in.
+        movie (ForeignKey): The movie booked.
+        head (int): Number of the newest bucket counted, in minutes since
+            the epoch. Bucket ``n`` is stored at index ``n % BUCKETS``.
+        buckets (bytes): The counts, as TrendingConstants.BUCKETS unsigned
+            32-bit integers.
+    """
+
+    city = db_models.ForeignKey(
+        base_models.City, on_delete=db_models.CASCADE, related_name="movie_trends"
+    )
+    movie = db_models.ForeignKey(Movie, on_delete=db_models.CASCADE, related_name="trends")
+    head = db_models.BigIntegerField()
+    buckets = db_models.BinaryField()
+
+    class Meta:
+        constraints = [
+            db_models.UniqueConstraint(fields=["city", "movie"], name="unique_trend_per_city"),
+        ]
+        indexes = [db_models.Index(fields=["city", "head"])]
+
+    def __str__(self):
+        return f"{self.movie} in {self.city}"
+
+
+class RelatedMovie(db_models.Model):
+    """
+    A movie often booked by the users who booked another, computed offline
+    by the compute_related_movies command.
+
+    Attributes:
+        movie (ForeignKey): The movie the recommendation is shown on.
+        related (ForeignKey): The movie recommended.
+        score (float): Cosine similarity of the users who booked each movie,
+            from 0 to 1.
+        rank (int): Position of the recommendation for the movie, from 0.
+    """
+
+    movie = db_models.ForeignKey(Movie, on_delete=db_models.CASCADE, related_name="related_movies")
+    related = db_models.ForeignKey(Movie, on_delete=db_models.CASCADE, related_name="+")
+    score = db_models.FloatField()
+    rank = db_models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["movie", "rank"]
+        # Also the index the recommendations of a movie are read from.
+        constraints = [
+            db_models.UniqueConstraint(fields=["movie", "rank"], name="unique_related_movie_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.related} for {self.movie}"
+
+
+class SimilarMovie(db_models.Model):
+    """
+    A movie sharing genres and languages with another, for the similar
+    movies of releases without booking history.
+
+    Rows are rebuilt by the compute_similar_movies command and updated as
+    the genres or languages of movies change.
+
+    Attributes:
+        movie (ForeignKey): The movie the similar movie is shown on.
+        similar (ForeignKey): The similar movie.
+        score (float): Jaccard similarity of the genres and languages of the
+            two movies, from 0 to 1.
+        rank (int): Position of the similar movie for the movie, from 0.
+    """
+
+    movie = db_models.ForeignKey(Movie, on_delete=db_models.CASCADE, related_name="similar_movies")
+    similar = db_models.ForeignKey(Movie, on_delete=db_models.CASCADE, related_name="+")
+    score = db_models.FloatField()
+    rank = db_models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["movie", "rank"]
+        # Also the index the similar movies of a movie are read from.
+        constraints = [
+            db_models.UniqueConstraint(fields=["movie", "rank"], name="unique_similar_movie_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.similar} for {self.movie}"
+
+
+@receiver(db_models.signals.post_save, sender=Movie)
+def generate_poster_variants(sender, instance, **kwargs):
+    """
+    Makes the resized variants of a new or changed poster once the save is
+    committed, in the image variant pool.
+
+    Args:
+        sender (Model): The model class (Movie).
+        instance (Movie): The movie saved.
+    """
+    base_images.generate_on_commit(
+        instance, "poster", "poster_variants", movie_constants.MovieConstants.POSTER_VARIANTS
+    )
+
+
+@receiver(db_models.signals.m2m_changed, sender=Movie.genres.through)
+@receiver(db_models.signals.m2m_changed, sender=Movie.languages.through)
+def update_similar_movies(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Updates the similar movies of movies whose genres or languages changed,
+    and of the movies they may now be similar to, once the change is
+    committed.
+
+    Args:
+        sender (Model): The through model of Movie.genres or Movie.languages.
+        instance (Movie | Genre | Language): The object whose links changed.
+        action (str): The m2m_changed action.
+        reverse (bool): Whether the change was made from the genre or
+            language side.
+        pk_set (set): IDs of the objects added or removed.
+    """
+    if action == "pre_clear" and reverse:
+        instance._similarity_cleared = set(instance.movies.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        movie_ids = {instance.pk} if pk_set or action == "post_clear" else set()
+    elif action == "post_clear":
+        movie_ids = getattr(instance, "_similarity_cleared", set())
+    else:
+        movie_ids = set(pk_set)
+
+    if movie_ids:
+        schedule_similarity_update(movie_ids, instance._state.db)
+
+
+class SimilarityUpdate:
+    """
+    Update of the similar movies run once a transaction commits, for all
+    the movies whose genres or languages changed in the transaction.
+
+    Attributes:
+        movie_ids (set): IDs of the movies changed.
+        done (bool): The update has run.
+    """
+
+    def __init__(self):
+        self.movie_ids = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        movie_similarity.update(self.movie_ids)
+
+
+def schedule_similarity_update(movie_ids, using):
+    """
+    Adds ``movie_ids`` to the similarity update of the current transaction
+    on ``using``, scheduling one if the transaction has none yet.
+    """
+    connection = db_transaction.get_connection(using)
+    pending = getattr(connection, "similarity_update", None)
+    # The update is dropped with the transaction or savepoint scheduling it
+    # when that is rolled back, and run once it is committed.
+    if (
+        pending is not None
+        and not pending.done
+        and any(callback is pending for _, callback, _ in connection.run_on_commit)
+    ):
+        pending.movie_ids.update(movie_ids)
+        return
+    pending = connection.similarity_update = SimilarityUpdate()
+    pending.movie_ids.update(movie_ids)
+    db_transaction.on_commit(pending, using=using)
@@ -1,5 +1,7 @@
 from rest_framework import pagination as rest_pagination
 
+from apps.movie import constants as movie_constants
+
 
 class MoviePagination(rest_pagination.CursorPagination):
     """
@@ -9,10 +11,16 @@ class MoviePagination(rest_pagination.CursorPagination):
         page_size (int): Number of records returned per page.
         page_size_query_param (str): Client-side control for page size
         max_page_size (int): Maximum limit for the page_size parameter.
-        ordering (str): The field used for ordering.
+        ordering (str): The field used for ordering, unless the view orders
+            movies by trending.
     """
 
     page_size = 15
     page_size_query_param = "page_size"
     max_page_size = 50
     ordering = ("-release_date", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        if getattr(view, "trending", False):
+            return movie_constants.TrendingConstants.PAGINATION_ORDERING
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,147 @@
+import datetime
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from apps.base import sharding as base_sharding
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.movie import constants as movie_constants
+from apps.movie import models as movie_models
+
+HISTORY_DTYPE = np.dtype([("user", np.int64), ("movie", np.int64)])
+
+
+def load_history(since):
+    """
+    Returns the distinct (user, movie) pairs of the active bookings made
+    from ``since`` on every database, as a structured array of
+    HISTORY_DTYPE sorted by user then movie.
+    """
+    histories = []
+    for alias in base_sharding.get_databases():
+        pairs = (
+            booking_models.Booking.objects.using(alias)
+            .filter(status=booking_constants.BookingStatus.BOOKED, created_at__gte=since)
+            .values_list("user_id", "slot__movie_id")
+            .distinct()
+            .order_by()
+        )
+        histories.append(np.fromiter(pairs.iterator(), dtype=HISTORY_DTYPE))
+    # A user can have booked a movie in several cities.
+    return np.unique(np.concatenate(histories))
+
+
+def iter_pairs(users, movies, batch_size):
+    """
+    Yields, in batches of about ``batch_size``, the pairs (a, b) with a < b
+    of the movies booked by a same user, as two arrays of movie indexes.
+
+    ``users`` and ``movies`` are the user and movie index of each booking
+    history entry, grouped by user. A user with ``k`` movies gives
+    ``k * (k - 1) / 2`` pairs; they are made by crossing each entry with
+    every entry of its user and keeping the upper triangle.
+    """
+    if not len(users):
+        return
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    sizes = np.diff(np.r_[starts, len(users)])
+    cumulative = np.cumsum(sizes.astype(np.int64) ** 2)
+
+    first = 0
+    while first < len(starts):
+        base = cumulative[first - 1] if first else 0
+        last = max(int(np.searchsorted(cumulative, base + batch_size, side="right")), first + 1)
+        group_starts, group_sizes = starts[first:last], sizes[first:last]
+
+        entries = np.arange(group_starts[0], group_starts[-1] + group_sizes[-1])
+        entry_sizes = np.repeat(group_sizes, group_sizes)
+        entry_starts = np.repeat(group_starts, group_sizes)
+        # Each entry is repeated once per entry of its user, and paired with
+        # those entries in turn.
+        left = np.repeat(entries, entry_sizes)
+        blocks = np.repeat(np.cumsum(entry_sizes) - entry_sizes, entry_sizes)
+        right = np.repeat(entry_starts, entry_sizes) + np.arange(len(left)) - blocks
+
+        upper = left < right
+        yield movies[left[upper]], movies[right[upper]]
+        first = last
+
+
+def compute(
+    history,
+    top_k=movie_constants.RecommendationConstants.TOP_K,
+    min_co_bookings=movie_constants.RecommendationConstants.MIN_CO_BOOKINGS,
+    max_movies_per_user=movie_constants.RecommendationConstants.MAX_MOVIES_PER_USER,
+    batch_size=movie_constants.RecommendationConstants.PAIR_BATCH_SIZE,
+):
+    """
+    Returns the ``top_k`` related movies of each movie of ``history`` (see
+    ``load_history``), as arrays of movie ID, related movie ID, score and
+    rank, sorted by movie then rank.
+
+    The co-booking matrix, the number of users who booked both of two
+    movies, is built sparse: only the movie pairs some user booked are
+    counted, batch by batch, keyed by ``a * movie_count + b``. Scores are
+    the cosine similarity of the two movies' users,
+    ``co_bookings / sqrt(users_a * users_b)``, so that blockbusters booked
+    by everyone do not top every list.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    movie_ids, movies = np.unique(history["movie"], return_inverse=True)
+    users = history["user"]
+    movie_count = len(movie_ids)
+
+    # Leave out the users with too many movies.
+    _, user_index, user_sizes = np.unique(users, return_inverse=True, return_counts=True)
+    kept = user_sizes[user_index] <= max_movies_per_user
+    users, movies = users[kept], movies[kept]
+    movie_users = np.bincount(movies, minlength=movie_count)
+
+    keys, counts = empty, empty
+    for left, right in iter_pairs(users, movies, batch_size):
+        batch_keys, batch_counts = np.unique(left * movie_count + right, return_counts=True)
+        keys, inverse = np.unique(np.r_[keys, batch_keys], return_inverse=True)
+        counts = np.bincount(inverse, weights=np.r_[counts, batch_counts]).astype(np.int64)
+
+    frequent = counts >= min_co_bookings
+    keys, counts = keys[frequent], counts[frequent]
+    left, right = np.divmod(keys, movie_count)
+    # The matrix is symmetric; both directions are ranked.
+    source, target = np.r_[left, right], np.r_[right, left]
+    counts = np.r_[counts, counts]
+    scores = counts / np.sqrt(movie_users[source] * movie_users[target])
+
+    order = np.lexsort((movie_ids[target], -counts, -scores, source))
+    source, target, scores = source[order], target[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]]) if len(source) else empty
+    sizes = np.diff(np.r_[starts, len(source)])
+    ranks = np.arange(len(source)) - np.repeat(starts, sizes)
+
+    top = ranks < top_k
+    return movie_ids[source[top]], movie_ids[target[top]], scores[top], ranks[top]
+
+
+def build(days=movie_constants.RecommendationConstants.HISTORY_DAYS, **options):
+    """
+    Recomputes the related movies from the bookings of the last ``days``
+    days and replaces the stored ones in one transaction. Returns the number
+    of rows written.
+
+    Keyword arguments are passed on to ``compute``.
+    """
+    history = load_history(timezone.now() - datetime.timedelta(days=days))
+    movie_ids, related_ids, scores, ranks = compute(history, **options)
+    rows = [
+        movie_models.RelatedMovie(movie_id=movie_id, related_id=related_id, score=score, rank=rank)
+        for movie_id, related_id, score, rank in zip(
+            movie_ids.tolist(), related_ids.tolist(), scores.tolist(), ranks.tolist()
+        )
+    ]
+    with transaction.atomic(using=base_sharding.PRIMARY_ALIAS):
+        movie_models.RelatedMovie.objects.using(base_sharding.PRIMARY_ALIAS).all().delete()
+        movie_models.RelatedMovie.objects.using(base_sharding.PRIMARY_ALIAS).bulk_create(
+            rows, batch_size=1000
+        )
+    return len(rows)
@@ -1,5 +1,8 @@
 from rest_framework import serializers as rest_serializers
 
+from apps.base import images as base_images
+from apps.base import serializers as base_serializers
+from apps.base import tracing as base_tracing
 from apps.movie import models as movie_models
 
 
@@ -10,6 +13,8 @@ class MovieSerializer(rest_serializers.ModelSerializer):
     Fields:
         id (int): Unique identifier of the movie.
         poster (str): URL of the movie poster image.
+        poster_variants (dict): URLs of the resized posters by size
+            (thumbnail, card, detail) and format (webp, jpeg).
         name (str): The title of the movie.
         genres ([str]): List of genre names associated with the movie.
         duration (str): Duration of the movie.
@@ -23,12 +28,14 @@ class MovieSerializer(rest_serializers.ModelSerializer):
     languages = rest_serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="name"
     )
+    poster_variants = base_serializers.ImageVariantsField()
 
     class Meta:
         model = movie_models.Movie
         fields = [
             "id",
             "poster",
+            "poster_variants",
             "name",
             "genres",
             "duration",
@@ -37,6 +44,52 @@ class MovieSerializer(rest_serializers.ModelSerializer):
         ]
 
 
+class RelatedMovieSerializer(rest_serializers.ModelSerializer):
+    """
+    Serializer for a movie recommended on another.
+
+    Fields:
+        id (int): Unique identifier of the related movie.
+        name (str): The title of the related movie.
+        poster (str): URL of its poster image.
+        poster_variants (dict): URLs of its resized posters.
+        score (float): How often the two movies are booked by the same
+            users, from 0 to 1.
+    """
+
+    id = rest_serializers.IntegerField(source="related_id")
+    name = rest_serializers.CharField(source="related.name")
+    poster = rest_serializers.ImageField(source="related.poster")
+    poster_variants = base_serializers.ImageVariantsField(source="related.poster_variants")
+
+    class Meta:
+        model = movie_models.RelatedMovie
+        fields = ["id", "name", "poster", "poster_variants", "score"]
+
+
+class SimilarMovieSerializer(rest_serializers.ModelSerializer):
+    """
+    Serializer for a movie sharing genres and languages with another.
+
+    Fields:
+        id (int): Unique identifier of the similar movie.
+        name (str): The title of the similar movie.
+        poster (str): URL of its poster image.
+        poster_variants (dict): URLs of its resized posters.
+        score (float): Share of their genres and languages the two movies
+            have in common, from 0 to 1.
+    """
+
+    id = rest_serializers.IntegerField(source="similar_id")
+    name = rest_serializers.CharField(source="similar.name")
+    poster = rest_serializers.ImageField(source="similar.poster")
+    poster_variants = base_serializers.ImageVariantsField(source="similar.poster_variants")
+
+    class Meta:
+        model = movie_models.SimilarMovie
+        fields = ["id", "name", "poster", "poster_variants", "score"]
+
+
 class MovieDetailSerializer(MovieSerializer):
     """
     Detailed serializer for a single Movie instance.
@@ -46,6 +99,7 @@ class MovieDetailSerializer(MovieSerializer):
     Fields:
         id (int): Unique identifier of the movie.
         poster (str): URL of the movie poster image.
+        poster_variants (dict): URLs of the resized posters.
         name (str): The title of the movie.
         genres ([str]): List of genre names associated with the movie.
         duration (int): Duration of the movie.
@@ -55,6 +109,7 @@ class MovieDetailSerializer(MovieSerializer):
         cinemas (list): Contains basic cinema information.
             id (int): Unique identifier of the cinema.
             image (str): URL of the cinema image.
+            image_variants (dict): URLs of the resized cinema images.
             name (str): Name of the cinema.
             city (str): Name of the city where the cinema is located.
             address (str): Full address of the cinema.
@@ -67,13 +122,21 @@ class MovieDetailSerializer(MovieSerializer):
                 id (int): Unique identifier of the slot.
                 start_time (datetime): Start time of the show.
                 price (int): Ticket price for the slot.
+
+        related_movies (list): Movies often booked by the users who booked
+            this one, most related first.
+        similar_movies (list): Movies with the most genres and languages in
+            common with this one, also for releases without bookings.
     """
 
     cinemas = rest_serializers.SerializerMethodField()
+    related_movies = RelatedMovieSerializer(many=True, read_only=True)
+    similar_movies = SimilarMovieSerializer(many=True, read_only=True)
 
     class Meta(MovieSerializer.Meta):
-        fields = MovieSerializer.Meta.fields + ["cinemas"]
+        fields = MovieSerializer.Meta.fields + ["cinemas", "related_movies", "similar_movies"]
 
+    @base_tracing.traced("serializer.get_cinemas")
     def get_cinemas(self, movie):
         """
         The method provides a hierarchical grouping of available
@@ -96,6 +159,9 @@ class MovieDetailSerializer(MovieSerializer):
                     "cinema": {
                         "id": cinema.id,
                         "image": image_url,
+                        "image_variants": base_images.get_variant_urls(
+                            cinema.image_variants, request
+                        ),
                         "name": cinema.name,
                         "city": city.name,
                         "address": cinema.address,
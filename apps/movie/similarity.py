@@ -0,0 +1,171 @@
+import numpy as np
+from django.db import transaction
+
+from apps.base import sharding as base_sharding
+from apps.movie import constants as movie_constants
+from apps.movie import models as movie_models
+
+LINK_DTYPE = np.dtype([("movie", np.int64), ("feature", np.int64)])
+
+
+LINKS = (
+    (movie_models.Movie.genres.through, "genre_id"),
+    (movie_models.Movie.languages.through, "language_id"),
+)
+
+
+def load_features(movie_ids=None):
+    """
+    Returns the IDs of the movies ``movie_ids``, or of all movies, newest
+    release first, and their one-hot matrix of genres and languages: one
+    row per movie, one column per genre then per language, 1 where the
+    movie has it.
+
+    Read from the primary database, so that a change just committed is
+    seen.
+    """
+    movies = (
+        movie_models.Movie.objects.using(base_sharding.PRIMARY_ALIAS)
+        .order_by("-release_date", "-id")
+        .values_list("id", flat=True)
+    )
+    if movie_ids is not None:
+        movies = movies.filter(id__in=list(movie_ids))
+    loaded_ids = np.fromiter(movies.iterator(), dtype=np.int64)
+    sorter = np.argsort(loaded_ids)
+
+    columns = []
+    offset = 0
+    for through, field in LINKS:
+        links = through.objects.using(base_sharding.PRIMARY_ALIAS)
+        if movie_ids is not None:
+            links = links.filter(movie_id__in=loaded_ids.tolist())
+        links = np.fromiter(links.values_list("movie_id", field).iterator(), dtype=LINK_DTYPE)
+        feature_ids, features = np.unique(links["feature"], return_inverse=True)
+        rows = sorter[np.searchsorted(loaded_ids, links["movie"], sorter=sorter)]
+        columns.append((rows, features + offset))
+        offset += len(feature_ids)
+
+    matrix = np.zeros((len(loaded_ids), offset), dtype=np.float32)
+    for rows, features in columns:
+        matrix[rows, features] = 1
+    return loaded_ids, matrix
+
+
+def get_related(movie_ids):
+    """
+    Returns the IDs of the movies ``movie_ids`` and of the movies sharing a
+    genre or language with one of them, the only movies they can be
+    similar to.
+    """
+    related = set(movie_ids)
+    for through, field in LINKS:
+        links = through.objects.using(base_sharding.PRIMARY_ALIAS)
+        features = links.filter(movie_id__in=list(movie_ids)).values(field)
+        related.update(
+            links.filter(**{f"{field}__in": features}).values_list("movie_id", flat=True)
+        )
+    return related
+
+
+def get_scores(matrix, rows):
+    """
+    Returns the Jaccard similarity of the movies at ``rows`` to every movie,
+    as a ``len(rows)`` x movies array: the features two movies share over
+    the features either has. A movie has no similarity to itself, nor to
+    movies it shares nothing with.
+    """
+    sizes = matrix.sum(axis=1)
+    shared = matrix[rows] @ matrix.T
+    union = sizes[rows, None] + sizes[None, :] - shared
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(union > 0, shared / union, 0)
+    scores[np.arange(len(rows)), rows] = 0
+    return scores
+
+
+def compute(movie_ids, matrix, rows, top_k=movie_constants.SimilarityConstants.TOP_K):
+    """
+    Returns the ``top_k`` similar movies of the movies at ``rows``, as
+    unsaved SimilarMovie rows. Movies as similar as each other are ranked
+    newest release first.
+    """
+    ids = movie_ids.tolist()
+    similar_movies = []
+    block_size = movie_constants.SimilarityConstants.BLOCK_SIZE
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        scores = get_scores(matrix, block)
+        # Columns are ordered newest first, which a stable sort keeps.
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        for row, columns, column_scores in zip(block.tolist(), top, top_scores):
+            similar_movies.extend(
+                movie_models.SimilarMovie(
+                    movie_id=ids[row], similar_id=ids[column], score=score, rank=rank
+                )
+                for rank, (column, score) in enumerate(
+                    zip(columns.tolist(), column_scores.tolist())
+                )
+                if score > 0
+            )
+    return similar_movies
+
+
+def replace(similar_movies, movie_ids=None):
+    """
+    Replaces the stored similar movies of ``movie_ids``, or of every movie,
+    with ``similar_movies`` in one transaction.
+    """
+    queryset = movie_models.SimilarMovie.objects.using(base_sharding.PRIMARY_ALIAS)
+    with transaction.atomic(using=base_sharding.PRIMARY_ALIAS):
+        if movie_ids is None:
+            queryset.all().delete()
+        else:
+            queryset.filter(movie_id__in=movie_ids).delete()
+        queryset.bulk_create(similar_movies, batch_size=1000)
+
+
+def build(top_k=movie_constants.SimilarityConstants.TOP_K):
+    """
+    Recomputes the similar movies of every movie. Returns the number of
+    rows written.
+    """
+    movie_ids, matrix = load_features()
+    similar_movies = compute(movie_ids, matrix, np.arange(len(movie_ids)), top_k)
+    replace(similar_movies)
+    return len(similar_movies)
+
+
+def update(changed_ids, top_k=movie_constants.SimilarityConstants.TOP_K):
+    """
+    Updates the similar movies after the genres or languages of the movies
+    ``changed_ids`` changed.
+
+    Besides the changed movies themselves, only the movies whose list can
+    differ are recomputed: those listing a changed movie, and those a
+    changed movie is now at least as similar to as their last listed
+    movie. Only the features of these movies and of the movies related to
+    them are loaded. Returns the number of movies recomputed.
+    """
+    changed_ids = list(changed_ids)
+    stored = movie_models.SimilarMovie.objects.using(base_sharding.PRIMARY_ALIAS)
+    affected = set(changed_ids)
+    affected.update(stored.filter(similar_id__in=changed_ids).values_list("movie_id", flat=True))
+
+    movie_ids, matrix = load_features(get_related(changed_ids))
+    changed = np.flatnonzero(np.isin(movie_ids, changed_ids))
+    if len(changed):
+        best = get_scores(matrix, changed).max(axis=0)
+        candidates = movie_ids[best > 0].tolist()
+        # Movies listing fewer than top_k movies take any similar movie.
+        thresholds = dict(
+            stored.filter(movie_id__in=candidates, rank=top_k - 1).values_list("movie_id", "score")
+        )
+        floor = np.array([thresholds.get(movie_id, 0.0) for movie_id in movie_ids.tolist()])
+        affected.update(movie_ids[(best > 0) & (best >= floor)].tolist())
+
+    movie_ids, matrix = load_features(get_related(affected))
+    rows = np.flatnonzero(np.isin(movie_ids, list(affected)))
+    replace(compute(movie_ids, matrix, rows, top_k), movie_ids[rows].tolist() + changed_ids)
+    return len(rows)
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import collections
+import datetime
+import itertools
+import math
+import random
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+
+from apps.base import models as base_models
+from apps.movie import constants as movie_constants
+from apps.movie import models as movie_models
+from apps.movie import recommendations as movie_recommendations
+from apps.movie import similarity as movie_similarity
+from apps.movie import trending as movie_trending
+
+BUCKETS = movie_constants.TrendingConstants.BUCKETS
+
+
+def create_movie(name, release_date):
+    return movie_models.Movie.objects.create(
+        name=name,
+        description="description",
+        duration=datetime.timedelta(hours=2),
+        release_date=release_date,
+        poster="poster.jpg",
+    )
+
+
+class SimilarMoviesTests(TestCase):
+    """
+    Updates of the similar movies as genres and languages change, against a
+    rebuild of them all.
+    """
+
+    def setUp(self):
+        self.random = random.Random(7)
+        self.genres = [base_models.Genre.objects.create(name=f"genre {i}") for i in range(6)]
+        self.languages = [
+            base_models.Language.objects.create(name=f"language {i}") for i in range(3)
+        ]
+        # Releases on the same day rank movies as similar as each other.
+        self.movies = [
+            create_movie(f"movie {i}", datetime.date(2020, 1, 1) + datetime.timedelta(days=i % 8))
+            for i in range(40)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for movie in self.movies:
+                movie.genres.set(self.sample(self.genres, 0, 3))
+                movie.languages.set(self.sample(self.languages, 1, 2))
+
+    def sample(self, population, low, high):
+        return self.random.sample(population, self.random.randint(low, high))
+
+    def get_similar_movies(self):
+        return list(
+            movie_models.SimilarMovie.objects.order_by("movie_id", "rank").values_list(
+                "movie_id", "similar_id", "rank", "score"
+            )
+        )
+
+    def assert_rebuilt(self):
+        updated = self.get_similar_movies()
+        movie_similarity.build()
+        self.assertEqual(updated, self.get_similar_movies())
+
+    def test_updates_match_a_rebuild(self):
+        for _ in range(15):
+            movie = self.random.choice(self.movies)
+            with self.captureOnCommitCallbacks(execute=True):
+                movie.genres.set(self.sample(self.genres, 0, 3))
+                movie.languages.set(self.sample(self.languages, 0, 2))
+            self.assert_rebuilt()
+
+    def test_updates_from_genres_match_a_rebuild(self):
+        genre = self.genres[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            genre.movies.clear()
+        self.assert_rebuilt()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            genre.movies.add(*self.movies[:20])
+        self.assert_rebuilt()
+
+    def test_changes_of_a_transaction_are_updated_at_once(self):
+        with mock.patch.object(movie_similarity, "update", wraps=movie_similarity.update) as update:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                for movie in self.movies[:3]:
+                    movie.genres.clear()
+                    movie.languages.set(self.languages[:1])
+
+        self.assertEqual(len(callbacks), 1)
+        update.assert_called_once_with({movie.pk for movie in self.movies[:3]})
+        self.assert_rebuilt()
+
+    def test_changes_rolled_back_are_not_updated(self):
+        first, second = self.movies[:2]
+        with mock.patch.object(movie_similarity, "update") as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    first.genres.clear()
+                    transaction.set_rollback(True)
+                second.genres.clear()
+
+        update.assert_called_once_with({second.pk})
+
+
+class RecommendationsTests(SimpleTestCase):
+    """
+    The related movies computed from booking histories, against counting the
+    co-bookings of every pair of movies one by one.
+    """
+
+    def setUp(self):
+        generator = random.Random(7)
+        pairs = {(generator.randint(1, 30), generator.randint(1, 12)) for _ in range(200)}
+        # A user of many movies, whose pairs span several batches.
+        pairs.update((31, movie) for movie in range(1, 13))
+        self.history = np.unique(np.array(sorted(pairs), dtype=movie_recommendations.HISTORY_DTYPE))
+
+    def get_user_movies(self, max_movies_per_user=None):
+        user_movies = collections.defaultdict(list)
+        for user, movie in self.history.tolist():
+            user_movies[user].append(movie)
+        return {
+            user: movies
+            for user, movies in user_movies.items()
+            if max_movies_per_user is None or len(movies) <= max_movies_per_user
+        }
+
+    def get_related(self, top_k, min_co_bookings, max_movies_per_user):
+        user_movies = self.get_user_movies(max_movies_per_user)
+        movie_users = collections.Counter(itertools.chain(*user_movies.values()))
+        co_bookings = collections.Counter()
+        for movies in user_movies.values():
+            for a, b in itertools.permutations(movies, 2):
+                co_bookings[a, b] += 1
+
+        ranked = collections.defaultdict(list)
+        for (a, b), count in co_bookings.items():
+            if count >= min_co_bookings:
+                score = count / math.sqrt(movie_users[a] * movie_users[b])
+                ranked[a].append((-score, -count, b))
+        return [
+            (a, b, -score, rank)
+            for a in sorted(ranked)
+            for rank, (score, _, b) in enumerate(sorted(ranked[a])[:top_k])
+        ]
+
+    def compute(self, history, **options):
+        return list(
+            zip(*(column.tolist() for column in movie_recommendations.compute(history, **options)))
+        )
+
+    def test_pairs_are_the_movies_of_each_user(self):
+        user_movies = self.get_user_movies()
+        expected = sorted(
+            pair for movies in user_movies.values() for pair in itertools.combinations(movies, 2)
+        )
+        users = self.history["user"]
+        movies = self.history["movie"]
+
+        # One user of 12 movies alone gives 66 pairs.
+        for batch_size in (1, 10, 50, 10_000):
+            with self.subTest(batch_size=batch_size):
+                batches = list(movie_recommendations.iter_pairs(users, movies, batch_size))
+                pairs = sorted(
+                    pair for left, right in batches for pair in zip(left.tolist(), right.tolist())
+                )
+                self.assertEqual(pairs, expected)
+                if batch_size < 66:
+                    self.assertGreater(len(batches), 1)
+
+    def test_related_movies_match_the_co_bookings(self):
+        for top_k, min_co_bookings, max_movies_per_user, batch_size in (
+            (3, 2, 500, 10),
+            (10, 1, 6, 1),
+            (5, 3, 12, 10_000),
+        ):
+            with self.subTest(top_k=top_k, batch_size=batch_size):
+                expected = self.get_related(top_k, min_co_bookings, max_movies_per_user)
+                related = self.compute(
+                    self.history,
+                    top_k=top_k,
+                    min_co_bookings=min_co_bookings,
+                    max_movies_per_user=max_movies_per_user,
+                    batch_size=batch_size,
+                )
+
+                self.assertTrue(expected)
+                self.assertEqual(related, expected)
+
+    def test_empty_history_relates_nothing(self):
+        history = np.empty(0, dtype=movie_recommendations.HISTORY_DTYPE)
+
+        self.assertEqual(
+            list(movie_recommendations.iter_pairs(history["user"], history["movie"], 10)), []
+        )
+        self.assertEqual(self.compute(history), [])
+
+
+class RingBufferTests(SimpleTestCase):
+    """
+    Bucket counts of the trending counters as the window moves.
+    """
+
+    def create_buffer(self, *buckets):
+        buffer = movie_trending.RingBuffer()
+        for bucket in buckets:
+            buffer.add(bucket)
+        return buffer
+
+    def test_buckets_expire_as_the_window_moves(self):
+        buffer = self.create_buffer(100, 101, 101, 103)
+
+        self.assertEqual(buffer.total(103), 4)
+        self.assertEqual(buffer.total(100 + BUCKETS - 1), 4)
+        self.assertEqual(buffer.total(100 + BUCKETS), 3)
+        self.assertEqual(buffer.total(102 + BUCKETS), 1)
+        self.assertEqual(buffer.head, 103)
+
+        buffer.roll(101 + BUCKETS)
+        self.assertEqual(buffer.total(101 + BUCKETS), 1)
+        # Buckets out of the window are not counted.
+        buffer.add(101)
+        self.assertEqual(buffer.total(101 + BUCKETS), 1)
+        buffer.add(102)
+        self.assertEqual(buffer.total(101 + BUCKETS), 2)
+
+    def test_merged_buffers_are_rolled_to_the_newer_head(self):
+        # The window ending at bucket 100 + BUCKETS leaves bucket 100 out.
+        for target, source, expired in ((100, 105, 2), (105, 100, 1)):
+            with self.subTest(target=target, source=source):
+                buffer = self.create_buffer(target, target)
+                buffer.merge(self.create_buffer(source, source + 1))
+
+                self.assertEqual(buffer.head, max(target, source + 1))
+                self.assertEqual(buffer.total(106), 4)
+                self.assertEqual(buffer.total(100 + BUCKETS), 4 - expired)
+
+    def test_merging_an_empty_buffer_keeps_the_counts(self):
+        buffer = self.create_buffer(100)
+        buffer.merge(movie_trending.RingBuffer())
+        self.assertEqual((buffer.head, buffer.total(100)), (100, 1))
+
+        empty = movie_trending.RingBuffer()
+        empty.merge(buffer)
+        self.assertEqual((empty.head, empty.total(100)), (100, 1))
+
+    def test_gaps_of_a_whole_window_clear_the_buffer(self):
+        buffer = self.create_buffer(100, 100 + BUCKETS - 1)
+
+        self.assertEqual(buffer.total(100 + BUCKETS - 1), 2)
+        self.assertEqual(buffer.total(100 + BUCKETS), 1)
+        self.assertEqual(buffer.total(99 + 2 * BUCKETS), 0)
+
+        stale = self.create_buffer(100, 101)
+        stale.merge(self.create_buffer(101 + BUCKETS))
+        self.assertEqual(stale.head, 101 + BUCKETS)
+        self.assertEqual(stale.total(101 + BUCKETS), 1)
+        self.assertEqual(int(stale.counts.sum()), 1)
+
+        # A buffer a window behind adds nothing.
+        fresh = self.create_buffer(101 + BUCKETS)
+        fresh.merge(self.create_buffer(100, 101))
+        self.assertEqual(fresh.total(101 + BUCKETS), 1)
+
+        buffer.roll(99 + 2 * BUCKETS)
+        self.assertEqual(int(buffer.counts.sum()), 0)
@@ -0,0 +1,264 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections as db_connections
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from apps.base import sharding as base_sharding
+from apps.movie import constants as movie_constants
+from apps.movie import models as movie_models
+
+logger = logging.getLogger(__name__)
+
+
+def current_bucket():
+    return int(time.time()) // movie_constants.TrendingConstants.BUCKET_SECONDS
+
+
+class RingBuffer:
+    """
+    Counts per bucket over the last TrendingConstants.BUCKETS buckets.
+
+    Bucket number ``n`` is counted at index ``n % BUCKETS``, so buffers
+    rolled to the same head can be added together index by index. Rolling
+    forward clears the buckets that left the window.
+
+    Attributes:
+        counts (ndarray): The counts, as unsigned 32-bit integers.
+        head (int): Number of the newest bucket, None while empty.
+    """
+
+    def __init__(self, counts=None, head=None):
+        if counts is None:
+            counts = np.zeros(movie_constants.TrendingConstants.BUCKETS, dtype=np.uint32)
+        self.counts = counts
+        self.head = head
+
+    @classmethod
+    def from_bytes(cls, data, head):
+        return cls(np.frombuffer(bytes(data), dtype=np.uint32).copy(), head)
+
+    def to_bytes(self):
+        return self.counts.tobytes()
+
+    def roll(self, bucket):
+        """
+        Moves the head forward to ``bucket``, clearing the buckets between.
+        """
+        size = len(self.counts)
+        if self.head is None or bucket - self.head >= size:
+            self.counts[:] = 0
+        elif bucket > self.head:
+            self.counts[np.arange(self.head + 1, bucket + 1) % size] = 0
+        else:
+            return
+        self.head = bucket
+
+    def add(self, bucket, count=1):
+        """
+        Counts ``count`` in ``bucket``; buckets already out of the window
+        are ignored.
+        """
+        self.roll(bucket)
+        if self.head - bucket < len(self.counts):
+            self.counts[bucket % len(self.counts)] += count
+
+    def merge(self, other):
+        """
+        Adds the counts of ``other`` to this buffer, rolling both to the
+        newer head.
+        """
+        if other.head is None:
+            return
+        self.roll(other.head)
+        other.roll(self.head)
+        self.counts += other.counts
+
+    def total(self, bucket):
+        """
+        Returns the count over the window ending at ``bucket``, without
+        changing the buffer.
+        """
+        if self.head is None or bucket - self.head >= len(self.counts):
+            return 0
+        if bucket <= self.head:
+            return int(self.counts.sum())
+        expired = np.arange(self.head + 1, bucket + 1) % len(self.counts)
+        return int(self.counts.sum() - self.counts[expired].sum())
+
+
+class TrendingCounters:
+    """
+    Per-process booking counters by city and movie.
+
+    Bookings are counted in memory as they are committed, at the cost of a
+    dictionary update, and added to the MovieTrend rows shared by all
+    processes every TRENDING_FLUSH_SECONDS: when the process next counts a
+    booking or ranks the movies of a city, or else from a background timer
+    started with the first pending count, so that an idle process flushes
+    too. Pending counts are also flushed when the process exits. Counts a
+    process has not flushed yet are not seen by the others.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.flushed_at = time.monotonic()
+        self.timer = None
+        self.timer_pid = None
+
+    def add(self, city_id, movie_id, count=1):
+        with self.lock:
+            buffer = self.pending.get((city_id, movie_id))
+            if buffer is None:
+                buffer = self.pending[city_id, movie_id] = RingBuffer()
+            buffer.add(current_bucket(), count)
+            self.start_timer()
+        self.refresh()
+
+    def start_timer(self):
+        """
+        Schedules a background flush of the pending counts unless one is
+        scheduled. Called with the lock held.
+        """
+        # A forked worker inherits the parent's timer but not its thread.
+        if self.timer is not None and self.timer_pid == os.getpid():
+            return
+        self.timer = threading.Timer(settings.TRENDING_FLUSH_SECONDS, self.flush_on_timer)
+        self.timer.daemon = True
+        self.timer_pid = os.getpid()
+        self.timer.start()
+
+    def flush_on_timer(self):
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush_all()
+        finally:
+            # Connections opened by this thread would otherwise stay open.
+            db_connections.close_all()
+
+    def refresh(self):
+        """
+        Flushes the counters when they were last flushed more than
+        TRENDING_FLUSH_SECONDS ago.
+        """
+        if time.monotonic() - self.flushed_at >= settings.TRENDING_FLUSH_SECONDS:
+            with self.lock:
+                if time.monotonic() - self.flushed_at < settings.TRENDING_FLUSH_SECONDS:
+                    return
+                pending, self.pending = self.pending, {}
+                self.flushed_at = time.monotonic()
+            self.flush(pending)
+
+    def flush(self, pending):
+        """
+        Adds ``pending`` buffers by (city ID, movie ID) to their MovieTrend
+        rows, each in its own short transaction. Buffers that could not be
+        written are kept for the next flush.
+        """
+        for (city_id, movie_id), buffer in sorted(pending.items()):
+            try:
+                with transaction.atomic(using=base_sharding.PRIMARY_ALIAS):
+                    trend, created = (
+                        movie_models.MovieTrend.objects.using(base_sharding.PRIMARY_ALIAS)
+                        .select_for_update()
+                        .get_or_create(
+                            city_id=city_id,
+                            movie_id=movie_id,
+                            defaults={"head": buffer.head, "buckets": buffer.to_bytes()},
+                        )
+                    )
+                    if not created:
+                        stored = RingBuffer.from_bytes(trend.buckets, trend.head)
+                        stored.merge(buffer)
+                        trend.head = stored.head
+                        trend.buckets = stored.to_bytes()
+                        trend.save(update_fields=["head", "buckets", "updated_at"])
+            except Exception:
+                logger.exception("Could not flush the trending counts of movie %s", movie_id)
+                with self.lock:
+                    kept = self.pending.get((city_id, movie_id))
+                    if kept is not None:
+                        buffer.merge(kept)
+                    self.pending[city_id, movie_id] = buffer
+                    self.start_timer()
+
+    def flush_all(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        self.flush(pending)
+
+
+trending_counters = TrendingCounters()
+# Workers recycled after max requests, or stopped by a deploy, exit cleanly.
+atexit.register(trending_counters.flush_all)
+
+
+def record_booking(booking):
+    """
+    Counts a booking committed for its movie in the city of its cinema.
+    """
+    slot = booking.slot
+    city_id = base_sharding.get_cinema_city(slot.cinema_id)
+    if city_id is not None:
+        trending_counters.add(city_id, slot.movie_id)
+
+
+def compute_scores(city_id):
+    """
+    Returns the bookings of the last day of the TOP_MOVIES most booked
+    movies of a city, by movie ID.
+    """
+    now = current_bucket()
+    trends = movie_models.MovieTrend.objects.filter(
+        city_id=city_id, head__gt=now - movie_constants.TrendingConstants.BUCKETS
+    ).values_list("movie_id", "head", "buckets")
+    totals = {
+        movie_id: RingBuffer.from_bytes(buckets, head).total(now)
+        for movie_id, head, buckets in trends.iterator()
+    }
+    ranked = sorted(
+        ((total, movie_id) for movie_id, total in totals.items() if total), reverse=True
+    )
+    return {
+        movie_id: total
+        for total, movie_id in ranked[: movie_constants.TrendingConstants.TOP_MOVIES]
+    }
+
+
+def get_scores(city_id):
+    """
+    Returns the trending scores of the movies of a city, cached for
+    TRENDING_CACHE_SECONDS.
+    """
+    key = movie_constants.TrendingConstants.CACHE_KEY.format(city_id=city_id)
+    scores = cache.get(key)
+    if scores is None:
+        trending_counters.refresh()
+        scores = compute_scores(city_id)
+        cache.set(key, scores, settings.TRENDING_CACHE_SECONDS)
+    return scores
+
+
+def annotate_scores(queryset, city_id):
+    """
+    Annotates ``queryset`` of movies with the ``trending_score`` of each in
+    a city, 0 for movies outside its top movies.
+    """
+    scores = get_scores(city_id)
+    return queryset.annotate(
+        trending_score=Case(
+            *(When(id=movie_id, then=Value(score)) for movie_id, score in scores.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
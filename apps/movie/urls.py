@@ -1,7 +1,12 @@
+from django.conf import settings
 from rest_framework.routers import SimpleRouter
 
 from apps.movie import views as movie_views
 
 router = SimpleRouter()
-router.register("", movie_views.MovieViewSet, basename="movie")
+router.register(
+    "",
+    movie_views.AsyncMovieViewSet if settings.ASYNC_READ_VIEWS else movie_views.MovieViewSet,
+    basename="movie",
+)
 urlpatterns = router.urls
@@ -1,3 +1,5 @@
+import functools
+import operator
 from datetime import date as date_class
 
 from django.db.models import Prefetch
@@ -5,6 +7,11 @@ from django.utils import timezone
 from rest_framework import exceptions as rest_exceptions
 from rest_framework import viewsets as rest_viewsets
 
+from apps.base import async_views as base_async_views
+from apps.base import sharding as base_sharding
+from apps.base import tracing as base_tracing
+from apps.base import utils as base_utils
+from apps.cinema import models as cinema_models
 from apps.movie import constants as movie_constants
 from apps.movie import filter as movie_filters
 from apps.movie import models as movie_models
@@ -12,8 +19,11 @@ from apps.movie import pagination as movie_paginations
 from apps.movie import serializers as movie_serializers
 from apps.slot import models as slot_models
 
+# Imported on the first trending ranking, keeping NumPy off the startup path.
+movie_trending = base_utils.LazyModule("apps.movie.trending")
 
-class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
+
+class MovieViewSet(base_tracing.TracedViewMixin, rest_viewsets.ReadOnlyModelViewSet):
     """
     Read-only API endpoints for browsing movies and
     viewing movie showtime details.
@@ -41,6 +51,15 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
         - latest_days
             Filters movies released within the last N days from today.
             Example: ?latest_days=7
+        - ordering
+            "trending" orders movies by their bookings in the city over the
+            last 24 hours, then by release date. Requires city. Bookings
+            count after up to TRENDING_FLUSH_SECONDS, when their worker
+            writes its counts, plus TRENDING_CACHE_SECONDS, while the
+            ranking is cached.
+            Example: ?ordering=trending&city=1
+        - city
+            City ID the trending ordering ranks bookings of.
     Response:
         200 OK
         {
@@ -61,6 +80,7 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
     Errors:
         400 Bad Request:
             - Invalid date format. Please use YYYY-MM-DD
+            - A city is required to order movies by trending.
 
 
     2. RETRIEVE (GET) (/movies/{pk}/)
@@ -108,6 +128,24 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
                         }
                     ]
                 }
+            ],
+            "related_movies": [
+                {
+                    "id": int,
+                    "name": str,
+                    "poster": str,
+                    "poster_variants": dict,
+                    "score": float
+                }
+            ],
+            "similar_movies": [
+                {
+                    "id": int,
+                    "name": str,
+                    "poster": str,
+                    "poster_variants": dict,
+                    "score": float
+                }
             ]
         }
     Errors:
@@ -118,6 +156,8 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
             - No Movie matches the given query
     """
 
+    read_replica = True
+    trending = False
     pagination_class = movie_paginations.MoviePagination
     filterset_class = movie_filters.MovieFilter
 
@@ -133,6 +173,7 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
             return movie_serializers.MovieSerializer
         return movie_serializers.MovieDetailSerializer
 
+    @base_tracing.traced("view.get_queryset")
     def get_queryset(self):
         """
         Dynamically builds the queryset based on the action and
@@ -152,31 +193,103 @@ class MovieViewSet(rest_viewsets.ReadOnlyModelViewSet):
                 {"date": movie_constants.ErrorMessages.INVALID_DATE_FORMAT}
             )
 
+        # Range filters on start_time let the slot partitions be pruned
+        day_start, day_end = base_utils.get_day_bounds(parsed_date)
+
         # Retrieve
         if self.action == "retrieve":
             city_id = self.request.query_params.get("city")
 
             # Filter slots for the specific date and future times
-            slots_qs = (
+            slots_qs = base_sharding.select_catalog(
                 slot_models.Slot.objects.filter(
-                    start_time__gt=timezone.now(), start_time__date=parsed_date
-                )
-                .select_related("cinema", "cinema__city", "language")
-                .order_by("start_time")
-            )
+                    start_time__gt=timezone.now(),
+                    start_time__gte=day_start,
+                    start_time__lt=day_end,
+                ),
+                "cinema",
+                "cinema__city",
+                "language",
+            ).order_by("start_time")
 
             if city_id:
-                slots_qs = slots_qs.filter(cinema__city_id=city_id)
+                city_cinemas = cinema_models.Cinema.objects.filter(city_id=city_id)
+                slots_qs = slots_qs.filter(
+                    cinema_id__in=base_sharding.subquery_values(
+                        city_cinemas.values_list("id", flat=True)
+                    )
+                )
+
+            # Slots can be spread over city shards, so they are attached to
+            # the movie in get_object rather than prefetched here.
+            self.slots_queryset = slots_qs
+            self.slot_databases = base_sharding.get_city_databases(city_id or None)
 
+            # One query each on the (movie, rank) index, joined to the movies.
+            related_movies = Prefetch(
+                "related_movies",
+                queryset=movie_models.RelatedMovie.objects.select_related("related"),
+            )
+            similar_movies = Prefetch(
+                "similar_movies",
+                queryset=movie_models.SimilarMovie.objects.select_related("similar"),
+            )
             return movie_models.Movie.objects.prefetch_related(
-                Prefetch("slots", queryset=slots_qs),
-                "genres",
-                "languages",
+                "genres", "languages", related_movies, similar_movies
             )
 
         # List
         qs = movie_models.Movie.objects.all()
         if raw_date:
-            qs = qs.filter(slots__start_time__date=raw_date)
+            movie_ids = slot_models.Slot.objects.filter(
+                start_time__gte=day_start, start_time__lt=day_end
+            ).values_list("movie_id", flat=True)
+            qs = qs.filter(
+                id__in=base_sharding.subquery_values(
+                    movie_ids, base_sharding.get_city_databases()
+                )
+            )
+
+        if self.request.query_params.get("ordering") == movie_constants.TrendingConstants.ORDERING:
+            city_id = self.request.query_params.get("city")
+            if not city_id or not city_id.isdigit():
+                raise rest_exceptions.ValidationError(
+                    {"city": movie_constants.ErrorMessages.TRENDING_CITY_REQUIRED}
+                )
+            # Read by the pagination, which then orders by the score.
+            self.trending = True
+            qs = movie_trending.annotate_scores(qs, int(city_id))
 
         return qs.prefetch_related("genres", "languages").distinct()
+
+    def get_object(self):
+        """
+        Returns the movie with its slots for the requested date, merged from
+        every database that holds slots of the requested city.
+        """
+        movie = super().get_object()
+        self.prefetch_slots(movie)
+        return movie
+
+    def prefetch_slots(self, movie):
+        base_sharding.prefetch_across_shards(
+            [movie],
+            "slots",
+            self.slots_queryset,
+            self.slot_databases,
+            key=operator.attrgetter("start_time"),
+        )
+
+
+class AsyncMovieViewSet(base_async_views.AsyncReadOnlyViewMixin, MovieViewSet):
+    """
+    Async version of MovieViewSet for the ASGI stack, with the same
+    endpoints and responses.
+
+    The slots of a retrieved movie are loaded concurrently with its genres
+    and languages, and the genres and languages of a page of movies
+    concurrently with each other.
+    """
+
+    def get_related_loaders(self, movie):
+        return [functools.partial(self.prefetch_slots, movie)]
@@ -1,5 +1,71 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers as admin_helpers
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 
+from apps.base import admin as base_admin
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.slot import constants as slot_constants
 from apps.slot import models as slot_models
 
-admin.site.register(slot_models.Slot)
+
+class SlotActionForm(admin_helpers.ActionForm):
+    """
+    Action form of the slot changelist, with the price the reprice action
+    sets.
+    """
+
+    price = forms.IntegerField(min_value=0, required=False)
+
+
+@admin.register(slot_models.Slot)
+class SlotAdmin(base_admin.LargeTableAdmin):
+    """
+    Admin configuration for Slot model.
+
+    The date hierarchy filters on start_time ranges, which PostgreSQL
+    answers from the monthly partitions and the start_time index.
+    """
+
+    list_display = ("id", "movie", "cinema", "language", "start_time", "price")
+    list_select_related = ("movie", "cinema__city", "language")
+    list_filter = ("language",)
+    date_hierarchy = "start_time"
+    autocomplete_fields = ("movie", "cinema", "language")
+    ordering = ("-start_time",)
+    action_form = SlotActionForm
+    actions = ["reprice_slots"]
+
+    @admin.action(description="Set the price of selected upcoming slots")
+    def reprice_slots(self, request, queryset):
+        """
+        Sets the price of the selected slots that have not started and have
+        no active bookings, in one UPDATE.
+
+        The revenue of a booking is counted at the price of its slot, in the
+        rollups and exports, and taken back at that price when the booking
+        is cancelled, so slots with active bookings keep their price.
+        """
+        form = self.action_form(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data["price"] is None:
+            self.message_user(request, slot_constants.ErrorMessages.PRICE_REQUIRED, messages.ERROR)
+            return
+
+        now = timezone.now()
+        booked = booking_models.Booking.objects.filter(
+            slot=OuterRef("pk"), status=booking_constants.BookingStatus.BOOKED
+        )
+        upcoming = queryset.filter(start_time__gt=now)
+        count = upcoming.filter(~Exists(booked)).update(
+            price=form.cleaned_data["price"], updated_at=now
+        )
+        self.message_user(request, f"Repriced {count} upcoming slots.", messages.SUCCESS)
+
+        skipped = upcoming.filter(Exists(booked)).count()
+        if skipped:
+            self.message_user(
+                request, f"Skipped {skipped} slots with active bookings.", messages.WARNING
+            )
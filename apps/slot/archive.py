@@ -0,0 +1,188 @@
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+
+from apps.slot import constants as slot_constants
+
+# Column names and types of every archived table, in file order. Catalog
+# names are copied next to their IDs so that reports do not depend on
+# catalog rows that may have changed or been deleted since.
+SCHEMAS = {
+    "slots": {
+        "id": "int",
+        "start_time": "datetime",
+        "end_time": "datetime",
+        "price": "int",
+        "movie_id": "int",
+        "movie_name": "str",
+        "cinema_id": "int",
+        "cinema_name": "str",
+        "city_id": "int",
+        "language_id": "int",
+        "language_name": "str",
+        "created_at": "datetime",
+    },
+    "bookings": {
+        "id": "int",
+        "slot_id": "int",
+        "user_id": "int",
+        "status": "str",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+    "booking_seats": {
+        "booking_id": "int",
+        "seat_id": "int",
+        "row_number": "int",
+        "seat_number": "int",
+    },
+}
+
+PARSERS = {
+    "int": int,
+    "str": str,
+    "datetime": datetime.datetime.fromisoformat,
+}
+
+
+def get_file_name(table):
+    return f"{table}.csv.gz"
+
+
+def _format(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+class ArchiveWriter:
+    """
+    Writes archived rows as one gzip-compressed CSV file per table, with a
+    typed header, plus a manifest with row counts and checksums.
+
+    Each table is a flat, fixed-schema file so that it can be bulk-loaded
+    into a columnar store as is.
+
+    Attributes:
+        directory (Path): Directory of this archive run; must not exist.
+        counts (dict): Rows written per table.
+    """
+
+    def __init__(self, directory, metadata):
+        self.directory = directory
+        self.metadata = metadata
+        self.counts = dict.fromkeys(SCHEMAS, 0)
+        self.directory.mkdir(parents=True)
+
+        self._raw_files = {}
+        self._text_files = {}
+        self._writers = {}
+        for table, schema in SCHEMAS.items():
+            raw_file = open(self.directory / get_file_name(table), "wb")
+            text_file = io.TextIOWrapper(
+                gzip.GzipFile(fileobj=raw_file, mode="wb"), encoding="utf-8", newline=""
+            )
+            self._raw_files[table] = raw_file
+            self._text_files[table] = text_file
+            self._writers[table] = csv.writer(text_file)
+            self._writers[table].writerow(schema)
+
+    def write(self, table, rows):
+        """
+        Appends rows, given as tuples in the column order of SCHEMAS.
+        """
+        writer = self._writers[table]
+        for row in rows:
+            writer.writerow([_format(value) for value in row])
+            self.counts[table] += 1
+
+    def flush(self):
+        """
+        Forces written rows to disk, so that they can safely be deleted from
+        the database.
+        """
+        for table, text_file in self._text_files.items():
+            text_file.flush()
+            self._raw_files[table].flush()
+            os.fsync(self._raw_files[table].fileno())
+
+    def close(self):
+        """
+        Closes the files and writes the manifest.
+        """
+        for table, text_file in self._text_files.items():
+            text_file.close()
+            self._raw_files[table].close()
+
+        manifest = {
+            **self.metadata,
+            "format_version": slot_constants.ArchiveConstants.FORMAT_VERSION,
+            "tables": {
+                table: {
+                    "file": get_file_name(table),
+                    "rows": self.counts[table],
+                    "sha256": get_checksum(self.directory / get_file_name(table)),
+                    "columns": schema,
+                }
+                for table, schema in SCHEMAS.items()
+            },
+        }
+        with open(self.directory / slot_constants.ArchiveConstants.MANIFEST, "w") as file:
+            json.dump(manifest, file, indent=2)
+
+
+def get_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(directory):
+    with open(directory / slot_constants.ArchiveConstants.MANIFEST) as file:
+        return json.load(file)
+
+
+def read_table(directory, table):
+    """
+    Yields the rows of an archived table as dictionaries with typed values.
+    """
+    columns = read_manifest(directory)["tables"][table]["columns"]
+    parsers = [(name, PARSERS[kind]) for name, kind in columns.items()]
+
+    with gzip.open(directory / get_file_name(table), "rt", encoding="utf-8", newline="") as file:
+        reader = csv.reader(file)
+        next(reader)
+        for values in reader:
+            yield {
+                name: parser(value) if value != "" else None
+                for (name, parser), value in zip(parsers, values)
+            }
+
+
+def verify(directory):
+    """
+    Checks the files of an archive against its manifest and returns a list
+    of problems, empty when the archive is intact.
+    """
+    problems = []
+    for table, details in read_manifest(directory)["tables"].items():
+        path = directory / details["file"]
+        if not path.exists():
+            problems.append(f"{details['file']} is missing")
+            continue
+        if get_checksum(path) != details["sha256"]:
+            problems.append(f"{details['file']} does not match its checksum")
+            continue
+
+        rows = sum(1 for _ in read_table(directory, table))
+        if rows != details["rows"]:
+            problems.append(f"{details['file']} has {rows} rows, expected {details['rows']}")
+    return problems
@@ -9,3 +9,27 @@ class ErrorMessages:
     INVALID_LANGUAGE = "The selected language is not supported for this specific movie."
     PAST_START_TIME = "Showtimes cannot be scheduled in the past."
     INVALID_TIME = "The end time of the movie must be greater than start time"
+    PRICE_REQUIRED = "Enter the new price of the selected slots."
+
+
+class PartitionConstants:
+    """
+    Constants for the monthly range partitions of the slot table.
+    """
+
+    TABLE = "slot_slot"
+    PARTITION_KEY = "start_time"
+    DEFAULT_PARTITION = "slot_slot_default"
+    # Monthly partitions kept ready beyond the current month.
+    MONTHS_AHEAD = 3
+
+
+class ArchiveConstants:
+    """
+    Constants for the archive of finished shows.
+    """
+
+    FORMAT_VERSION = 1
+    MANIFEST = "manifest.json"
+    # Slots archived and deleted per transaction; keeps row locks short.
+    BATCH_SIZE = 500
@@ -0,0 +1,212 @@
+import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections as db_connections
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from apps.base import constants as base_constants
+from apps.base import models as base_models
+from apps.base import sharding as base_sharding
+from apps.booking import models as booking_models
+from apps.cinema import models as cinema_models
+from apps.movie import models as movie_models
+from apps.slot import archive as slot_archive
+from apps.slot import constants as slot_constants
+from apps.slot import models as slot_models
+from apps.slot import partitions as slot_partitions
+
+
+class Command(BaseCommand):
+    """
+    Moves slots that ended more than ``--retention-days`` ago, with their
+    bookings and booked seats, from every database to compressed files and
+    deletes them.
+
+    Slots are processed in primary-key batches: each batch is written and
+    synced to disk before it is deleted in its own short transaction, so an
+    interrupted run never loses rows and never holds locks for long. Each
+    run writes a new archive under ``<output-dir>/<database>/<timestamp>/``;
+    read it back with the read_show_archive command. Monthly slot partitions
+    left empty are dropped afterwards.
+
+    Usage:
+        python manage.py archive_finished_shows
+        python manage.py archive_finished_shows --retention-days 90 --database shard_1
+        python manage.py archive_finished_shows --dry-run
+    """
+
+    help = "Archives finished shows and their bookings to compressed files and deletes them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days", type=int, default=settings.SHOW_ARCHIVE_RETENTION_DAYS
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=slot_constants.ArchiveConstants.BATCH_SIZE
+        )
+        parser.add_argument("--database", help="Only this database alias.")
+        parser.add_argument("--output-dir", type=Path, default=settings.SHOW_ARCHIVE_DIR)
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows.")
+
+    def handle(self, *args, **options):
+        databases = base_sharding.get_databases()
+        if options["database"]:
+            if options["database"] not in databases:
+                raise CommandError(
+                    base_constants.ErrorMessages.UNKNOWN_SHARD.format(alias=options["database"])
+                )
+            databases = [options["database"]]
+
+        cutoff = timezone.now() - datetime.timedelta(days=options["retention_days"])
+        self.catalog = {"movies": {}, "cinemas": {}, "languages": {}}
+
+        for alias in databases:
+            slots = slot_models.Slot.objects.using(alias).filter(end_time__lt=cutoff)
+            if options["dry_run"]:
+                bookings = booking_models.Booking.objects.using(alias).filter(
+                    slot_id__in=slots.values("id")
+                )
+                self.stdout.write(
+                    f"{alias}: {slots.count()} slots and {bookings.count()} bookings to archive."
+                )
+                continue
+
+            if slots.exists():
+                self.archive(alias, slots, cutoff, options)
+            else:
+                self.stdout.write(f"{alias}: no finished shows to archive.")
+
+            dropped = slot_partitions.drop_empty_partitions(db_connections[alias], cutoff)
+            if dropped:
+                self.stdout.write(f"{alias}: dropped empty partitions {', '.join(dropped)}.")
+
+    def archive(self, alias, slots, cutoff, options):
+        directory = options["output_dir"] / alias / timezone.now().strftime("%Y%m%dT%H%M%S")
+        writer = slot_archive.ArchiveWriter(
+            directory,
+            {
+                "database": alias,
+                "cutoff": cutoff.isoformat(),
+                "created_at": timezone.now().isoformat(),
+            },
+        )
+
+        try:
+            last_id = 0
+            while True:
+                batch = list(
+                    slots.filter(id__gt=last_id)
+                    .order_by("id")
+                    .values_list(
+                        "id",
+                        "start_time",
+                        "end_time",
+                        "price",
+                        "movie_id",
+                        "cinema_id",
+                        "language_id",
+                        "created_at",
+                    )[: options["batch_size"]]
+                )
+                if not batch:
+                    break
+
+                self.archive_batch(alias, writer, batch)
+                last_id = batch[-1][0]
+        finally:
+            writer.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{alias}: archived {writer.counts['slots']} slots, "
+                f"{writer.counts['bookings']} bookings and "
+                f"{writer.counts['booking_seats']} booked seats to {directory}."
+            )
+        )
+
+    def archive_batch(self, alias, writer, batch):
+        """
+        Writes a batch of slots with their bookings and booked seats, syncs
+        the files and deletes the rows, booked seats first.
+        """
+        slot_ids = [row[0] for row in batch]
+        bookings = list(
+            booking_models.Booking.objects.using(alias)
+            .filter(slot_id__in=slot_ids)
+            .order_by("id")
+            .values_list("id", "slot_id", "user_id", "status", "created_at", "updated_at")
+        )
+        booking_ids = [row[0] for row in bookings]
+        through = booking_models.Booking.seats.through
+        booking_seats = through.objects.using(alias).filter(booking_id__in=booking_ids)
+
+        movies, cinemas, languages = self.get_catalog(batch)
+        writer.write(
+            "slots",
+            (
+                (
+                    slot_id,
+                    start_time,
+                    end_time,
+                    price,
+                    movie_id,
+                    movies.get(movie_id),
+                    cinema_id,
+                    *cinemas.get(cinema_id, (None, None)),
+                    language_id,
+                    languages.get(language_id),
+                    created_at,
+                )
+                for (
+                    slot_id,
+                    start_time,
+                    end_time,
+                    price,
+                    movie_id,
+                    cinema_id,
+                    language_id,
+                    created_at,
+                ) in batch
+            ),
+        )
+        writer.write("bookings", bookings)
+        writer.write(
+            "booking_seats",
+            booking_seats.order_by("booking_id", "seat_id").values_list(
+                "booking_id", "seat_id", "seat__row_number", "seat__seat_number"
+            ),
+        )
+        writer.flush()
+
+        with db_transaction.atomic(using=alias):
+            booking_seats.delete()
+            booking_models.Booking.objects.using(alias).filter(id__in=booking_ids).delete()
+            slot_models.Slot.objects.using(alias).filter(id__in=slot_ids).delete()
+        base_sharding.invalidate_slots(slot_ids)
+
+    def get_catalog(self, batch):
+        """
+        Returns the movie names, cinema names and cities, and language names
+        referenced by ``batch``, loading the ones not seen yet in bulk from
+        the shared catalog.
+        """
+        sources = [
+            ("movies", 4, movie_models.Movie.objects, lambda movie: movie.name),
+            (
+                "cinemas",
+                5,
+                cinema_models.Cinema.objects,
+                lambda cinema: (cinema.name, cinema.city_id),
+            ),
+            ("languages", 6, base_models.Language.objects, lambda language: language.name),
+        ]
+        for key, index, manager, get_value in sources:
+            known = self.catalog[key]
+            missing = {row[index] for row in batch} - known.keys()
+            if missing:
+                objects = manager.using(base_sharding.PRIMARY_ALIAS).in_bulk(missing)
+                known.update((pk, get_value(instance)) for pk, instance in objects.items())
+        return self.catalog["movies"], self.catalog["cinemas"], self.catalog["languages"]
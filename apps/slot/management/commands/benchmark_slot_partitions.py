@@ -0,0 +1,179 @@
+import json
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections as db_connections
+from django.utils import timezone
+
+from apps.base import benchmarks as base_benchmarks
+from apps.base import utils as base_utils
+from apps.slot import partitions as slot_partitions
+
+FLAT_TABLE = f"{slot_partitions.TABLE}_benchmark_flat"
+GENERATE_BATCH_SIZE = 1_000_000
+
+# Queries issued by the cinema and movie endpoints, plus the former
+# ``start_time__date`` filter for comparison. {table} is substituted with the
+# partitioned or the unpartitioned copy of the slot table.
+QUERIES = [
+    (
+        "cinema detail slots",
+        "SELECT * FROM {table} WHERE cinema_id = %(cinema)s AND start_time > %(now)s "
+        "AND start_time >= %(day_start)s AND start_time < %(day_end)s ORDER BY start_time",
+    ),
+    (
+        "movie detail slots",
+        "SELECT * FROM {table} WHERE movie_id = %(movie)s AND start_time > %(now)s "
+        "AND start_time >= %(day_start)s AND start_time < %(day_end)s ORDER BY start_time",
+    ),
+    (
+        "movie list date filter",
+        "SELECT DISTINCT movie_id FROM {table} "
+        "WHERE start_time >= %(day_start)s AND start_time < %(day_end)s",
+    ),
+    (
+        "movie list date filter (__date)",
+        "SELECT DISTINCT movie_id FROM {table} "
+        "WHERE (start_time AT TIME ZONE %(time_zone)s)::date = %(day)s",
+    ),
+]
+
+
+class Command(BaseCommand):
+    """
+    Measures planning and execution time of the showtime queries on the
+    partitioned slot table and on an unpartitioned copy of it.
+
+    ``--generate`` first fills the table with synthetic past slots spread
+    over ``--years``, e.g. 50 million to model years of history. Only run it
+    against a disposable database.
+
+    Usage:
+        python manage.py benchmark_slot_partitions --generate 50000000
+        python manage.py benchmark_slot_partitions --runs 10 --no-compare
+    """
+
+    help = "Benchmarks showtime queries on the partitioned and an unpartitioned slot table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--generate", type=int, default=0)
+        parser.add_argument("--years", type=int, default=5)
+        parser.add_argument("--cinemas", type=int, default=500)
+        parser.add_argument("--movies", type=int, default=2000)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--no-compare", action="store_true")
+        parser.add_argument("--keep", action="store_true", help="Keep the unpartitioned copy.")
+
+    def handle(self, *args, **options):
+        connection = db_connections[options["database"]]
+        if not slot_partitions.is_partitioned(connection):
+            raise CommandError("The slot table is not partitioned on this database.")
+
+        if options["generate"]:
+            self.generate(connection, options)
+
+        tables = [("partitioned", slot_partitions.TABLE)]
+        if not options["no_compare"]:
+            self.create_flat_copy(connection)
+            tables.append(("unpartitioned", FLAT_TABLE))
+
+        now = timezone.now()
+        day_start, day_end = base_utils.get_day_bounds(timezone.localdate())
+        params = {
+            "cinema": 1,
+            "movie": 1,
+            "now": now,
+            "day_start": day_start,
+            "day_end": day_end,
+            "day": timezone.localdate(),
+            "time_zone": timezone.get_current_timezone_name(),
+        }
+
+        rows = []
+        try:
+            for label, sql in QUERIES:
+                for layout, table in tables:
+                    rows.append(
+                        self.measure(connection, f"{label}, {layout}", sql, table, params, options)
+                    )
+        finally:
+            if len(tables) > 1 and not options["keep"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}")
+
+        self.stdout.write(base_benchmarks.format_table(rows))
+
+    def generate(self, connection, options):
+        """
+        Inserts synthetic slots in the past, one every few minutes per cinema,
+        in batches of GENERATE_BATCH_SIZE rows.
+        """
+        total = options["generate"]
+        cinemas = options["cinemas"]
+        per_cinema = -(-total // cinemas)
+        step_seconds = max(1, options["years"] * 365 * 24 * 3600 // per_cinema)
+
+        with connection.cursor() as cursor:
+            for first in range(0, total, GENERATE_BATCH_SIZE):
+                last = min(total, first + GENERATE_BATCH_SIZE) - 1
+                cursor.execute(
+                    f"INSERT INTO {slot_partitions.TABLE} (created_at, updated_at, price, "
+                    "start_time, end_time, movie_id, cinema_id, language_id) "
+                    "SELECT now(), now(), 200, show_time, show_time + interval '3 hours', "
+                    "1 + g %% %(movies)s, 1 + g %% %(cinemas)s, 1 "
+                    "FROM generate_series(%(first)s, %(last)s) AS g, "
+                    "LATERAL (SELECT date_trunc('minute', now()) "
+                    "- make_interval(secs => (g / %(cinemas)s + 1) * %(step)s) AS show_time) AS s "
+                    "ON CONFLICT DO NOTHING",
+                    {
+                        "movies": options["movies"],
+                        "cinemas": cinemas,
+                        "first": first,
+                        "last": last,
+                        "step": step_seconds,
+                    },
+                )
+                self.stdout.write(f"Generated {last + 1} of {total} slots")
+            cursor.execute(f"ANALYZE {slot_partitions.TABLE}")
+
+    def create_flat_copy(self, connection):
+        self.stdout.write("Creating an unpartitioned copy of the slot table")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}")
+            cursor.execute(f"CREATE TABLE {FLAT_TABLE} AS TABLE {slot_partitions.TABLE}")
+            cursor.execute(f"ALTER TABLE {FLAT_TABLE} ADD PRIMARY KEY (id)")
+            cursor.execute(f"CREATE UNIQUE INDEX ON {FLAT_TABLE} (cinema_id, start_time)")
+            cursor.execute(f"CREATE INDEX ON {FLAT_TABLE} (movie_id)")
+            cursor.execute(f"CREATE INDEX ON {FLAT_TABLE} (language_id)")
+            cursor.execute(f"ANALYZE {FLAT_TABLE}")
+
+    def measure(self, connection, label, sql, table, params, options):
+        """
+        Runs EXPLAIN ANALYZE ``runs`` times and returns the median planning
+        and execution times with the number of tables the plan touched.
+        """
+        planning, execution = [], []
+        with connection.cursor() as cursor:
+            for _ in range(options["runs"]):
+                cursor.execute(
+                    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql.format(table=table), params
+                )
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                planning.append(plan[0]["Planning Time"])
+                execution.append(plan[0]["Execution Time"])
+
+        return {
+            "query": label,
+            "relations": len(self.get_relations(plan[0]["Plan"])),
+            "planning_ms": round(statistics.median(planning), 3),
+            "execution_ms": round(statistics.median(execution), 3),
+        }
+
+    def get_relations(self, node):
+        relations = {node["Relation Name"]} if "Relation Name" in node else set()
+        for child in node.get("Plans", []):
+            relations |= self.get_relations(child)
+        return relations
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections as db_connections
+
+from apps.slot import constants as slot_constants
+from apps.slot import partitions as slot_partitions
+
+
+class Command(BaseCommand):
+    """
+    Creates the monthly slot partitions that do not exist yet, from the
+    current month to ``--months-ahead`` months ahead, on every writable
+    database.
+
+    Meant to run daily from cron so that slots scheduled ahead of time never
+    land in the default partition.
+
+    Usage:
+        python manage.py create_slot_partitions
+        python manage.py create_slot_partitions --months-ahead 6 --database shard_1
+    """
+
+    help = "Creates upcoming monthly partitions of the slot table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=slot_constants.PartitionConstants.MONTHS_AHEAD,
+        )
+        parser.add_argument("--database", help="Only this database alias.")
+
+    def handle(self, *args, **options):
+        aliases = (
+            [options["database"]]
+            if options["database"]
+            else [alias for alias in db_connections if alias not in settings.READ_REPLICAS]
+        )
+
+        for alias in aliases:
+            connection = db_connections[alias]
+            if not slot_partitions.is_partitioned(connection):
+                self.stdout.write(f"{alias}: slot table is not partitioned, skipped.")
+                continue
+
+            created = slot_partitions.ensure_partitions(connection, options["months_ahead"])
+            self.stdout.write(f"{alias}: created {', '.join(created) or 'no partitions'}.")
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.slot import archive as slot_archive
+from apps.slot import constants as slot_constants
+
+
+class Command(BaseCommand):
+    """
+    Reads an archive written by archive_finished_shows and prints its rows
+    as JSON lines, optionally only those whose fields match ``--where``.
+
+    ``--verify`` checks the files against the checksums and row counts of
+    the manifest instead.
+
+    Usage:
+        python manage.py read_show_archive archive/default/20250101T020000 --verify
+        python manage.py read_show_archive archive/default/20250101T020000 --table bookings
+        python manage.py read_show_archive archive/shard_1/20250101T020000 --where cinema_id=4
+    """
+
+    help = "Prints or verifies an archive of finished shows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="Directory of one archive run.")
+        parser.add_argument("--table", choices=slot_archive.SCHEMAS, default="slots")
+        parser.add_argument(
+            "--where",
+            action="append",
+            default=[],
+            metavar="FIELD=VALUE",
+            help="Only rows whose field equals the value; may be repeated.",
+        )
+        parser.add_argument("--verify", action="store_true")
+
+    def handle(self, *args, **options):
+        directory = options["path"]
+        if not (directory / slot_constants.ArchiveConstants.MANIFEST).exists():
+            raise CommandError(f"{directory} is not a show archive.")
+
+        if options["verify"]:
+            problems = slot_archive.verify(directory)
+            for problem in problems:
+                self.stderr.write(problem)
+            if problems:
+                raise CommandError("The archive is damaged.")
+            self.stdout.write(self.style.SUCCESS(f"{directory} is intact."))
+            return
+
+        table = options["table"]
+        conditions = self.get_conditions(table, options["where"])
+        for row in slot_archive.read_table(directory, table):
+            if all(row[field] == value for field, value in conditions):
+                self.stdout.write(json.dumps(row, default=str))
+
+    def get_conditions(self, table, expressions):
+        """
+        Parses FIELD=VALUE expressions into (field, typed value) pairs.
+        """
+        columns = slot_archive.SCHEMAS[table]
+        conditions = []
+        for expression in expressions:
+            field, separator, value = expression.partition("=")
+            if not separator or field not in columns:
+                raise CommandError(
+                    f"Invalid condition '{expression}'; fields of {table}: {', '.join(columns)}."
+                )
+            conditions.append((field, slot_archive.PARSERS[columns[field]](value)))
+        return conditions
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_city_shard'),
+        ('cinema', '0004_alter_seat_cinema'),
+        ('movie', '0004_alter_movie_options_alter_movie_duration_and_more'),
+        ('slot', '0004_remove_booking_slot_remove_booking_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='slot',
+            name='cinema',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='cinema.cinema'),
+        ),
+        migrations.AlterField(
+            model_name='slot',
+            name='language',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='base.language'),
+        ),
+        migrations.AlterField(
+            model_name='slot',
+            name='movie',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='movie.movie'),
+        ),
+    ]
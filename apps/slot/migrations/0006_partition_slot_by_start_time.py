@@ -0,0 +1,121 @@
+from django.db import migrations
+from django.utils import timezone
+
+from apps.slot import constants as slot_constants
+from apps.slot import partitions as slot_partitions
+
+TABLE = slot_partitions.TABLE
+DEFAULT_PARTITION = slot_partitions.DEFAULT_PARTITION
+MONTHS_AHEAD = slot_constants.PartitionConstants.MONTHS_AHEAD
+
+INDEX_SQL = [
+    f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, start_time)",
+    f"ALTER TABLE {TABLE} ADD CONSTRAINT unique_slot_per_cinema_time "
+    "UNIQUE (cinema_id, start_time)",
+    f"CREATE INDEX {TABLE}_language_id_idx ON {TABLE} (language_id)",
+    f"CREATE INDEX {TABLE}_movie_id_start_time_idx ON {TABLE} (movie_id, start_time)",
+]
+
+
+def get_sequence_state(cursor, table):
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    sequence = cursor.fetchone()[0]
+    cursor.execute(f"SELECT last_value, is_called FROM {sequence}")
+    return cursor.fetchone()
+
+
+def partition_slot_table(apps, schema_editor):
+    """
+    Rebuilds slot_slot as a table range-partitioned by start_time, with one
+    partition per month from the oldest slot to MONTHS_AHEAD months ahead
+    and a default partition for anything outside those months.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes (id, start_time); IDs remain unique through the
+    sequence.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(start_time) FROM {TABLE}")
+        oldest = cursor.fetchone()[0] or timezone.now()
+        last_value, is_called = get_sequence_state(cursor, TABLE)
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (start_time)"
+        )
+        # A serial id's default would tie the new table to the old table's
+        # sequence; the table gets its own below.
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT")
+
+        month = slot_partitions.get_month_start(oldest)
+        last_month = slot_partitions.add_months(
+            slot_partitions.get_month_start(timezone.now()), MONTHS_AHEAD
+        )
+        while month <= last_month:
+            slot_partitions.create_partition(cursor, month, has_default=False)
+            month = slot_partitions.add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned")
+        cursor.execute(f"DROP TABLE {TABLE}_unpartitioned")
+
+        cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+        cursor.execute(f"SELECT setval('{TABLE}_id_seq', %s, %s)", [last_value, is_called])
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')"
+        )
+        for sql in INDEX_SQL:
+            cursor.execute(sql)
+
+
+def unpartition_slot_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        last_value, is_called = get_sequence_state(cursor, TABLE)
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+        cursor.execute(f"ALTER TABLE {TABLE}_partitioned DROP CONSTRAINT {TABLE}_pkey")
+        cursor.execute(
+            f"ALTER TABLE {TABLE}_partitioned DROP CONSTRAINT unique_slot_per_cinema_time"
+        )
+        cursor.execute(f"DROP INDEX {TABLE}_language_id_idx, {TABLE}_movie_id_start_time_idx")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned")
+        # Drops the sequence too, which the partitioned table owns.
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned")
+
+        # Back to an identity column, as Django creates it.
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+            [TABLE, last_value, is_called],
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT unique_slot_per_cinema_time "
+            "UNIQUE (cinema_id, start_time)"
+        )
+        for column in ("cinema_id", "language_id", "movie_id"):
+            cursor.execute(f"CREATE INDEX {TABLE}_{column}_idx ON {TABLE} ({column})")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_alter_booking_slot'),
+        ('slot', '0005_alter_slot_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_slot_table, unpartition_slot_table),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_city_shard'),
+        ('cinema', '0006_seatheatmap'),
+        ('movie', '0008_similarmovie'),
+        ('slot', '0006_partition_slot_by_start_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['start_time'], name='slot_start_time_idx'),
+        ),
+    ]
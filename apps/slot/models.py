@@ -1,17 +1,25 @@
 from django.core.exceptions import ValidationError
+from django.db import connections as db_connections
 from django.db import models as db_models
+from django.dispatch import receiver
 from django.utils import timezone
 
 from apps.base import models as base_models
+from apps.base import sharding as base_sharding
 from apps.cinema import models as cinema_models
 from apps.movie import models as movie_models
 from apps.slot import constants as slot_constants
+from apps.slot import partitions as slot_partitions
 
 
 class Slot(base_models.TimeStampedModel):
     """
     Represents a specific movie screening time in a cinema hall.
 
+    On PostgreSQL the table is range-partitioned by month of start_time;
+    filter on start_time ranges so that queries only scan the relevant
+    partitions.
+
     Attributes:
         price (int): The ticket price for this specific show.
         start_time (datetime): The date and time when the movie starts.
@@ -24,20 +32,30 @@ class Slot(base_models.TimeStampedModel):
     price = db_models.PositiveIntegerField()
     start_time = db_models.DateTimeField()
     end_time = db_models.DateTimeField()
+    # Slots can live on a city shard while movies, cinemas and languages are
+    # shared, so these references are only enforced on the default database
+    # (see migration 0008), not on shards.
     movie = db_models.ForeignKey(
-        movie_models.Movie, on_delete=db_models.CASCADE, related_name="slots"
+        movie_models.Movie,
+        on_delete=db_models.CASCADE,
+        related_name="slots",
+        db_constraint=False,
     )
     cinema = db_models.ForeignKey(
         cinema_models.Cinema,
         on_delete=db_models.CASCADE,
         related_name="slots",
+        db_constraint=False,
     )
     language = db_models.ForeignKey(
         base_models.Language,
         on_delete=db_models.CASCADE,
         related_name="slots",
+        db_constraint=False,
     )
 
+    objects = base_sharding.ShardedQuerySet.as_manager()
+
     class Meta:
         # Unique constraint for the slot
         constraints = [
@@ -46,6 +64,9 @@ class Slot(base_models.TimeStampedModel):
                 name="unique_slot_per_cinema_time",
             ),
         ]
+        # Start time ranges across cinemas, such as the date hierarchy of the
+        # admin; on PostgreSQL, created on every monthly partition.
+        indexes = [db_models.Index(fields=["start_time"], name="slot_start_time_idx")]
 
     def __str__(self):
         return f"{self.movie.name} at {self.cinema.name} in {self.language}"
@@ -76,12 +97,49 @@ class Slot(base_models.TimeStampedModel):
             raise ValidationError(slot_constants.ErrorMessages.PAST_START_TIME)
 
         # 6. Prevent overlapping slots in the same cinema
-        overlapping_slots = Slot.objects.exclude(pk=self.pk).filter(
-            cinema=self.cinema,
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time,
+        overlapping_slots = (
+            Slot.objects.db_manager(hints={"cinema_id": self.cinema_id})
+            .exclude(pk=self.pk)
+            .filter(
+                cinema=self.cinema,
+                start_time__lt=self.end_time,
+                end_time__gt=self.start_time,
+            )
         )
         if overlapping_slots.exists():
             raise ValidationError(slot_constants.ErrorMessages.OVERLAPPING_SCHEDULE)
 
         super().clean()
+
+
+@receiver(db_models.signals.pre_delete, sender=cinema_models.Cinema)
+def delete_sharded_cinema_slots(sender, instance, **kwargs):
+    """
+    Deletes the slots, and with them the bookings, of a cinema whose city is
+    on a shard, which the cascade from the default database cannot reach.
+
+    Args:
+        sender (Model): The model class (Cinema).
+        instance (Cinema): The cinema being deleted.
+    """
+    if not base_sharding.is_enabled():
+        return
+
+    database = base_sharding.shard_for_city(instance.city_id)
+    if database != base_sharding.PRIMARY_ALIAS:
+        Slot.objects.using(database).filter(cinema_id=instance.pk).delete()
+
+
+@receiver(db_models.signals.post_migrate)
+def create_future_slot_partitions(sender, app_config, using, **kwargs):
+    """
+    Keeps monthly slot partitions ready ahead of time whenever the database
+    is migrated. Run the create_slot_partitions command periodically as well.
+
+    Args:
+        sender (AppConfig): The migrated app.
+        app_config (AppConfig): The migrated app.
+        using (str): Alias of the migrated database.
+    """
+    if app_config.label == "slot":
+        slot_partitions.ensure_partitions(db_connections[using])
@@ -0,0 +1,140 @@
+import datetime
+import logging
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from apps.slot import constants as slot_constants
+
+logger = logging.getLogger(__name__)
+
+TABLE = slot_constants.PartitionConstants.TABLE
+DEFAULT_PARTITION = slot_constants.PartitionConstants.DEFAULT_PARTITION
+
+
+def get_month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def get_partition_bounds(month):
+    """
+    Returns the UTC timestamps bounding the partition of ``month``.
+    """
+    return (
+        f"{month:%Y-%m-%d} 00:00:00+00",
+        f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00",
+    )
+
+
+def is_partitioned(connection):
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partitions(connection):
+    """
+    Returns the names of the partitions attached to the slot table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(cursor, month, has_default=True):
+    """
+    Creates and attaches the partition of ``month``.
+
+    Rows of that month which landed in the default partition are moved into
+    the new partition first, as PostgreSQL refuses to attach a partition
+    whose range overlaps rows of the default partition.
+    """
+    name = get_partition_name(month)
+    lower, upper = get_partition_bounds(month)
+
+    cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    if has_default:
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE start_time >= %s AND start_time < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [lower, upper],
+        )
+    cursor.execute(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+        [lower, upper],
+    )
+
+
+def ensure_partitions(connection, months_ahead=slot_constants.PartitionConstants.MONTHS_AHEAD):
+    """
+    Creates the monthly partitions from the current month to
+    ``months_ahead`` months ahead that do not exist yet, and returns their
+    names. Does nothing unless the slot table is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+
+    existing = get_partitions(connection)
+    current = get_month_start(timezone.now())
+    created = []
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if get_partition_name(month) in existing:
+            continue
+
+        with db_transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            create_partition(cursor, month, has_default=DEFAULT_PARTITION in existing)
+        created.append(get_partition_name(month))
+
+    if created:
+        logger.info("Created slot partitions on %s: %s", connection.alias, ", ".join(created))
+    return created
+
+
+def drop_empty_partitions(connection, before):
+    """
+    Detaches and drops the monthly partitions that end on or before the
+    month of ``before`` and hold no rows, and returns their names. Does
+    nothing unless the slot table is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+
+    last_month = add_months(get_month_start(before), -1)
+    dropped = []
+    for name in sorted(get_partitions(connection)):
+        if name == DEFAULT_PARTITION or name > get_partition_name(last_month):
+            continue
+
+        with db_transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {name} LIMIT 1")
+            if cursor.fetchone() is not None:
+                continue
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        dropped.append(name)
+
+    if dropped:
+        logger.info("Dropped slot partitions on %s: %s", connection.alias, ", ".join(dropped))
+    return dropped
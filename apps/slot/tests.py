@@ -1,3 +1,197 @@
-from django.test import TestCase
+import datetime
+import unittest
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.base import models as base_models
+from apps.booking import constants as booking_constants
+from apps.booking import models as booking_models
+from apps.cinema import models as cinema_models
+from apps.movie import models as movie_models
+from apps.movie import trending as movie_trending
+from apps.slot import models as slot_models
+from apps.slot import partitions as slot_partitions
+from apps.user import models as user_models
+
+
+class RepriceSlotsTests(TestCase):
+    """
+    The reprice action of the slot admin, and the revenue of the bookings of
+    the slots it reprices.
+    """
+
+    def setUp(self):
+        cache.clear()
+        city = base_models.City.objects.create(name="mumbai")
+        self.language = base_models.Language.objects.create(name="english")
+        self.movie = movie_models.Movie.objects.create(
+            name="movie",
+            description="description",
+            duration=datetime.timedelta(hours=2),
+            release_date=datetime.date(2020, 1, 1),
+            poster="poster.jpg",
+        )
+        self.cinema = cinema_models.Cinema.objects.create(
+            name="cinema", city=city, address="address", rows=2, seats_per_row=3, image="c.jpg"
+        )
+        self.user = user_models.User.objects.create_user(email="user@example.com", password="x")
+        self.admin = admin.site._registry[slot_models.Slot]
+        # Bookings are counted for trending; keep them from being flushed
+        # once the test database is gone.
+        self.addCleanup(movie_trending.trending_counters.pending.clear)
+
+    def create_slot(self):
+        start = timezone.now() + datetime.timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            return slot_models.Slot.objects.create(
+                price=100,
+                start_time=start,
+                end_time=start + datetime.timedelta(hours=2),
+                movie=self.movie,
+                cinema=self.cinema,
+                language=self.language,
+            )
+
+    def book(self, slot, seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = booking_models.Booking.objects.create(user=self.user, slot=slot)
+            booking.seats.add(*self.cinema.seats.all()[:seats])
+        return booking
+
+    def reprice(self, price):
+        request = RequestFactory().post("/", {"action": "reprice_slots", "price": price})
+        request.user = user_models.User.objects.create_superuser(
+            email="admin@example.com", password="x"
+        )
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        self.admin.reprice_slots(request, slot_models.Slot.objects.all())
+        return [str(message) for message in request._messages]
+
+    def get_revenue(self):
+        return booking_models.BookingRollup.objects.get(
+            dimension=booking_constants.RollupDimension.CINEMA, object_id=self.cinema.pk
+        ).revenue
+
+    def test_slots_without_active_bookings_are_repriced(self):
+        slot = self.create_slot()
+        cancelled = self.book(slot, seats=1)
+        cancelled.status = booking_constants.BookingStatus.CANCELLED
+        cancelled.save()
+
+        self.assertEqual(self.reprice(150), ["Repriced 1 upcoming slots."])
+
+        slot.refresh_from_db()
+        self.assertEqual(slot.price, 150)
+
+    def test_cancelling_after_a_reprice_takes_back_the_booked_revenue(self):
+        slot = self.create_slot()
+        booking = self.book(slot, seats=2)
+        self.assertEqual(self.get_revenue(), 200)
+
+        messages = self.reprice(50)
+
+        self.assertEqual(
+            messages,
+            ["Repriced 0 upcoming slots.", "Skipped 1 slots with active bookings."],
+        )
+        slot.refresh_from_db()
+        self.assertEqual(slot.price, 100)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = booking_constants.BookingStatus.CANCELLED
+            booking.save()
+        self.assertEqual(self.get_revenue(), 0)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "The slot table is partitioned on PostgreSQL."
+)
+class PartitionSlotTableMigrationTests(TransactionTestCase):
+    """
+    The migration partitioning the slot table, applied to existing slots and
+    reversed.
+    """
+
+    unpartitioned = [("slot", "0005_alter_slot_foreign_keys")]
+    partitioned = [("slot", "0006_partition_slot_by_start_time")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps.get_model("slot", "Slot")
+
+    def tearDown(self):
+        # The slots of the test reference no movies, cinemas or languages,
+        # which the latest migrations enforce.
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM slot_slot")
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def create_slot(self, model, start, cinema_id=1):
+        return model.objects.create(
+            price=100,
+            start_time=start,
+            end_time=start + datetime.timedelta(hours=2),
+            cinema_id=cinema_id,
+            movie_id=1,
+            language_id=1,
+        )
+
+    def get_rows(self, model):
+        return set(model.objects.values_list("id", "start_time", "cinema_id"))
+
+    def get_primary_key(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = 'slot_slot'::regclass AND contype = 'p'"
+            )
+            return cursor.fetchone()[0]
+
+    def assert_constraints(self, model, slot):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            model.objects.create(
+                id=slot.id,
+                price=100,
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                cinema_id=slot.cinema_id + 1,
+                movie_id=1,
+                language_id=1,
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_slot(model, slot.start_time, cinema_id=slot.cinema_id)
+
+    def test_slots_are_kept_when_partitioning_and_reversing(self):
+        model = self.migrate(self.unpartitioned)
+        now = timezone.now()
+        for days in (-400, -35, 0, 1, 200):
+            self.create_slot(model, now + datetime.timedelta(days=days))
+        rows = self.get_rows(model)
+        last_id = max(row[0] for row in rows)
+
+        model = self.migrate(self.partitioned)
+        self.assertTrue(slot_partitions.is_partitioned(connection))
+        self.assertEqual(self.get_rows(model), rows)
+        self.assertEqual(self.get_primary_key(), "PRIMARY KEY (id, start_time)")
+        slot = self.create_slot(model, now + datetime.timedelta(days=2))
+        self.assertEqual(slot.id, last_id + 1)
+        self.assert_constraints(model, slot)
+        rows = self.get_rows(model)
+
+        model = self.migrate(self.unpartitioned)
+        self.assertFalse(slot_partitions.is_partitioned(connection))
+        self.assertEqual(self.get_rows(model), rows)
+        self.assertEqual(self.get_primary_key(), "PRIMARY KEY (id)")
+        slot = self.create_slot(model, now + datetime.timedelta(days=3))
+        # The failed inserts above used up IDs too.
+        self.assertGreater(slot.id, max(row[0] for row in rows))
+        self.assert_constraints(model, slot)
@@ -0,0 +1,148 @@
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router as db_router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication as jwt_authentication
+from rest_framework_simplejwt import exceptions as jwt_exceptions
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.user import constants as user_constants
+
+
+def get_cache_key(user_id):
+    return f"{user_constants.AuthenticationConstants.USER_CACHE_PREFIX}{user_id}"
+
+
+def get_version_key(user_id):
+    return f"{user_constants.AuthenticationConstants.USER_VERSION_CACHE_PREFIX}{user_id}"
+
+
+def invalidate(user_id):
+    """
+    Gives the user a new cache version, so that copies cached before, and
+    copies of rows read before but cached after, are not used again.
+    """
+    cache.set(get_version_key(user_id), secrets.token_hex(8), timeout=None)
+    cache.delete(get_cache_key(user_id))
+
+
+def get_cached_field_names(user_model):
+    """
+    Returns the attnames of the User columns kept in the cache. The password
+    hash is left out; it stays deferred and is loaded when accessed.
+    """
+    return [
+        field.attname
+        for field in user_model._meta.concrete_fields
+        if field.attname not in user_constants.AuthenticationConstants.UNCACHED_FIELDS
+    ]
+
+
+def build_user(user_model, field_names, values):
+    """
+    Returns a user as if loaded from the database with only ``field_names``;
+    other fields are deferred and loaded on access, and saving it only
+    writes the loaded fields.
+    """
+    return user_model.from_db(db_router.db_for_read(user_model), field_names, values)
+
+
+def get_cached_user(user_model, user_id):
+    """
+    Returns the user with ``user_id`` from the cache, loading and caching it
+    on a miss, or None when there is no such user.
+
+    Each copy is cached with the user's version, read before the row. A
+    save committed between the read and ``cache.set`` changes the version,
+    so the copy it made stale is not used.
+    """
+    field_names = get_cached_field_names(user_model)
+    cache_key = get_cache_key(user_id)
+    version_key = get_version_key(user_id)
+    cached = cache.get_many([cache_key, version_key])
+    version = cached.get(version_key)
+    entry = cached.get(cache_key)
+    if entry is not None and entry[0] == version:
+        return build_user(user_model, field_names, entry[1])
+
+    values = (
+        user_model.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id})
+        .values_list(*field_names)
+        .first()
+    )
+    if values is None:
+        return None
+    cache.set(cache_key, (version, values), timeout=settings.JWT_USER_CACHE_TIMEOUT)
+    return build_user(user_model, field_names, values)
+
+
+class UserRefreshToken(jwt_tokens.RefreshToken):
+    """
+    Refresh token that also carries the user's email, which cannot change,
+    so that views can use it without loading the user. Access tokens
+    created from it copy the claim.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[user_constants.AuthenticationConstants.EMAIL_CLAIM] = user.email
+        return token
+
+
+class CachedJWTAuthentication(jwt_authentication.JWTAuthentication):
+    """
+    JWT authentication that resolves the user of a token from the cache
+    instead of the database.
+
+    Users are cached by ID for JWT_USER_CACHE_TIMEOUT seconds, without their
+    password hash, and invalidated whenever a save or delete of a User is
+    committed, so deactivation applies to the next request. The cache must
+    be shared by all workers for that, which is why the timeout defaults to
+    0 with the per-process memory cache. Updates through
+    ``QuerySet.update`` bypass the invalidation and apply once the entry
+    expires.
+
+    Views that only need the user's ID and email may declare
+    ``token_claims_user = True`` to get a user built from the token claims,
+    without a cache or database lookup. Such views trust the token until it
+    expires: a deactivated user keeps access to them for at most the access
+    token lifetime, as they can no longer refresh it.
+    """
+
+    use_token_claims = False
+
+    def get_user(self, validated_token):
+        if not settings.JWT_USER_CACHE_TIMEOUT or jwt_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise jwt_exceptions.InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        if self.use_token_claims and user_constants.AuthenticationConstants.EMAIL_CLAIM in (
+            validated_token
+        ):
+            return build_user(
+                self.user_model,
+                [jwt_settings.USER_ID_FIELD, "email"],
+                [user_id, validated_token[user_constants.AuthenticationConstants.EMAIL_CLAIM]],
+            )
+
+        user = get_cached_user(self.user_model, user_id)
+        if user is None:
+            raise jwt_exceptions.AuthenticationFailed(_("User not found"), code="user_not_found")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise jwt_exceptions.AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get("view")
+        self.use_token_claims = getattr(view, "token_claims_user", False)
+        return super().authenticate(request)
@@ -6,6 +6,8 @@ class UserConstants:
     NAME_MAX_LENGTH = 50
     PHONE_NUMBER_MAX_LENGTH = 10
     PROFILE_PICTURE_DIR = "users/"
+    # Profile picture variants as name: (width, height).
+    PROFILE_PICTURE_VARIANTS = {"small": (64, 64), "medium": (192, 192)}
 
 
 class ValidationConstants:
@@ -17,6 +19,41 @@ class ValidationConstants:
     PHONE_NUMBER_ERROR_MESSAGE = "Phone number should be exactly 10 numeric digits"
 
 
+class PasswordHashingConstants:
+    """
+    Constants used by the password hashing pool.
+    """
+
+    # Seconds clients are asked to wait before retrying a rejected login or signup.
+    RETRY_AFTER_SECONDS = 2
+
+
+class AuthenticationConstants:
+    """
+    Constants used for resolving the user of a JWT.
+    """
+
+    USER_CACHE_PREFIX = "user:auth:"
+    # Changed whenever a user is saved, so that cached copies read before are ignored.
+    USER_VERSION_CACHE_PREFIX = "user:auth:version:"
+    # Columns not kept in the user cache; they are loaded from the database on access.
+    UNCACHED_FIELDS = frozenset({"password"})
+    EMAIL_CLAIM = "email"
+
+
+class RevocationConstants:
+    """
+    Constants used for revoking refresh tokens.
+    """
+
+    JTI_MAX_LENGTH = 255
+    # Tokens revoked this long before the previous sync are read again, as
+    # a concurrent revocation can commit after a sync has seen higher IDs.
+    # Also covers clock differences between application servers.
+    SYNC_OVERLAP_SECONDS = 60
+    COMPACT_BATCH_SIZE = 5000
+
+
 class ErrorMessages:
     """
     Centralized error message constants for the User app.
@@ -28,3 +65,5 @@ class ErrorMessages:
     SUPERUSER_REQUIRED = "Superuser must have is_superuser=True."
 
     PASSWORD_MISMATCH = "Passwords do not match."
+    TOKEN_REVOKED = "Token has been revoked"
+    AUTHENTICATION_BUSY = "Too many sign-ins right now. Please retry shortly."
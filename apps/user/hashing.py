@@ -0,0 +1,143 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+from concurrent import futures
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from apps.base import constants as base_constants
+from apps.base import metrics as base_metrics
+
+logger = logging.getLogger(__name__)
+
+_reject_when_busy = contextvars.ContextVar("reject_when_busy", default=False)
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised, inside ``rejecting_when_busy``, when a password cannot be hashed
+    or checked because the hashing pool and its queue are full.
+    """
+
+
+@contextlib.contextmanager
+def rejecting_when_busy():
+    """
+    Makes hashing jobs submitted in this context fail with
+    PasswordHashingBusy when the pool is saturated, instead of waiting for
+    a free slot. API views use it to shed logins and signups; other callers,
+    such as the admin login or createsuperuser, wait.
+    """
+    token = _reject_when_busy.set(True)
+    try:
+        yield
+    finally:
+        _reject_when_busy.reset(token)
+
+
+class HashingPool:
+    """
+    A fixed number of threads that hash and check passwords, shared by all
+    requests of a worker process, with a bounded number of waiting jobs.
+
+    The standard PBKDF2 hasher (like bcrypt and argon2) releases the GIL
+    while it hashes, so hashing threads leave other requests free to run,
+    and the pool size caps how many cores logins can use at once. A job
+    that finds every thread busy and the queue full waits for a free slot,
+    or is rejected at once inside ``rejecting_when_busy``.
+
+    Attributes:
+        threads (int): Number of hashing threads.
+        max_waiting (int): Jobs allowed to wait for a free thread.
+    """
+
+    def __init__(self, threads, max_waiting):
+        self.threads = threads
+        self.max_waiting = max_waiting
+        self.slots = threading.BoundedSemaphore(threads + max_waiting)
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="password-hashing"
+        )
+
+    def run(self, func, *args):
+        """
+        Runs ``func(*args)`` on a hashing thread and returns its result.
+
+        Raises:
+            PasswordHashingBusy: Every thread is busy and the queue is full,
+                inside ``rejecting_when_busy``.
+        """
+        if not self.slots.acquire(blocking=not _reject_when_busy.get()):
+            base_metrics.increment(base_constants.MetricNames.PASSWORD_HASHING_REJECTED)
+            logger.warning("Password hashing pool is saturated, rejecting request")
+            raise PasswordHashingBusy
+
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the hashing pool of this process, or None when hashing runs on
+    the request thread (PASSWORD_HASHING_THREADS = 0).
+
+    The pool is created on first use, and again in a forked worker, whose
+    copy of the parent's pool has no threads.
+    """
+    global _pool, _pool_pid
+
+    if not settings.PASSWORD_HASHING_THREADS:
+        return None
+
+    pid = os.getpid()
+    if _pool_pid != pid:
+        with _pool_lock:
+            if _pool_pid != pid:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHING_THREADS, settings.PASSWORD_HASHING_MAX_WAITING
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def run(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def make_password(password):
+    """
+    Same as Django's ``make_password``, hashing on the pool.
+    """
+    if password is None:
+        return hashers.make_password(None)
+    return run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Same as Django's ``check_password``, verifying on the pool.
+
+    ``setter``, which re-hashes and saves the password when the hasher
+    settings changed, runs on the calling thread so that it uses the
+    request's database connection.
+    """
+    is_correct, must_update = run(hashers.verify_password, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
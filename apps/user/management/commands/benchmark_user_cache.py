@@ -0,0 +1,65 @@
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.base import benchmarks as base_benchmarks
+from apps.user import authentication as user_authentication
+
+
+class Command(BaseCommand):
+    """
+    Compares requests per second and latency of an authenticated endpoint
+    with the JWT user cache off and on.
+
+    Requests are sent with an access token of the user given by
+    ``--email``. Each configuration is served by a fresh server subprocess
+    because the cache timeout is read at startup.
+
+    Usage:
+        python manage.py benchmark_user_cache --email user@example.com
+        python manage.py benchmark_user_cache --email user@example.com --concurrency 32 \\
+            --server "gunicorn bookmyshow.wsgi -b 127.0.0.1:{port} -w 4 --threads 8"
+    """
+
+    help = "Benchmarks an authenticated endpoint with the JWT user cache off and on."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True, help="User the requests are sent as.")
+        parser.add_argument("--path", default="/api/user/")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument(
+            "--server",
+            default=f"{sys.executable} {settings.BASE_DIR / 'manage.py'} runserver "
+            "127.0.0.1:{port} --noreload",
+            help="Server command line; {port} is replaced with a free port.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"].lower().strip())
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+
+        token = user_authentication.UserRefreshToken.for_user(user).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        configurations = [
+            ("user loaded per request", {"JWT_USER_CACHE_TIMEOUT": "0"}),
+            ("user cache", {"JWT_USER_CACHE_TIMEOUT": "300"}),
+        ]
+
+        rows = []
+        for label, environment in configurations:
+            self.stdout.write(f"Running: {label}")
+            with base_benchmarks.ServerProcess(options["server"], environment) as server:
+                url = server.url(options["path"])
+                base_benchmarks.run_load(url, options["warmup"], options["concurrency"], headers)
+                result = base_benchmarks.run_load(
+                    url, options["requests"], options["concurrency"], headers
+                )
+            rows.append(result.as_row(label))
+
+        self.stdout.write(base_benchmarks.format_table(rows))
@@ -1,9 +1,14 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.core.validators import RegexValidator
 from django.db import models as db_models
+from django.db import transaction as db_transaction
+from django.dispatch import receiver
 
+from apps.base import images as base_images
 from apps.base import models as base_models
+from apps.user import authentication as user_authentication
 from apps.user import constants as user_constants
+from apps.user import hashing as user_hashing
 from apps.user import managers as user_manager
 
 # Validator to ensure the phone number is exactly 10 digits
@@ -28,6 +33,9 @@ class User(base_models.TimeStampedModel, AbstractBaseUser, PermissionsMixin):
         phone_number (str): 10-digit mobile number, validated via regex.
         city (ForeignKey): Reference to the city model.
         profile_picture (ImageField): Path to the uploaded profile image.
+        profile_picture_variants (dict): Storage names of the resized profile
+            picture variants by name and format, and the picture they were
+            made from.
         is_staff (bool): Boolean flag for Django admin access.
         is_active (bool): Boolean flag for user status.
     """
@@ -53,6 +61,7 @@ class User(base_models.TimeStampedModel, AbstractBaseUser, PermissionsMixin):
         null=True,
         blank=True,
     )
+    profile_picture_variants = db_models.JSONField(default=dict, blank=True, editable=False)
     is_active = db_models.BooleanField(default=True)
     is_staff = db_models.BooleanField(default=False)
 
@@ -64,3 +73,108 @@ class User(base_models.TimeStampedModel, AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+    def set_password(self, raw_password):
+        """
+        Hashes the password on the password hashing pool, keeping the
+        request thread free during signups and password changes.
+        """
+        self.password = user_hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Checks the password on the password hashing pool, keeping the
+        request thread free during logins.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return user_hashing.check_password(raw_password, self.password, setter)
+
+
+class RevokedToken(base_models.TimeStampedModel):
+    """
+    A refresh token that may no longer be used, kept until it expires.
+
+    Attributes:
+        jti (str): Unique identifier claim of the token.
+        expires_at (datetime): Expiry of the token, after which the row is
+            compacted away.
+    """
+
+    jti = db_models.CharField(
+        max_length=user_constants.RevocationConstants.JTI_MAX_LENGTH, unique=True
+    )
+    expires_at = db_models.DateTimeField(db_index=True)
+
+    class Meta:
+        # Recent rows are re-read by every process's revocation filter sync.
+        indexes = [db_models.Index(fields=["created_at"], name="revokedtoken_created_at_idx")]
+
+    def __str__(self):
+        return self.jti
+
+
+class RevokedTokenCompaction(base_models.TimeStampedModel):
+    """
+    A run of the compact_revoked_tokens command that deleted expired
+    revoked tokens. Every process rebuilds its revocation filter when it
+    finds a newer compaction than the one it was built after.
+
+    Attributes:
+        deleted (int): Number of revoked tokens deleted.
+    """
+
+    deleted = db_models.PositiveIntegerField()
+
+
+@receiver(db_models.signals.post_save, sender=User)
+@receiver(db_models.signals.post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drops the cached copy used to authenticate the user's requests once the
+    change is committed, so that profile changes and deactivation apply to
+    the next request and the old row is not cached again meanwhile.
+
+    Args:
+        sender (Model): The model class (User).
+        instance (User): The user saved or deleted.
+    """
+    pk = instance.pk
+    db_transaction.on_commit(lambda: user_authentication.invalidate(pk), using=instance._state.db)
+
+
+@receiver(db_models.signals.post_save, sender=User)
+def generate_profile_picture_variants(sender, instance, **kwargs):
+    """
+    Makes the resized variants of a new or changed profile picture once the
+    save is committed, in the image variant pool.
+
+    Args:
+        sender (Model): The model class (User).
+        instance (User): The user saved.
+    """
+    base_images.generate_on_commit(
+        instance,
+        "profile_picture",
+        "profile_picture_variants",
+        user_constants.UserConstants.PROFILE_PICTURE_VARIANTS,
+    )
+
+
+@receiver(base_images.variants_saved, sender=User)
+def invalidate_cached_user_variants(sender, pk, **kwargs):
+    """
+    Drops the cached copy of a user whose profile picture variants were
+    stored, which does not go through ``save()``.
+
+    Args:
+        sender (Model): The model class (User).
+        pk (int): ID of the user.
+    """
+    user_authentication.invalidate(pk)
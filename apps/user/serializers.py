@@ -1,11 +1,16 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from rest_framework import exceptions as rest_exceptions
 from rest_framework import serializers as rest_serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt import exceptions as jwt_exceptions
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
+from apps.base import serializers as base_serializers
+from apps.user import authentication as user_authentication
 from apps.user import constants as user_constants
+from apps.user import revocation as user_revocation
 
 User = get_user_model()
 
@@ -78,7 +83,7 @@ class SignUpSerializer(rest_serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
 
         # Generate refresh token
-        refresh = RefreshToken.for_user(user)
+        refresh = user_authentication.UserRefreshToken.for_user(user)
         user.access = str(refresh.access_token)
         user.refresh = str(refresh)
 
@@ -100,12 +105,23 @@ class UserSerializer(rest_serializers.ModelSerializer):
         phone_number (str): Phone number of the user.
             Must follow valid phone number format.
         profile_picture (Image): Profile image uploaded by the user.
+        profile_picture_variants (dict): URLs of the resized profile pictures
+            by size (small, medium) and format (webp, jpeg).
         city (City): Reference to the City model.
     """
 
+    profile_picture_variants = base_serializers.ImageVariantsField()
+
     class Meta:
         model = User
-        fields = ["name", "email", "phone_number", "profile_picture", "city"]
+        fields = [
+            "name",
+            "email",
+            "phone_number",
+            "profile_picture",
+            "profile_picture_variants",
+            "city",
+        ]
         read_only_fields = ["email"]
 
 
@@ -114,9 +130,12 @@ class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
     Custom Token serializer for JWT-based authentication.
 
     Extends the standard SimpleJWT TokenObtainPairSerializer to ensure
-    that email casing does not prevent a successful login.
+    that email casing does not prevent a successful login, and issues
+    tokens carrying the user's email.
     """
 
+    token_class = user_authentication.UserRefreshToken
+
     def to_internal_value(self, data):
         """
         Normalize the email address before any validation occurs.
@@ -124,3 +143,41 @@ class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
         if "email" in data:
             data["email"] = data["email"].lower().strip()
         return super().to_internal_value(data)
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer that rejects revoked refresh tokens and, with
+    ROTATE_REFRESH_TOKENS, revokes each token it rotates.
+
+    Revocation is checked against the in-process filter and the user is
+    resolved from the user cache, so a refresh runs no query other than
+    recording the rotated token. Recording it fails when the token was
+    already used, so a token can be rotated only once.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if user_revocation.is_revoked(refresh):
+            raise jwt_exceptions.TokenError(user_constants.ErrorMessages.TOKEN_REVOKED)
+
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if user_id:
+            user = user_authentication.get_cached_user(User, user_id)
+            if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+                raise rest_exceptions.AuthenticationFailed(
+                    self.error_messages["no_active_account"], "no_active_account"
+                )
+
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if not user_revocation.revoke(refresh):
+                raise jwt_exceptions.TokenError(user_constants.ErrorMessages.TOKEN_REVOKED)
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
@@ -1,3 +1,170 @@
-from django.test import TestCase
+import datetime
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.user import authentication as user_authentication
+from apps.user import hashing as user_hashing
+from apps.user import models as user_models
+from apps.user import revocation as user_revocation
+from apps.user import views as user_views
+
+
+@override_settings(PASSWORD_HASHING_THREADS=1, PASSWORD_HASHING_MAX_WAITING=0)
+class PasswordHashingTests(TestCase):
+    """
+    Behaviour of password hashing when the hashing pool is saturated.
+    """
+
+    def setUp(self):
+        # Make a pool with the overridden size, and drop it afterwards.
+        user_hashing._pool_pid = None
+        self.addCleanup(setattr, user_hashing, "_pool_pid", None)
+        self.pool = user_hashing.get_pool()
+
+    def saturate(self):
+        """
+        Takes every thread and queue slot of the pool until the test ends.
+        """
+        slots = self.pool.threads + self.pool.max_waiting
+        for _ in range(slots):
+            self.pool.slots.acquire()
+        self.addCleanup(self.pool.slots.release, slots)
+
+    def test_jobs_are_rejected_when_busy_inside_rejecting_when_busy(self):
+        self.saturate()
+
+        with user_hashing.rejecting_when_busy():
+            with self.assertRaises(user_hashing.PasswordHashingBusy):
+                user_hashing.make_password("long-password")
+
+    def test_api_login_is_rejected_with_503(self):
+        user_models.User.objects.create_user(email="user@example.com", password="long-password")
+        self.saturate()
+
+        request = APIRequestFactory().post(
+            "/api/user/login/",
+            {"email": "user@example.com", "password": "long-password"},
+            format="json",
+        )
+        response = user_views.LoginView.as_view()(request)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+    def test_set_password_outside_the_api_waits_for_the_pool(self):
+        user = user_models.User(email="user@example.com")
+        # The pool has a single slot.
+        self.pool.slots.acquire()
+
+        thread = threading.Thread(target=user.set_password, args=["long-password"])
+        thread.start()
+        thread.join(timeout=0.2)
+        self.assertTrue(thread.is_alive())
+
+        self.pool.slots.release()
+        thread.join()
+        self.assertTrue(user.password)
+
+
+@override_settings(REVOCATION_SYNC_SECONDS=0, REVOCATION_FILTER_CAPACITY=1000)
+class RevocationFilterTests(TestCase):
+    """
+    Syncing of a process's revocation filter with tokens revoked by others.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.filter = user_revocation.RevocationFilter()
+
+    def revoke(self, jti):
+        return user_models.RevokedToken.objects.create(
+            jti=jti, expires_at=timezone.now() + datetime.timedelta(days=1)
+        )
+
+    def test_sync_loads_tokens_revoked_since(self):
+        self.revoke("first")
+        self.assertIn("first", self.filter)
+        self.assertNotIn("second", self.filter)
+
+        self.revoke("second")
+        self.assertIn("second", self.filter)
+
+    def test_sync_loads_tokens_committed_after_higher_ids(self):
+        # A token whose ID was allocated before the last sync's highest ID,
+        # but committed after that sync.
+        late = self.revoke("late")
+        self.revoke("early")
+        self.filter.sync()
+        self.filter.filter = user_revocation.BloomFilter(1000, 0.001)
+        self.filter.filter.add("early")
+        self.assertGreater(self.filter.last_id, late.pk)
+
+        self.filter.sync()
+        self.assertIn("late", self.filter)
+
+    def test_tokens_read_again_are_counted_once(self):
+        self.revoke("token")
+        self.filter.sync()
+        self.filter.sync()
+
+        self.assertEqual(self.filter.filter.count, 1)
+
+    def test_compaction_rebuilds_the_filters_of_every_process(self):
+        expired = self.revoke("expired")
+        self.revoke("current")
+        self.filter.sync()
+        user_models.RevokedToken.objects.filter(pk=expired.pk).update(expires_at=timezone.now())
+
+        self.assertEqual(user_revocation.compact(), 1)
+        # Processes share no cache but the database.
+        cache.clear()
+        self.filter.sync()
+
+        self.assertNotIn("expired", self.filter)
+        self.assertIn("current", self.filter)
+        self.assertEqual(self.filter.filter.count, 1)
+
+
+@override_settings(JWT_USER_CACHE_TIMEOUT=300)
+class CachedUserTests(TestCase):
+    """
+    Invalidation of the users cached to authenticate JWTs.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user_models.User.objects.create_user(email="user@example.com", password="x")
+
+    def get_cached_user(self):
+        return user_authentication.get_cached_user(user_models.User, self.user.pk)
+
+    def deactivate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = user_models.User.objects.get(pk=self.user.pk)
+            user.is_active = False
+            user.save()
+
+    def test_saved_user_is_read_again(self):
+        self.assertTrue(self.get_cached_user().is_active)
+
+        self.deactivate()
+
+        self.assertFalse(self.get_cached_user().is_active)
+
+    def test_row_read_before_a_save_is_not_used_after_it(self):
+        cache_set = cache.set
+
+        def set_after_save(key, *args, **kwargs):
+            if key == user_authentication.get_cache_key(self.user.pk):
+                self.deactivate()
+            cache_set(key, *args, **kwargs)
+
+        with mock.patch.object(cache, "set", set_after_save):
+            self.assertTrue(self.get_cached_user().is_active)
+
+        self.assertFalse(self.get_cached_user().is_active)
@@ -1,10 +1,42 @@
+from rest_framework import exceptions as rest_exceptions
 from rest_framework import generics as rest_generics
 from rest_framework import permissions as rest_permissions
+from rest_framework_simplejwt import views as jwt_views
 
+from apps.user import constants as user_constants
+from apps.user import hashing as user_hashing
 from apps.user import serializers as user_serializers
 
 
-class SignupView(rest_generics.CreateAPIView):
+class AuthenticationBusy(rest_exceptions.APIException):
+    """
+    Rendered as a 503 with a Retry-After header when a login or signup is
+    shed because the password hashing pool is saturated.
+    """
+
+    status_code = 503
+    default_detail = user_constants.ErrorMessages.AUTHENTICATION_BUSY
+    default_code = "authentication_busy"
+    wait = user_constants.PasswordHashingConstants.RETRY_AFTER_SECONDS
+
+
+class PasswordHashingViewMixin:
+    """
+    Fails the request with a 503 instead of queueing its password hashing
+    when the hashing pool and its queue are full.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with user_hashing.rejecting_when_busy():
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, user_hashing.PasswordHashingBusy):
+            exc = AuthenticationBusy()
+        return super().handle_exception(exc)
+
+
+class SignupView(PasswordHashingViewMixin, rest_generics.CreateAPIView):
     """
     API endpoint for registering new users and issuing authentication tokens.
 
@@ -25,11 +57,33 @@ class SignupView(rest_generics.CreateAPIView):
                 - This password is too common.
                 - This password is too short. It must contain at least 8 characters.
                 - Passwords do not match.
+            503 Service Unavailable:
+                - Too many sign-ins right now. Please retry shortly.
     """
 
     serializer_class = user_serializers.SignUpSerializer
 
 
+class LoginView(PasswordHashingViewMixin, jwt_views.TokenObtainPairView):
+    """
+    API endpoint exchanging an email and password for access and refresh
+    tokens (SimpleJWT's TokenObtainPairView).
+
+    HTTP Method: POST
+        Request Body:
+                - email: User's email address.
+                - password: User's password.
+        Response (200 OK):
+                - access: "<jwt_access_token>",
+                - refresh: "<jwt_refresh_token>"
+        Error :
+            401 Unauthorized:
+                - No active account found with the given credentials
+            503 Service Unavailable:
+                - Too many sign-ins right now. Please retry shortly.
+    """
+
+
 class ProfileView(rest_generics.RetrieveUpdateAPIView):
     """
     API view for retrieving and updating the authenticated user's profile.
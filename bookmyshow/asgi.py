@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookmyshow.settings")
 
 application = get_asgi_application()
+
+if settings.STARTUP_PRELOAD:
+    # Imported once Django is set up, as it depends on installed apps.
+    from apps.base import preload as base_preload
+
+    base_preload.warm()
@@ -15,12 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from apps.base import utils as base_utils
+from apps.base import views as base_views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -28,10 +30,13 @@ urlpatterns = [
     path("api/movies/", include("apps.movie.urls")),
     path("api/cinemas/", include("apps.cinema.urls")),
     path("api/slots/", include("apps.slot.urls")),
+    path("api/bookings/", include("apps.booking.urls")),
     path("api/", include("apps.base.urls")),
+    re_path(
+        rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<name>.+)$",
+        base_views.MediaView.as_view(),
+        name="media",
+    ),
 ]
 
 handler404 = base_utils.ErrorHandlers.custom_404_view
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
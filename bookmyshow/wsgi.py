@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookmyshow.settings")
 
 application = get_wsgi_application()
+
+if settings.STARTUP_PRELOAD:
+    # Imported once Django is set up, as it depends on installed apps.
+    from apps.base import preload as base_preload
+
+    base_preload.warm()